@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Calendario de campañas: una foto por día de las campañas vigentes.
+
+Se arma una sola vez por versión de la tabla de campañas. Para cada día
+entre el primer inicio y el último fin guarda qué campañas están vigentes y
+qué descuento aplica la calculadora a cada plan (primera campaña vigente del
+tipo, y General cuando no hay de Continuidad, igual que
+cotizador.aplicar_descuento_campana con la fecha al inicio del día). Consultar
+una fecha es un acceso por índice.
+
+La calculadora cotiza con la hora actual, así que el último día de una
+campaña (Fecha_Fin a las 00:00) ya no la aplica; para mostrar lo que cobra
+hoy la calculadora se usa instantanea_en(datetime.now()), que resuelve la
+vigencia con el momento exacto.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cotizador import PLANES
+
+TIPOS_CAMPANA = ['General', 'Continuidad']
+
+class CalendarioCampanas:
+    """Fotos diarias precalculadas de las campañas vigentes"""
+
+    def __init__(self, df_campanas, planes=PLANES):
+        self.planes = planes
+        if df_campanas is None or df_campanas.empty:
+            df_campanas = pd.DataFrame(columns=['Nombre', 'Tipo_Campana', 'Fecha_Inicio', 'Fecha_Fin'])
+
+        self.campanas = [self._describir(campana) for campana in df_campanas.to_dict('records')]
+        inicios = pd.to_datetime(df_campanas['Fecha_Inicio']).to_numpy(dtype='datetime64[ns]')
+        fines = pd.to_datetime(df_campanas['Fecha_Fin']).to_numpy(dtype='datetime64[ns]')
+
+        if self.campanas:
+            self.primer_dia = inicios.min().astype('datetime64[D]')
+            ultimo_dia = fines.max().astype('datetime64[D]')
+        else:
+            self.primer_dia = ultimo_dia = np.datetime64(datetime.now().date(), 'D')
+        dias = np.arange(self.primer_dia, ultimo_dia + 1, dtype='datetime64[D]')
+
+        self._inicios, self._fines = inicios, fines
+        self._tipos = np.array([TIPOS_CAMPANA.index(c['tipo']) if c['tipo'] in TIPOS_CAMPANA else -1
+                                for c in self.campanas], dtype=np.int8)
+
+        # Vigencia [día, campaña], con la fecha al inicio del día
+        vigentes = self._vigentes(dias.astype('datetime64[ns]'))
+        aplicada = self._aplicada(vigentes)
+
+        self.instantaneas = [self._armar(dias[i], vigentes[i], {t: aplicada[t][i] for t in TIPOS_CAMPANA})
+                             for i in range(len(dias))]
+        # Fuera del rango: antes del primer inicio todas son próximas, después ninguna
+        sin_vigentes = np.zeros(len(self.campanas), dtype=bool)
+        sin_aplicada = {t: -1 for t in TIPOS_CAMPANA}
+        self._antes = self._armar(self.primer_dia - 1, sin_vigentes, sin_aplicada)
+        self._despues = self._armar(ultimo_dia + 1, sin_vigentes, sin_aplicada)
+
+    def _vigentes(self, momentos):
+        """Vigencia [momento, campaña] con la misma comparación que aplicar_descuento_campana"""
+        momentos = momentos[:, None]
+        return (self._inicios[None, :] <= momentos) & (self._fines[None, :] >= momentos)
+
+    def _aplicada(self, vigentes):
+        """
+        Campaña que aplica la calculadora en cada fila de vigencias: la primera
+        vigente del tipo, y General cuando no hay de Continuidad
+
+        Retorna: {tipo: arreglo de índices de campaña (-1 = ninguna)}
+        """
+        primera = {tipo: np.full(len(vigentes), -1) for tipo in TIPOS_CAMPANA}
+        for t, tipo in enumerate(TIPOS_CAMPANA):
+            del_tipo = vigentes & (self._tipos == t)[None, :]
+            if del_tipo.size:
+                primera[tipo] = np.where(del_tipo.any(axis=1), del_tipo.argmax(axis=1), -1)
+        # Sin campaña de Continuidad vigente se aplica la General
+        return {
+            'General': primera['General'],
+            'Continuidad': np.where(primera['Continuidad'] >= 0, primera['Continuidad'], primera['General']),
+        }
+
+    def _describir(self, campana):
+        """Datos de una campaña que muestra la página"""
+        return {
+            'nombre': campana['Nombre'],
+            'tipo': campana['Tipo_Campana'],
+            'inicio': pd.Timestamp(campana['Fecha_Inicio']),
+            'fin': pd.Timestamp(campana['Fecha_Fin']),
+            'descuentos': {plan: campana[plan] for plan in self.planes
+                           if plan in campana and pd.notna(campana[plan]) and campana[plan] > 0},
+        }
+
+    def _armar(self, dia, vigentes, aplicada):
+        """Foto de un día a partir de la fila de vigencias"""
+        momento = pd.Timestamp(dia)
+        vigentes = [c for c, vigente in zip(self.campanas, vigentes) if vigente]
+        descuentos, campana_aplicada = {}, {}
+        for tipo in TIPOS_CAMPANA:
+            campana = self.campanas[aplicada[tipo]] if aplicada[tipo] >= 0 else None
+            campana_aplicada[tipo] = campana['nombre'] if campana else None
+            descuentos[tipo] = {plan: campana['descuentos'].get(plan, 0) if campana else 0 for plan in self.planes}
+        return {
+            'generales': [c for c in vigentes if c['tipo'] == 'General'],
+            'continuidad': [c for c in vigentes if c['tipo'] == 'Continuidad'],
+            'proximas': [c for c in self.campanas if c['inicio'] > momento],
+            'campana_aplicada': campana_aplicada,
+            'descuentos': descuentos,
+        }
+
+    def instantanea(self, fecha):
+        """
+        Foto del día de `fecha` (date, datetime o Timestamp)
+
+        Retorna: diccionario con generales, continuidad, proximas,
+        campana_aplicada y descuentos ({tipo: {plan: porcentaje}})
+        """
+        indice = int((np.datetime64(pd.Timestamp(fecha).date(), 'D') - self.primer_dia).astype(int))
+        if indice < 0:
+            return self._antes
+        if indice >= len(self.instantaneas):
+            return self._despues
+        return self.instantaneas[indice]
+
+    def instantanea_en(self, momento):
+        """
+        Foto en el momento exacto (datetime o Timestamp), con la misma regla de
+        vigencia que la calculadora; se calcula en cada llamada
+
+        Retorna: diccionario con las mismas claves que instantanea
+        """
+        vigentes = self._vigentes(np.array([np.datetime64(pd.Timestamp(momento), 'ns')]))
+        aplicada = self._aplicada(vigentes)
+        return self._armar(momento, vigentes[0], {tipo: aplicada[tipo][0] for tipo in TIPOS_CAMPANA})
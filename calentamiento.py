@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+Calentamiento al iniciar el servidor y sonda de disponibilidad.
+
+Antes de atender al primer asesor se importan los módulos pesados, se cargan
+y validan el tarifario (cada plan y cada rango que puede consultar
+obtener_tarifa_base) y las campañas, y se arman las cachés que usan las
+páginas (calendario, cubo de primas, logo, servicios). Cada paso se mide y
+queda en el informe y en la métrica srp_calentamiento_segundos.
+
+La sonda /listo del servidor de métricas responde 200 solo cuando todos los
+pasos terminaron sin errores; mientras calienta, o si los datos no son
+válidos, responde 503 con el informe en JSON. Las advertencias (por ejemplo,
+rangos del tarifario que nunca se consultan) no bloquean.
+
+    python calentamiento.py verificar
+    SRP_METRICAS_PUERTO=9464 python calentamiento.py servir -- --server.port 8501
+    curl http://127.0.0.1:9464/listo
+
+La sonda es de cada instancia: con varias instancias detrás de un balanceador,
+cada una se inicia con su propio SRP_METRICAS_PUERTO (ver metricas.py).
+
+`servir` es el punto de entrada de despliegue: calienta en el mismo proceso
+y recién entonces inicia Streamlit, así /_stcore/health no responde hasta
+que los datos están cargados y ninguna sesión paga el arranque en frío.
+`streamlit run streamlit_app.py` queda para desarrollo: el calentamiento
+empieza con la primera sesión y /_stcore/health responde antes de que
+termine, por lo que no sirve como sonda.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import metricas
+
+# Módulos que se importan en el paso "modulos" (las páginas arrastran el resto)
+MODULOS = ['numpy', 'pandas', 'streamlit', 'PIL.Image', 'cotizador']
+COLUMNAS_CAMPANA = ['Nombre', 'Tipo_Campana', 'Fecha_Inicio', 'Fecha_Fin']
+TIPOS_CAMPANA = ['General', 'Continuidad']
+
+class ErrorCalentamiento(Exception):
+    """Un paso del calentamiento encontró datos inválidos"""
+
+    def __init__(self, errores):
+        super().__init__("; ".join(errores))
+        self.errores = errores
+
+# ==================== VALIDACIONES ====================
+
+def _tramos(edades):
+    """[71, 72, 73, 90] -> '71-73, 90'"""
+    tramos = []
+    for edad in edades:
+        if tramos and edad == tramos[-1][1] + 1:
+            tramos[-1][1] = edad
+        else:
+            tramos.append([edad, edad])
+    return ", ".join(f"{a}-{b}" if a != b else f"{a}" for a, b in tramos)
+
+def validar_tarifario(df_tarifas):
+    """
+    Valida el tarifario tal como lo consulta obtener_tarifa_base
+
+    Revisa que estén todos los planes, que no haya rangos repetidos y que cada
+    rango alcanzable (edades 0 a EDAD_MAX_CUBO, titulares e hijos) tenga una
+    tarifa numérica positiva en cada plan. Las edades sin rango son
+    advertencias: rango_etario nunca usó los tramos '71 a 75 años', '76 a 80
+    años' ni '81 años a más', así que las edades mayores de 70 no se cotizan
+    en ningún camino (cotizador, cubo de primas, corpus dorado); es la regla
+    de tarificación vigente, no un error del archivo.
+
+    Retorna: (errores, advertencias), listas de mensajes
+    """
+    import pandas as pd
+    from cotizador import PLANES, rango_etario
+    from cubo_primas import EDAD_MAX_CUBO
+
+    if df_tarifas is None:
+        return ["No se pudo cargar el tarifario"], []
+    if 'RangoEtario' not in df_tarifas.columns:
+        return ["Falta la columna 'RangoEtario' en el tarifario"], []
+
+    errores, advertencias = [], []
+    faltantes = [plan for plan in PLANES if plan not in df_tarifas.columns]
+    if faltantes:
+        errores.append(f"Faltan planes en el tarifario: {', '.join(faltantes)}")
+    otros = [col for col in df_tarifas.columns if col != 'RangoEtario' and col not in PLANES]
+    if otros:
+        advertencias.append(f"Columnas del tarifario que no son planes conocidos: {', '.join(otros)}")
+    repetidos = df_tarifas['RangoEtario'][df_tarifas['RangoEtario'].duplicated()].unique()
+    if len(repetidos):
+        errores.append(f"Rangos repetidos en el tarifario (se usa el primero): {', '.join(repetidos)}")
+
+    planes = [plan for plan in PLANES if plan in df_tarifas.columns]
+    tabla = df_tarifas.drop_duplicates('RangoEtario').set_index('RangoEtario')[planes]
+    valores = tabla.apply(pd.to_numeric, errors='coerce')
+
+    alcanzables = {}
+    for es_hijo, tipo in ((False, 'titulares'), (True, 'hijos')):
+        sin_rango = []
+        for edad in range(EDAD_MAX_CUBO + 1):
+            rango = rango_etario(edad, es_hijo)
+            if rango in valores.index:
+                alcanzables.setdefault(rango, []).append(edad)
+            else:
+                sin_rango.append(edad)
+        if sin_rango:
+            advertencias.append(f"Sin rango en el tarifario para {tipo} de {_tramos(sin_rango)} años (no se cotizan)")
+
+    for rango in alcanzables:
+        for plan in planes:
+            valor = valores.at[rango, plan]
+            if pd.isna(valor) or valor <= 0:
+                original = tabla.at[rango, plan]
+                errores.append(f"Tarifa inválida para {plan} en '{rango}': {'vacía' if pd.isna(original) else original}")
+
+    nunca = [rango for rango in valores.index if rango not in alcanzables]
+    if nunca:
+        advertencias.append(f"Rangos del tarifario que obtener_tarifa_base nunca consulta: {', '.join(nunca)}")
+    return errores, advertencias
+
+def validar_campanas(df_campanas):
+    """
+    Valida la tabla de campañas tal como la usa aplicar_descuento_campana
+
+    Retorna: (errores, advertencias), listas de mensajes
+    """
+    import pandas as pd
+    from cotizador import PLANES
+
+    if df_campanas is None or df_campanas.empty:
+        return [], ["No hay campañas cargadas: no se aplicarán descuentos"]
+    faltantes = [col for col in COLUMNAS_CAMPANA if col not in df_campanas.columns]
+    if faltantes:
+        return [f"Faltan columnas en las campañas: {', '.join(faltantes)}"], []
+
+    errores, advertencias = [], []
+    inicios = pd.to_datetime(df_campanas['Fecha_Inicio'], errors='coerce')
+    fines = pd.to_datetime(df_campanas['Fecha_Fin'], errors='coerce')
+    for i, campana in enumerate(df_campanas['Nombre']):
+        if pd.isna(inicios[i]) or pd.isna(fines[i]):
+            errores.append(f"Fechas inválidas en la campaña '{campana}' (fila {i + 1})")
+        elif inicios[i] > fines[i]:
+            errores.append(f"La campaña '{campana}' (fila {i + 1}) termina antes de empezar")
+
+    tipos = set(df_campanas['Tipo_Campana']) - set(TIPOS_CAMPANA)
+    if tipos:
+        advertencias.append(f"Tipos de campaña que nunca se aplican: {', '.join(map(str, tipos))}")
+    sin_columna = [plan for plan in PLANES if plan not in df_campanas.columns]
+    if sin_columna:
+        advertencias.append(f"Planes sin columna de descuento (0%): {', '.join(sin_columna)}")
+
+    for plan in PLANES:
+        if plan not in df_campanas.columns:
+            continue
+        descuentos = pd.to_numeric(df_campanas[plan], errors='coerce')
+        invalidos = df_campanas[plan].notna() & (descuentos.isna() | (descuentos < 0) | (descuentos > 100))
+        for i in invalidos[invalidos].index:
+            errores.append(f"Descuento inválido para {plan} en '{df_campanas.at[i, 'Nombre']}': {df_campanas.at[i, plan]}")
+    return errores, advertencias
+
+# ==================== PASOS ====================
+
+def _paso_modulos():
+    import paginas
+    for modulo in MODULOS + list(paginas.PAGINAS.values()):
+        importlib.import_module(modulo)
+
+def _paso_tarifario():
+    from paginas.datos import obtener_tarifas
+    if obtener_tarifas() is None:
+        raise ErrorCalentamiento(["No se pudo cargar el tarifario"])
+
+def _paso_validar_tarifario():
+    from paginas.datos import obtener_tarifas
+    errores, advertencias = validar_tarifario(obtener_tarifas())
+    if errores:
+        raise ErrorCalentamiento(errores)
+    return advertencias
+
+def _paso_campanas():
+    from paginas.datos import obtener_campanas
+    obtener_campanas()
+
+def _paso_validar_campanas():
+    from paginas.datos import obtener_campanas
+    errores, advertencias = validar_campanas(obtener_campanas())
+    if errores:
+        raise ErrorCalentamiento(errores)
+    return advertencias
+
+def _paso_calendario():
+    from paginas.datos import obtener_calendario
+    obtener_calendario().instantanea(datetime.now())
+
+def _paso_cubo():
+    from paginas.datos import obtener_cubo
+    cubo = obtener_cubo()
+    if cubo is None:
+        raise ErrorCalentamiento(["No se pudo armar el cubo de primas"])
+    # Primera consulta: inicializa los caminos de NumPy que usa la comparación
+    cubo.comparar([("Titular", 30), ("Hijo", 5)], 12, 0.04, "No")
+
+def _paso_validaciones():
+    from cotizador import tabla_recomendaciones
+    from paginas.datos import obtener_validaciones
+    obtener_validaciones()
+    tabla_recomendaciones()
+
+def _paso_logo():
+    from PIL import Image
+    from paginas.datos import obtener_logo
+    logo = obtener_logo()
+    if logo is None:
+        return ["No se encontró el logo: se muestra el encabezado de texto"]
+    Image.open(io.BytesIO(logo)).load()
+
+def _paso_servicios():
+    from paginas.calculadora import obtener_servicio_propuestas
+    from paginas.sesion import obtener_almacen_sesiones
+    obtener_servicio_propuestas()
+    obtener_almacen_sesiones()
+
+PASOS = [
+    ('modulos', _paso_modulos),
+    ('tarifario', _paso_tarifario),
+    ('validar_tarifario', _paso_validar_tarifario),
+    ('campanas', _paso_campanas),
+    ('validar_campanas', _paso_validar_campanas),
+    ('calendario', _paso_calendario),
+    ('cubo_primas', _paso_cubo),
+    ('validaciones', _paso_validaciones),
+    ('logo', _paso_logo),
+    ('servicios', _paso_servicios),
+]
+
+# ==================== CALENTAMIENTO ====================
+
+class Calentamiento:
+    """Ejecuta los pasos una vez por proceso y guarda el informe"""
+
+    def __init__(self, pasos=PASOS):
+        self.pasos = pasos
+        self.estado = 'pendiente'  # pendiente, calentando, listo, fallido
+        self.informe = []
+        self.segundos = None
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._terminado = threading.Event()
+
+    @property
+    def listo(self):
+        return self.estado == 'listo'
+
+    def errores(self):
+        return [error for paso in self.informe for error in paso['errores']]
+
+    def ejecutar(self):
+        """Corre todos los pasos en orden; se detiene en el primero que falla"""
+        self.estado = 'calentando'
+        inicio = time.perf_counter()
+        for nombre, funcion in self.pasos:
+            paso = {'paso': nombre, 'estado': 'ok', 'segundos': None, 'errores': [], 'advertencias': []}
+            self.informe.append(paso)
+            inicio_paso = time.perf_counter()
+            try:
+                paso['advertencias'] = funcion() or []
+            except ErrorCalentamiento as e:
+                paso['estado'], paso['errores'] = 'error', e.errores
+            except Exception as e:
+                paso['estado'], paso['errores'] = 'error', [f"{type(e).__name__}: {e}"]
+            paso['segundos'] = time.perf_counter() - inicio_paso
+            metricas.CALENTAMIENTO.observar(paso['segundos'], nombre, paso['estado'])
+            if paso['estado'] == 'error':
+                break
+        self.segundos = time.perf_counter() - inicio
+        self.estado = 'fallido' if self.errores() else 'listo'
+        self._terminado.set()
+        return self.listo
+
+    def iniciar(self, imprimir=True):
+        """Lanza el calentamiento en un hilo de fondo (una vez por proceso)"""
+        with self._lock:
+            if self._hilo is None:
+                def correr():
+                    self.ejecutar()
+                    if imprimir:
+                        print(self.texto(), flush=True)
+                self._hilo = threading.Thread(target=correr, name="srp-calentamiento", daemon=True)
+                self._hilo.start()
+        return self
+
+    def esperar(self, timeout=None):
+        """Espera a que termine; retorna True si quedó listo"""
+        self._terminado.wait(timeout)
+        return self.listo
+
+    def resumen(self):
+        """Estado e informe por paso, para la sonda /listo"""
+        return {
+            'listo': self.listo,
+            'estado': self.estado,
+            'segundos': round(self.segundos, 4) if self.segundos is not None else None,
+            'pasos': [dict(paso, segundos=round(paso['segundos'], 4) if paso['segundos'] is not None else None)
+                      for paso in self.informe]
+        }
+
+    def texto(self):
+        """Informe legible con el tiempo de cada paso"""
+        lineas = []
+        for paso in self.informe:
+            marca = "✅" if paso['estado'] == 'ok' else "❌"
+            segundos = f"{paso['segundos'] * 1000:9.1f} ms" if paso['segundos'] is not None else "        ..."
+            lineas.append(f"{marca} {paso['paso']:<18} {segundos}")
+            lineas.extend(f"     ❌ {error}" for error in paso['errores'])
+            lineas.extend(f"     ⚠️ {advertencia}" for advertencia in paso['advertencias'])
+        total = f"{self.segundos:.2f} s" if self.segundos is not None else "en curso"
+        lineas.append(f"Calentamiento: {self.estado} ({total})")
+        return "\n".join(lineas)
+
+CALENTAMIENTO = Calentamiento()
+
+def _sonda_listo():
+    codigo = 200 if CALENTAMIENTO.listo else 503
+    return codigo, "application/json; charset=utf-8", json.dumps(CALENTAMIENTO.resumen(), ensure_ascii=False)
+
+metricas.registrar_sonda("/listo", _sonda_listo)
+
+def iniciar():
+    """Inicia el calentamiento del proceso si aún no empezó; retorna el Calentamiento"""
+    return CALENTAMIENTO.iniciar()
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Calentamiento y disponibilidad del servidor")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("verificar", help="Corre el calentamiento y muestra el tiempo de cada paso")
+    p_servir = sub.add_parser("servir", help="Calienta y luego inicia la app en el mismo proceso (despliegue)")
+    p_servir.add_argument("opciones", nargs=argparse.REMAINDER, help="Opciones para streamlit run (tras --)")
+    args = parser.parse_args()
+
+    # La app importa `calentamiento`; se usa esa instancia y no la de __main__
+    import calentamiento
+
+    if args.comando == "verificar":
+        ejecucion = calentamiento.Calentamiento()
+        ejecucion.ejecutar()
+        print(ejecucion.texto())
+        sys.exit(0 if ejecucion.listo else 1)
+
+    os.environ.setdefault("SRP_METRICAS_PUERTO", "9464")
+    metricas.iniciar_servidor()
+    # Streamlit abre su puerto (y /_stcore/health) recién con el calentamiento terminado;
+    # si falla, la app igual se sirve con los errores en la barra lateral y /listo en 503
+    calentamiento.iniciar().esperar()
+
+    from streamlit.web import cli
+    opciones = [op for op in args.opciones if op != "--"]
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py"), *opciones]
+    sys.exit(cli.main())
+
+if __name__ == "__main__":
+    main()
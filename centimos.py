@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Aritmética exacta de primas en céntimos enteros (int64), vectorizada con NumPy.
+
+Reglas de redondeo:
+- Tarifario: cada prima se lleva al céntimo más cercano, así 3761.9999999999995
+  pasa a 376200 céntimos.
+- Descuento: el monto descontado se redondea al céntimo, mitad hacia arriba,
+  y se resta de la prima (prima - round(prima * pct / 100)).
+- Cuota: la fórmula PAGO() se redondea al céntimo, mitad hacia arriba.
+- Tasa: la tasa anual se lleva a puntos básicos (0.04 -> 400) y esa misma
+  tasa se usa en la cuota y en el interés de cada cuota.
+- Interés de cada cuota: saldo * tasa / 12 redondeado al céntimo, mitad hacia
+  arriba, operando solo con enteros.
+- Última cuota: absorbe la diferencia para que el saldo termine exactamente en 0.
+
+Todas las funciones aceptan escalares o arreglos y operan elemento a elemento.
+"""
+import numpy as np
+
+CENTIMOS = 100
+PUNTOS_BASICOS = 10000
+
+def _dividir_redondeando(numerador, denominador):
+    """División entera con redondeo mitad hacia arriba (numerador >= 0)"""
+    return (2 * numerador + denominador) // (2 * denominador)
+
+def a_centimos(montos):
+    """Convierte montos en soles (float) a céntimos int64"""
+    return np.rint(np.asarray(montos, dtype=np.float64) * CENTIMOS).astype(np.int64)
+
+def a_soles(centimos):
+    """Convierte céntimos a soles (float) para mostrar"""
+    return np.asarray(centimos, dtype=np.int64) / CENTIMOS
+
+def a_puntos_basicos(porcentajes):
+    """Convierte porcentajes (ej. 33 o 12.5) a puntos básicos de porcentaje (3300, 1250)"""
+    return np.rint(np.asarray(porcentajes, dtype=np.float64) * 100).astype(np.int64)
+
+def tasa_puntos_basicos(tasa_anual):
+    """Convierte la tasa anual (ej. 0.04) a puntos básicos (400)"""
+    return a_puntos_basicos(np.asarray(tasa_anual, dtype=np.float64) * 100)
+
+def aplicar_descuento(primas, descuentos_pct):
+    """
+    Aplica el descuento porcentual a primas en céntimos
+
+    Parámetros:
+    - primas: céntimos (int64)
+    - descuentos_pct: porcentaje de descuento (ej. 25 para 25%)
+
+    Retorna: prima con descuento en céntimos
+    """
+    primas = np.asarray(primas, dtype=np.int64)
+    descuento = _dividir_redondeando(primas * a_puntos_basicos(descuentos_pct), PUNTOS_BASICOS)
+    return primas - descuento
+
+def calcular_cuotas(totales, tasa_anual, num_cuotas):
+    """
+    Cuota periódica (fórmula PAGO) en céntimos
+
+    Parámetros:
+    - totales: prima total en céntimos
+    - tasa_anual: tasa anual (ej. 0.04)
+    - num_cuotas: número de cuotas
+
+    Retorna: cuota en céntimos (la última cuota puede diferir, ver plan_pagos)
+    """
+    totales = np.asarray(totales, dtype=np.int64)
+    num_cuotas = np.asarray(num_cuotas, dtype=np.int64)
+    tasa_mensual = tasa_puntos_basicos(tasa_anual) / (12 * PUNTOS_BASICOS)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = (1 + tasa_mensual) ** num_cuotas
+        razon = np.where(tasa_mensual == 0, 1 / num_cuotas, tasa_mensual * factor / (factor - 1))
+    return np.floor(totales * razon + 0.5).astype(np.int64)
+
+def plan_pagos(totales, tasa_anual, num_cuotas):
+    """
+    Tabla de amortización exacta, vectorizada sobre varias cotizaciones
+
+    Parámetros:
+    - totales: prima total en céntimos, escalar o arreglo de m cotizaciones
+    - tasa_anual: tasa anual común a las cotizaciones
+    - num_cuotas: número de cuotas común a las cotizaciones
+
+    Retorna: (pago, capital, interes, saldo), arreglos int64 de forma [m, num_cuotas]
+    """
+    totales = np.atleast_1d(np.asarray(totales, dtype=np.int64))
+    tasa_bps = int(tasa_puntos_basicos(tasa_anual))
+    cuota = calcular_cuotas(totales, tasa_anual, num_cuotas)
+
+    forma = (len(totales), num_cuotas)
+    pago = np.empty(forma, dtype=np.int64)
+    capital = np.empty(forma, dtype=np.int64)
+    interes = np.empty(forma, dtype=np.int64)
+    saldo = np.empty(forma, dtype=np.int64)
+
+    restante = totales.copy()
+    for i in range(num_cuotas):
+        interes[:, i] = _dividir_redondeando(restante * tasa_bps, 12 * PUNTOS_BASICOS)
+        if i == num_cuotas - 1:
+            # Ajuste de la última cuota: cancela exactamente el saldo
+            capital[:, i] = restante
+        else:
+            capital[:, i] = np.minimum(cuota - interes[:, i], restante)
+        pago[:, i] = capital[:, i] + interes[:, i]
+        restante = restante - capital[:, i]
+        saldo[:, i] = restante
+
+    return pago, capital, interes, saldo
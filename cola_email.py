@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""
+Cola de envío de propuestas por correo.
+
+Los envíos se guardan en una base SQLite local, así la app solo encola y
+responde de inmediato. Un despachador en segundo plano toma lotes, adjunta
+el PDF de la propuesta y los envía reutilizando un pool de conexiones SMTP,
+con reintentos (backoff exponencial) y límite de mensajes por segundo.
+
+Cada proceso de Streamlit tiene su propio despachador sobre la misma base.
+Un envío tomado queda a nombre del despachador con un plazo (lease); solo
+se recupera cuando el plazo vence, así un despachador que arranca no le
+quita a otro los mensajes que está enviando.
+
+Configuración por variables de entorno: SMTP_HOST, SMTP_PORT, SMTP_USUARIO,
+SMTP_CLAVE, SMTP_TLS ("1" para STARTTLS), EMAIL_REMITENTE y EMAIL_COLA_DB.
+
+Para probar en local, levantar un servidor SMTP de depuración:
+
+    python -m smtpd -n -c DebuggingServer localhost:1025   (Python 3.11)
+    python -m aiosmtpd -n -l localhost:1025
+
+y despachar la cola con:
+
+    python cola_email.py despachar
+    python cola_email.py encolar renovacion.csv   (cartera con columna Email)
+"""
+import argparse
+import json
+import os
+import queue
+import smtplib
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+from propuestas import renderizar_propuesta
+
+RUTA_COLA = os.environ.get("EMAIL_COLA_DB", "cola_email.db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS envios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    destinatario TEXT NOT NULL,
+    asunto TEXT NOT NULL,
+    cuerpo TEXT NOT NULL,
+    cotizacion TEXT,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    creado REAL NOT NULL,
+    despachador TEXT,
+    vence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_envios_estado ON envios (estado, proximo_intento);
+"""
+
+# Columnas agregadas después de la primera versión del esquema
+COLUMNAS_NUEVAS = {'despachador': "TEXT", 'vence': "REAL"}
+
+# Plazo por defecto de un envío tomado; debe cubrir con holgura el envío de un lote
+PLAZO_TOMA = 300
+
+# Espera máxima del despachador entre reintentos mientras el servidor SMTP no responde
+ESPERA_MAXIMA_SERVIDOR = 300
+
+# ==================== COLA PERSISTENTE ====================
+
+class ColaEmail:
+    """Cola de envíos persistida en SQLite (segura entre hilos y procesos)"""
+
+    def __init__(self, ruta_db=RUTA_COLA):
+        self._conexion = sqlite3.connect(ruta_db, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.executescript(ESQUEMA)
+        columnas = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(envios)")}
+        for columna, tipo in COLUMNAS_NUEVAS.items():
+            if columna not in columnas:
+                self._conexion.execute(f"ALTER TABLE envios ADD COLUMN {columna} {tipo}")
+        self._lock = threading.Lock()
+
+    def _transaccion(self, funcion):
+        """Ejecuta funcion(cursor) en una transacción de escritura; revierte si falla"""
+        with self._lock:
+            cursor = self._conexion.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = funcion(cursor)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        return resultado
+
+    def encolar(self, destinatario, asunto, cuerpo, cotizacion=None):
+        """Guarda un envío pendiente y retorna su id"""
+        return self.encolar_lote([(destinatario, asunto, cuerpo, cotizacion)])[0]
+
+    def encolar_lote(self, mensajes):
+        """
+        Guarda varios envíos en una sola transacción
+
+        Parámetros:
+        - mensajes: iterable de tuplas (destinatario, asunto, cuerpo, cotizacion)
+
+        Retorna: lista de ids
+        """
+        ahora = time.time()
+        filas = [
+            (d, a, c, json.dumps(cot, default=str, ensure_ascii=False) if cot is not None else None, ahora)
+            for d, a, c, cot in mensajes
+        ]
+        def insertar(cursor):
+            ids = []
+            for fila in filas:
+                cursor.execute(
+                    "INSERT INTO envios (destinatario, asunto, cuerpo, cotizacion, creado) VALUES (?, ?, ?, ?, ?)",
+                    fila
+                )
+                ids.append(cursor.lastrowid)
+            return ids
+        return self._transaccion(insertar)
+
+    def tomar_lote(self, tamano, despachador, plazo=PLAZO_TOMA):
+        """
+        Toma hasta `tamano` envíos listos a nombre del despachador y los retorna
+
+        Antes de tomar, devuelve a 'pendiente' los envíos cuyo plazo venció
+        (su despachador se cayó); los de despachadores vivos no se tocan.
+        """
+        def tomar(cursor):
+            ahora = time.time()
+            self._liberar_vencidos(cursor, ahora)
+            filas = cursor.execute(
+                "SELECT id, destinatario, asunto, cuerpo, cotizacion, intentos FROM envios "
+                "WHERE estado = 'pendiente' AND proximo_intento <= ? ORDER BY id LIMIT ?",
+                (ahora, tamano)
+            ).fetchall()
+            cursor.executemany(
+                "UPDATE envios SET estado = 'enviando', despachador = ?, vence = ? WHERE id = ?",
+                [(despachador, ahora + plazo, f[0]) for f in filas]
+            )
+            return filas
+        return self._transaccion(tomar)
+
+    def marcar_enviados(self, ids):
+        with self._lock:
+            self._conexion.executemany(
+                "UPDATE envios SET estado = 'enviado', error = NULL, despachador = NULL, vence = NULL WHERE id = ?",
+                [(i,) for i in ids]
+            )
+
+    def liberar(self, ids):
+        """Devuelve envíos tomados a 'pendiente' sin contarles un intento (falla del servidor, no del mensaje)"""
+        with self._lock:
+            self._conexion.executemany(
+                "UPDATE envios SET estado = 'pendiente', despachador = NULL, vence = NULL "
+                "WHERE id = ? AND estado = 'enviando'",
+                [(i,) for i in ids]
+            )
+
+    def marcar_fallido(self, id_envio, intentos, error, max_intentos, backoff_base):
+        """Reprograma el envío con backoff exponencial o lo marca como error definitivo"""
+        estado = 'error' if intentos >= max_intentos else 'pendiente'
+        proximo = time.time() + backoff_base ** intentos
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE envios SET estado = ?, intentos = ?, proximo_intento = ?, error = ?, "
+                "despachador = NULL, vence = NULL WHERE id = ?",
+                (estado, intentos, proximo, str(error), id_envio)
+            )
+
+    @staticmethod
+    def _liberar_vencidos(cursor, ahora):
+        return cursor.execute(
+            "UPDATE envios SET estado = 'pendiente', despachador = NULL, vence = NULL "
+            "WHERE estado = 'enviando' AND (vence IS NULL OR vence < ?)", (ahora,)
+        ).rowcount
+
+    def liberar_vencidos(self):
+        """Devuelve a 'pendiente' los envíos cuyo plazo venció (despachador caído); retorna cuántos"""
+        return self._transaccion(lambda cursor: self._liberar_vencidos(cursor, time.time()))
+
+    def liberar_propios(self, despachador):
+        """Devuelve a 'pendiente' los envíos que el despachador tomó y no terminó (al detenerse)"""
+        with self._lock:
+            return self._conexion.execute(
+                "UPDATE envios SET estado = 'pendiente', despachador = NULL, vence = NULL "
+                "WHERE estado = 'enviando' AND despachador = ?", (despachador,)
+            ).rowcount
+
+    def resumen(self):
+        """Retorna la cantidad de envíos por estado"""
+        with self._lock:
+            return dict(self._conexion.execute("SELECT estado, COUNT(*) FROM envios GROUP BY estado").fetchall())
+
+# ==================== POOL SMTP ====================
+
+class PoolSMTP:
+    """Pool de conexiones SMTP reutilizables"""
+
+    def __init__(self, host, port, usuario=None, clave=None, usar_tls=False, tamano=2, timeout=30):
+        self.host = host
+        self.port = port
+        self.usuario = usuario
+        self.clave = clave
+        self.usar_tls = usar_tls
+        self.timeout = timeout
+        self._libres = queue.LifoQueue(maxsize=tamano)
+
+    def _conectar(self):
+        conexion = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.usar_tls:
+            conexion.starttls()
+        if self.usuario:
+            conexion.login(self.usuario, self.clave)
+        return conexion
+
+    def tomar(self):
+        try:
+            conexion = self._libres.get_nowait()
+        except queue.Empty:
+            return self._conectar()
+        try:
+            conexion.noop()
+            return conexion
+        except (smtplib.SMTPException, OSError):
+            # Conexión vencida o socket reiniciado: se cierra y se abre otra
+            self.descartar(conexion)
+            return self._conectar()
+
+    def devolver(self, conexion):
+        try:
+            self._libres.put_nowait(conexion)
+        except queue.Full:
+            self.descartar(conexion)
+
+    def descartar(self, conexion):
+        try:
+            conexion.quit()
+        except Exception:
+            pass
+
+    def cerrar(self):
+        while not self._libres.empty():
+            self.descartar(self._libres.get_nowait())
+
+class LimiteTasa:
+    """Cubeta de fichas compartida entre hilos: como máximo `por_segundo` envíos por segundo"""
+
+    def __init__(self, por_segundo):
+        self.por_segundo = por_segundo
+        self._fichas = por_segundo
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        if not self.por_segundo:
+            return
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.por_segundo, self._fichas + (ahora - self._ultimo) * self.por_segundo)
+                self._ultimo = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.por_segundo
+            time.sleep(espera)
+
+# ==================== DESPACHADOR ====================
+
+def construir_mensaje(remitente, destinatario, asunto, cuerpo, cotizacion_json):
+    """Arma el correo y, si hay cotización, adjunta la propuesta en PDF"""
+    mensaje = EmailMessage()
+    mensaje['From'] = remitente
+    mensaje['To'] = destinatario
+    mensaje['Subject'] = asunto
+    mensaje.set_content(cuerpo)
+    if cotizacion_json:
+        cotizacion = json.loads(cotizacion_json)
+        mensaje.add_attachment(
+            renderizar_propuesta(cotizacion), maintype='application', subtype='pdf',
+            filename=f"Propuesta_{cotizacion['plan']}.pdf"
+        )
+    return mensaje
+
+class Despachador:
+    """
+    Envía la cola en segundo plano por lotes sobre conexiones SMTP agrupadas.
+
+    Cada lote se reparte entre `conexiones` hilos; cada hilo envía su parte
+    por una misma conexión del pool, respetando el límite de tasa global.
+
+    Si no se puede conectar con el servidor o la conexión se cae, los envíos
+    que faltan vuelven a 'pendiente' sin contarles un intento y el despachador
+    espera (backoff exponencial) antes del siguiente lote; los reintentos por
+    mensaje quedan para los rechazos del servidor.
+    """
+
+    def __init__(self, cola, pool=None, remitente=None, tamano_lote=100, conexiones=2,
+                 mensajes_por_segundo=20, max_intentos=5, backoff_base=2, intervalo=1.0, plazo=PLAZO_TOMA):
+        self.cola = cola
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.plazo = plazo
+        self.pool = pool or pool_desde_entorno(conexiones)
+        self.remitente = remitente or os.environ.get("EMAIL_REMITENTE", "propuestas@pacifico.com.pe")
+        self.tamano_lote = tamano_lote
+        self.conexiones = conexiones
+        self.limite = LimiteTasa(mensajes_por_segundo)
+        self.max_intentos = max_intentos
+        self.backoff_base = backoff_base
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+        self._sin_servidor = threading.Event()
+        self._hilo = None
+
+    def _enviar_parte(self, filas):
+        enviados = []
+        conexion = None
+        try:
+            for i, (id_envio, destinatario, asunto, cuerpo, cotizacion, intentos) in enumerate(filas):
+                try:
+                    mensaje = construir_mensaje(self.remitente, destinatario, asunto, cuerpo, cotizacion)
+                except Exception as e:
+                    self.cola.marcar_fallido(id_envio, intentos + 1, e, self.max_intentos, self.backoff_base)
+                    continue
+                try:
+                    if conexion is None:
+                        try:
+                            conexion = self.pool.tomar()
+                        except Exception as e:
+                            # Servidor caído o rechazando conexiones (incluye SMTPConnectError)
+                            raise smtplib.SMTPServerDisconnected(str(e)) from e
+                    self.limite.esperar()
+                    conexion.send_message(mensaje)
+                    enviados.append(id_envio)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    # Rechazo del mensaje (destinatario, remitente o datos): la conexión sigue sana
+                    self.cola.marcar_fallido(id_envio, intentos + 1, e, self.max_intentos, self.backoff_base)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # Falla de conexión, no del mensaje: se devuelve el resto de la parte y el despachador espera
+                    if conexion is not None:
+                        self.pool.descartar(conexion)
+                        conexion = None
+                    self.cola.liberar([fila[0] for fila in filas[i:]])
+                    self._sin_servidor.set()
+                    break
+                except Exception as e:
+                    self.cola.marcar_fallido(id_envio, intentos + 1, e, self.max_intentos, self.backoff_base)
+        finally:
+            if conexion is not None:
+                self.pool.devolver(conexion)
+            self.cola.marcar_enviados(enviados)
+        return len(enviados)
+
+    def despachar_lote(self):
+        """Envía un lote de la cola; retorna (tomados, enviados)"""
+        self._sin_servidor.clear()
+        filas = self.cola.tomar_lote(self.tamano_lote, self.id, self.plazo)
+        if not filas:
+            return 0, 0
+        partes = [filas[i::self.conexiones] for i in range(self.conexiones) if filas[i::self.conexiones]]
+        with ThreadPoolExecutor(max_workers=len(partes)) as executor:
+            enviados = sum(executor.map(self._enviar_parte, partes))
+        return len(filas), enviados
+
+    def ejecutar(self):
+        """Bucle del despachador hasta que se llame a detener()"""
+        fallos_servidor = 0
+        try:
+            while not self._detener.is_set():
+                try:
+                    tomados, _ = self.despachar_lote()
+                except Exception as e:
+                    # Por ejemplo "database is locked": el hilo sigue; lo tomado se recupera al vencer el plazo
+                    print(f"Despachador de correo: error en el lote ({type(e).__name__}: {e}); "
+                          f"se reintenta en {self.intervalo:g} s", file=sys.stderr)
+                    self._detener.wait(self.intervalo)
+                    continue
+                if self._sin_servidor.is_set():
+                    fallos_servidor += 1
+                    espera = min(self.intervalo * self.backoff_base ** fallos_servidor, ESPERA_MAXIMA_SERVIDOR)
+                    print(f"Despachador de correo: sin conexión con el servidor SMTP; "
+                          f"se reintenta en {espera:g} s", file=sys.stderr)
+                    self._detener.wait(espera)
+                    continue
+                fallos_servidor = 0
+                if tomados < self.tamano_lote:
+                    self._detener.wait(self.intervalo)
+        finally:
+            self.cola.liberar_propios(self.id)
+            self.pool.cerrar()
+
+    def iniciar(self):
+        """Lanza el despachador en un hilo demonio"""
+        self._hilo = threading.Thread(target=self.ejecutar, name="despachador-email", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+def pool_desde_entorno(conexiones=2):
+    """Crea el pool SMTP con la configuración de las variables de entorno"""
+    return PoolSMTP(
+        os.environ.get("SMTP_HOST", "localhost"),
+        int(os.environ.get("SMTP_PORT", "1025")),
+        usuario=os.environ.get("SMTP_USUARIO"),
+        clave=os.environ.get("SMTP_CLAVE"),
+        usar_tls=os.environ.get("SMTP_TLS") == "1",
+        tamano=conexiones
+    )
+
+def mensaje_propuesta(cotizacion):
+    """Asunto y cuerpo estándar del correo de propuesta"""
+    asunto = f"Propuesta de Seguro Integral - Plan {cotizacion['plan']}"
+    cuerpo = (
+        "Estimado(a) cliente:\n\n"
+        f"Adjuntamos la propuesta del plan {cotizacion['plan']} con una prima total anual de "
+        f"S/ {cotizacion['total_prima']:,.2f} en {cotizacion['num_cuotas']} cuota(s).\n\n"
+        "Pacífico Seguros"
+    )
+    return asunto, cuerpo
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola de envío de propuestas por correo")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_despachar = sub.add_parser("despachar", help="Envía la cola en primer plano")
+    p_despachar.add_argument("--conexiones", type=int, default=2)
+    p_despachar.add_argument("--lote", type=int, default=100)
+    p_despachar.add_argument("--por-segundo", type=float, default=20)
+
+    p_encolar = sub.add_parser("encolar", help="Encola las propuestas de una cartera de renovación")
+    p_encolar.add_argument("cartera", help="CSV de renovación con columna Email")
+
+    sub.add_parser("estado", help="Muestra la cantidad de envíos por estado")
+    args = parser.parse_args()
+
+    cola = ColaEmail()
+    if args.comando == "despachar":
+        despachador = Despachador(cola, tamano_lote=args.lote, conexiones=args.conexiones,
+                                  mensajes_por_segundo=args.por_segundo)
+        try:
+            despachador.ejecutar()
+        except KeyboardInterrupt:
+            pass
+    elif args.comando == "encolar":
+        from cotizador import cargar_tarifas, cargar_campanas
+        from propuestas import aviso_omitidas, cotizaciones_desde_cartera
+
+        errores = []
+        df_tarifas = cargar_tarifas(errores)
+        if df_tarifas is None:
+            raise SystemExit("\n".join(errores) or "No se pudo cargar el tarifario")
+        lote = []
+        total = 0
+        omitidas = []
+        for cotizacion in cotizaciones_desde_cartera(args.cartera, df_tarifas, cargar_campanas(), omitidas=omitidas):
+            email = cotizacion['cliente'].get('Email')
+            if not email:
+                continue
+            lote.append((email, *mensaje_propuesta(cotizacion), cotizacion))
+            if len(lote) >= 1000:
+                total += len(cola.encolar_lote(lote))
+                lote = []
+        if lote:
+            total += len(cola.encolar_lote(lote))
+        print(f"{total} envíos encolados")
+        if omitidas:
+            print(aviso_omitidas(omitidas))
+    else:
+        print(cola.resumen())
+
+if __name__ == "__main__":
+    main()
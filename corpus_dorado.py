@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+Corpus dorado del recomendador y la calculadora para pruebas de regresión.
+
+`grabar` evalúa la implementación actual (cotizador.py) sobre una grilla
+exhaustiva de entradas y guarda las salidas en un .npz comprimido, con los
+montos en céntimos enteros y los planes y campañas como índices:
+
+- Recomendador: distritos x sexos x edades del titular x afiliados x continuidad
+- Calculadora: fechas x planes x edades x parentescos x continuidad, y para
+  cada asegurado las cuotas y tasas de financiamiento
+
+`comparar` evalúa una implementación candidata sobre la misma grilla,
+repartida entre procesos, y reporta las primeras divergencias de cada salida.
+El candidato es un módulo que redefine cualquiera de FUNCIONES_CANDIDATAS
+(o las auxiliares de cotizador.py que estas usan); lo que no redefine se
+toma de cotizador.py. En cada proceso las funciones del candidato se
+inyectan en cotizador, así una redefinición de obtener_tarifa_base también
+llega a cotizar_asegurado y al resto de las salidas. Para reutilizar la
+original dentro del candidato, se importa por nombre (from cotizador import
+obtener_tarifa_base as original), no como cotizador.obtener_tarifa_base.
+
+    python corpus_dorado.py grabar corpus_dorado.npz
+    python corpus_dorado.py comparar corpus_dorado.npz --candidato cotizador_rapido
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import centimos
+import cotizador
+from cotizador import PLANES, SEXOS, DISTRITOS, EDAD_MIN_TITULAR, EDAD_MAX_TITULAR, MAX_AFILIADOS
+
+FUNCIONES_CANDIDATAS = [
+    'normalizar_distrito', 'recomendar_plan', 'ajustar_plan_por_edad', 'obtener_planes_alternativos',
+    'obtener_tarifa_base', 'aplicar_descuento_campana', 'cotizar_asegurado', 'resumir_cotizacion',
+]
+
+CONTINUIDAD = ["No", "Sí"]
+RELACIONES = ["Titular", "Cónyuge", "Hijo", "Otro"]
+EDAD_MAX_CALCULADORA = 100
+CUOTAS = [1, 4, 6, 10, 12]
+TASAS = [0.0, 0.04]
+ARCHIVOS_DATOS = ['tarifario_base.csv', 'campanas.csv']
+
+SIN_VALOR = -1
+CAMPANA_DESCONOCIDA = -2
+
+# Ejes de cada salida, en el orden de sus dimensiones
+EJES = {
+    'rec_plan': ['distrito', 'sexo', 'edad_titular', 'afiliados', 'continuidad'],
+    'rec_ajustado': ['distrito', 'sexo', 'edad_titular', 'afiliados', 'continuidad'],
+    'rec_segunda': ['distrito', 'sexo', 'edad_titular', 'afiliados', 'continuidad'],
+    'rec_tercera': ['distrito', 'sexo', 'edad_titular', 'afiliados', 'continuidad'],
+    'cal_base': ['plan', 'edad', 'relacion'],
+    'cal_descuento': ['fecha', 'plan', 'edad', 'relacion', 'continuidad'],
+    'cal_pct': ['fecha', 'plan', 'edad', 'relacion', 'continuidad'],
+    'cal_campana': ['fecha', 'plan', 'edad', 'relacion', 'continuidad'],
+    'cal_final': ['fecha', 'plan', 'edad', 'relacion', 'continuidad'],
+    'cal_cuota': ['fecha', 'plan', 'edad', 'relacion', 'continuidad', 'cuotas', 'tasa'],
+    'cal_financiado': ['fecha', 'plan', 'edad', 'relacion', 'continuidad', 'cuotas', 'tasa'],
+}
+
+# ==================== GRILLA ====================
+
+def fechas_por_defecto(df_campanas):
+    """
+    Fechas que cubren cada borde de vigencia de las campañas: el día previo
+    al inicio, el inicio, el fin y el día siguiente al fin
+    """
+    if df_campanas is None or df_campanas.empty:
+        return [datetime(2000, 1, 1)]
+    fechas = set()
+    for inicio, fin in zip(df_campanas['Fecha_Inicio'], df_campanas['Fecha_Fin']):
+        inicio, fin = inicio.to_pydatetime(), fin.to_pydatetime()
+        fechas.update([inicio - timedelta(days=1), inicio, fin, fin + timedelta(days=1)])
+    return sorted(fechas)
+
+def crear_grilla(fechas):
+    """Valores de cada eje de la grilla (se guardan en el corpus)"""
+    return {
+        'distrito': DISTRITOS,
+        'sexo': SEXOS,
+        'edad_titular': list(range(EDAD_MIN_TITULAR, EDAD_MAX_TITULAR + 1)),
+        'afiliados': list(range(1, MAX_AFILIADOS + 1)),
+        'continuidad': CONTINUIDAD,
+        'fecha': [f.isoformat() for f in fechas],
+        'plan': PLANES,
+        'edad': list(range(EDAD_MAX_CALCULADORA + 1)),
+        'relacion': RELACIONES,
+        'cuotas': CUOTAS,
+        'tasa': TASAS,
+    }
+
+def firma_datos(directorio="."):
+    """Hash de los CSV de referencia, para advertir si el corpus se grabó con otros datos"""
+    h = hashlib.sha256()
+    for nombre in ARCHIVOS_DATOS:
+        ruta = os.path.join(directorio, nombre)
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+def nombres_campanas(df_campanas):
+    """Nombres de campaña en el orden del archivo (la salida cal_campana guarda su índice)"""
+    return [] if df_campanas is None or df_campanas.empty else df_campanas['Nombre'].tolist()
+
+# ==================== EVALUACIÓN (PROCESOS) ====================
+
+_trabajo = {}
+
+def inyectar_candidato(modulo):
+    """
+    Reemplaza en cotizador las funciones que el candidato define, para que
+    las llamadas internas de cotizador también usen las del candidato
+
+    Retorna: nombres reemplazados
+    """
+    reemplazadas = []
+    for nombre, valor in vars(modulo).items():
+        if (callable(valor) and getattr(valor, '__module__', None) == modulo.__name__
+                and callable(getattr(cotizador, nombre, None))):
+            setattr(cotizador, nombre, valor)
+            reemplazadas.append(nombre)
+    return reemplazadas
+
+def _inicializar(nombre_candidato, grilla):
+    """Carga datos e implementación una vez por proceso"""
+    if nombre_candidato:
+        inyectar_candidato(importlib.import_module(nombre_candidato))
+    implementacion = {nombre: getattr(cotizador, nombre) for nombre in FUNCIONES_CANDIDATAS}
+    df_campanas = cotizador.cargar_campanas()
+    _trabajo.update({
+        'f': implementacion,
+        'grilla': grilla,
+        'df_tarifas': cotizador.cargar_tarifas(),
+        'df_campanas': df_campanas,
+        'campanas': nombres_campanas(df_campanas),
+    })
+
+def _indice_plan(plan):
+    return PLANES.index(plan) if plan in PLANES else SIN_VALOR
+
+def _evaluar_recomendador(d):
+    """Salidas del recomendador para el distrito de índice d"""
+    f, g = _trabajo['f'], _trabajo['grilla']
+    forma = (len(g['sexo']), len(g['edad_titular']), len(g['afiliados']), len(g['continuidad']))
+    salidas = {nombre: np.full(forma, SIN_VALOR, dtype=np.int8)
+               for nombre in ['rec_plan', 'rec_ajustado', 'rec_segunda', 'rec_tercera']}
+
+    distrito = f['normalizar_distrito'](g['distrito'][d])
+    for s, sexo in enumerate(g['sexo']):
+        for e, edad in enumerate(g['edad_titular']):
+            for n, afiliados in enumerate(g['afiliados']):
+                plan = f['recomendar_plan'](distrito, sexo, edad, afiliados)
+                ajustado, _ = f['ajustar_plan_por_edad'](plan, edad)
+                for c, continuidad in enumerate(g['continuidad']):
+                    segunda, tercera = f['obtener_planes_alternativos'](ajustado, edad, continuidad)
+                    salidas['rec_plan'][s, e, n, c] = _indice_plan(plan)
+                    salidas['rec_ajustado'][s, e, n, c] = _indice_plan(ajustado)
+                    salidas['rec_segunda'][s, e, n, c] = _indice_plan(segunda)
+                    salidas['rec_tercera'][s, e, n, c] = _indice_plan(tercera)
+    return salidas
+
+def _evaluar_calculadora(p):
+    """Salidas de la calculadora para el plan de índice p"""
+    f, g = _trabajo['f'], _trabajo['grilla']
+    df_tarifas, df_campanas, campanas = _trabajo['df_tarifas'], _trabajo['df_campanas'], _trabajo['campanas']
+    plan = g['plan'][p]
+    fechas = [datetime.fromisoformat(x) for x in g['fecha']]
+    nf, ne, nr, nc = len(fechas), len(g['edad']), len(g['relacion']), len(g['continuidad'])
+
+    salidas = {'cal_base': np.full((ne, nr), SIN_VALOR, dtype=np.int64)}
+    for nombre, dtype in [('cal_descuento', np.int64), ('cal_pct', np.int32),
+                          ('cal_campana', np.int16), ('cal_final', np.int64)]:
+        salidas[nombre] = np.full((nf, ne, nr, nc), SIN_VALOR, dtype=dtype)
+    for nombre in ['cal_cuota', 'cal_financiado']:
+        salidas[nombre] = np.full((nf, ne, nr, nc, len(g['cuotas']), len(g['tasa'])), SIN_VALOR, dtype=np.int64)
+
+    for e, edad in enumerate(g['edad']):
+        for r, relacion in enumerate(g['relacion']):
+            tarifa_base = f['obtener_tarifa_base'](df_tarifas, plan, edad, relacion == "Hijo")
+            if not tarifa_base:
+                continue
+            salidas['cal_base'][e, r] = centimos.a_centimos(tarifa_base)
+
+            for i, fecha in enumerate(fechas):
+                for c, continuidad in enumerate(g['continuidad']):
+                    pct, campana = f['aplicar_descuento_campana'](df_campanas, plan, continuidad, fecha)
+                    salidas['cal_descuento'][i, e, r, c] = centimos.aplicar_descuento(
+                        centimos.a_centimos(tarifa_base), pct
+                    )
+                    salidas['cal_pct'][i, e, r, c] = centimos.a_puntos_basicos(pct)
+                    if campana is not None:
+                        salidas['cal_campana'][i, e, r, c] = (
+                            campanas.index(campana) if campana in campanas else CAMPANA_DESCONOCIDA
+                        )
+
+                    asegurado = f['cotizar_asegurado'](
+                        df_tarifas, df_campanas, plan, relacion, edad, continuidad, fecha
+                    )
+                    if asegurado is None:
+                        continue
+                    salidas['cal_final'][i, e, r, c] = centimos.a_centimos(asegurado['tarifa_final'])
+                    for k, cuotas in enumerate(g['cuotas']):
+                        for t, tasa in enumerate(g['tasa']):
+                            cotizacion = f['resumir_cotizacion'](plan, [asegurado], cuotas, tasa, continuidad)
+                            salidas['cal_cuota'][i, e, r, c, k, t] = centimos.a_centimos(cotizacion['cuota_mensual'])
+                            salidas['cal_financiado'][i, e, r, c, k, t] = centimos.a_centimos(
+                                cotizacion['total_financiado']
+                            )
+    return salidas
+
+def _evaluar(tarea):
+    tipo, indice = tarea
+    if tipo == 'recomendador':
+        return tipo, indice, _evaluar_recomendador(indice)
+    return tipo, indice, _evaluar_calculadora(indice)
+
+def evaluar(grilla, nombre_candidato=None, procesos=None):
+    """
+    Evalúa una implementación sobre toda la grilla
+
+    Parámetros:
+    - grilla: ejes de la grilla (ver crear_grilla)
+    - nombre_candidato: módulo candidato importable, o None para cotizador.py
+    - procesos: procesos de trabajo (por defecto, uno por CPU)
+
+    Retorna: diccionario de salidas
+    """
+    # Un plan o distrito por tarea; los planes primero porque son las más largas
+    tareas = [('calculadora', p) for p in range(len(grilla['plan']))]
+    tareas += [('recomendador', d) for d in range(len(grilla['distrito']))]
+
+    partes = {'recomendador': {}, 'calculadora': {}}
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar,
+                             initargs=(nombre_candidato, grilla)) as pool:
+        for tipo, indice, salidas in pool.map(_evaluar, tareas):
+            partes[tipo][indice] = salidas
+
+    resultado = {}
+    for tipo, eje in [('recomendador', 'distrito'), ('calculadora', 'plan')]:
+        bloques = [partes[tipo][i] for i in range(len(grilla[eje]))]
+        for nombre in bloques[0]:
+            # El eje repartido va primero salvo en las salidas por fecha
+            eje_apilado = 1 if EJES[nombre][0] == 'fecha' else 0
+            resultado[nombre] = np.stack([b[nombre] for b in bloques], axis=eje_apilado)
+    return resultado
+
+# ==================== ARCHIVO DEL CORPUS ====================
+
+def guardar_corpus(ruta, salidas, grilla, campanas):
+    metadatos = {
+        'grabado': datetime.now().isoformat(timespec='seconds'),
+        'firma_datos': firma_datos(),
+        'grilla': grilla,
+        'campanas': campanas,
+        'ejes': EJES,
+    }
+    np.savez_compressed(ruta, _metadatos=np.array(json.dumps(metadatos, ensure_ascii=False)), **salidas)
+
+def cargar_corpus(ruta):
+    """Retorna (salidas, metadatos)"""
+    with np.load(ruta, allow_pickle=False) as datos:
+        metadatos = json.loads(str(datos['_metadatos']))
+        salidas = {nombre: datos[nombre] for nombre in datos.files if nombre != '_metadatos'}
+    return salidas, metadatos
+
+# ==================== COMPARACIÓN ====================
+
+def _describir_valor(nombre, valor, campanas):
+    """Valor legible de una salida codificada"""
+    if valor == SIN_VALOR:
+        return "—"
+    if nombre.startswith('rec_'):
+        return PLANES[valor]
+    if nombre == 'cal_pct':
+        return f"{valor / 100:g}%"
+    if nombre == 'cal_campana':
+        return campanas[valor] if valor >= 0 else "(campaña desconocida)"
+    return f"S/ {valor / centimos.CENTIMOS:,.2f}"
+
+def comparar(esperado, obtenido, metadatos, maximo=10):
+    """
+    Compara salida por salida
+
+    Retorna: lista de (nombre, divergencias, total, [(entradas, esperado, obtenido)])
+    """
+    grilla, campanas = metadatos['grilla'], metadatos['campanas']
+    reporte = []
+    for nombre, ejes in metadatos['ejes'].items():
+        a, b = esperado[nombre], obtenido[nombre]
+        if a.shape != b.shape:
+            raise ValueError(f"La salida {nombre} tiene forma {b.shape}, el corpus {a.shape}")
+        distintos = np.flatnonzero(a != b)
+        ejemplos = []
+        for plano in distintos[:maximo]:
+            indices = np.unravel_index(plano, a.shape)
+            entradas = {eje: grilla[eje][i] for eje, i in zip(ejes, indices)}
+            ejemplos.append((
+                entradas,
+                _describir_valor(nombre, int(a.flat[plano]), campanas),
+                _describir_valor(nombre, int(b.flat[plano]), campanas),
+            ))
+        reporte.append((nombre, len(distintos), a.size, ejemplos))
+    return reporte
+
+def imprimir_reporte(reporte):
+    total_divergencias = 0
+    for nombre, divergencias, total, ejemplos in reporte:
+        total_divergencias += divergencias
+        estado = "OK" if divergencias == 0 else f"{divergencias} divergencias"
+        print(f"{nombre:<16} {total:>9} casos  {estado}")
+        for entradas, esperado, obtenido in ejemplos:
+            detalle = ", ".join(f"{eje}={valor}" for eje, valor in entradas.items())
+            print(f"    {detalle}: esperado {esperado}, obtenido {obtenido}")
+    return total_divergencias
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus dorado del recomendador y la calculadora")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_grabar = sub.add_parser("grabar", help="Graba las salidas de cotizador.py")
+    p_grabar.add_argument("corpus", help="Archivo .npz de salida")
+    p_grabar.add_argument("--fechas", nargs="+", help="Fechas de cotización AAAA-MM-DD (por defecto, bordes de campañas)")
+    p_comparar = sub.add_parser("comparar", help="Compara una implementación candidata contra el corpus")
+    p_comparar.add_argument("corpus")
+    p_comparar.add_argument("--candidato", help="Módulo que redefine funciones de cotizador.py")
+    p_comparar.add_argument("--maximo", type=int, default=10, help="Divergencias a mostrar por salida")
+    for p in (p_grabar, p_comparar):
+        p.add_argument("--procesos", type=int, help="Procesos de trabajo (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    # Los módulos candidatos se importan desde el directorio actual
+    sys.path.insert(0, os.getcwd())
+    inicio = time.perf_counter()
+
+    if args.comando == "grabar":
+        if args.fechas:
+            fechas = [datetime.fromisoformat(f) for f in args.fechas]
+        else:
+            fechas = fechas_por_defecto(cotizador.cargar_campanas())
+        grilla = crear_grilla(fechas)
+        salidas = evaluar(grilla, procesos=args.procesos)
+        guardar_corpus(args.corpus, salidas, grilla, nombres_campanas(cotizador.cargar_campanas()))
+        casos = sum(s.size for s in salidas.values())
+        kb = os.path.getsize(args.corpus) / 1024
+        print(f"{casos} salidas grabadas en {time.perf_counter() - inicio:.1f} s -> {args.corpus} ({kb:.0f} KB)")
+        return
+
+    esperado, metadatos = cargar_corpus(args.corpus)
+    if metadatos['firma_datos'] != firma_datos():
+        print("⚠️ Los CSV de tarifas o campañas cambiaron desde que se grabó el corpus")
+    obtenido = evaluar(metadatos['grilla'], args.candidato, args.procesos)
+    divergencias = imprimir_reporte(comparar(esperado, obtenido, metadatos, args.maximo))
+    print(f"\n{divergencias} divergencias en {time.perf_counter() - inicio:.1f} s")
+    if divergencias:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+Lógica de tarificación compartida entre la app y las herramientas por lotes
+(carga de tarifario y campañas, validaciones, tarifas, descuentos y cuotas).
+"""
+import numpy as np
+import pandas as pd
+import unicodedata
+from datetime import datetime
+
+import os
+
+import centimos
+import metricas
+
+# ==================== TABLAS DE REFERENCIA ====================
+
+PLANES = ['MINT', 'MNAC', 'MSLD', 'AM05', 'AM18', 'AM17', 'AM15']
+NOMBRES_PLANES = {
+    'MINT': 'Medicvida Internacional', 'MNAC': 'Medicvida Nacional', 'MSLD': 'Multisalud',
+    'AM05': 'Multisalud Base', 'AM18': 'Multisalud Base', 'AM17': 'Salud Esencial Plus', 'AM15': 'Salud Esencial'
+}
+# Edad máxima de ingreso sin continuidad (con continuidad no hay límite), en el orden de la tabla de Recursos
+EDAD_MAXIMA_SIN_CONTINUIDAD = {
+    'MSLD': 65, 'MINT': 65, 'MNAC': 65, 'AM05': 65, 'AM18': 60, 'AM17': 60, 'AM15': 60
+}
+SEXOS = ["Masculino", "Femenino"]
+
+# Distritos del formulario del recomendador
+DISTRITOS = [
+    "Santiago de Surco", "Miraflores", "San Isidro", "San Juan de Lurigancho", 
+    "La Molina", "Cercado de Lima", "Jesús María", "San Juan de Miraflores",
+    "San Borja", "Magdalena del Mar", "Pueblo Libre", "Otro"
+]
+DISTRITOS_MAPEO_ESPECIAL = {"Cercado de Lima": "LIMA"}
+
+# Grupos de distritos usados por la regla de recomendación (0 = resto)
+DISTRITOS_GRUPO_1 = ["MIRAFLORES", "SAN ISIDRO", "LA MOLINA", "SANTIAGO DE SURCO"]
+DISTRITOS_GRUPO_2 = ["LOS OLIVOS", "SAN JUAN DE LURIGANCHO", "SAN JUAN DE MIRAFLORES"]
+
+EDAD_MIN_TITULAR = 18
+EDAD_MAX_TITULAR = 90
+MAX_AFILIADOS = 10
+
+# Orden en que se busca un plan que admita la edad cuando el recomendado no la admite
+PLANES_AJUSTE_EDAD = ['AM15', 'AM17', 'AM18', 'AM05', 'MSLD', 'MNAC', 'MINT']
+
+# ==================== FUNCIONES DE TARIFICACIÓN ====================
+
+def normalizar_texto(texto):
+    """Normaliza texto eliminando tildes y convirtiendo a mayúsculas"""
+    texto_sin_tildes = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+    return texto_sin_tildes.upper()
+
+def referencia_configurada():
+    """Base de referencia SQLite si SRP_REFERENCIA_DB está definido (ver referencia.py), o None"""
+    ruta = os.environ.get("SRP_REFERENCIA_DB")
+    if not ruta or not os.path.exists(ruta):
+        return None
+    from referencia import abrir_referencia
+    return abrir_referencia(ruta)
+
+def cargar_tarifas(errores=None):
+    """
+    Carga las tarifas base desde la base de referencia o el archivo CSV
+
+    Parámetros:
+    - errores: lista opcional donde se agrega el motivo si no se pudo cargar
+
+    Retorna: DataFrame de tarifas, o None si no se pudo cargar
+    """
+    if errores is None:
+        errores = []
+    try:
+        referencia = referencia_configurada()
+        if referencia is not None:
+            with metricas.CARGA_DATOS.medir('referencia.db'):
+                df_tarifas = referencia.df_tarifas()
+        else:
+            with metricas.CARGA_DATOS.medir('tarifario_base.csv'):
+                df_tarifas = pd.read_csv('tarifario_base.csv')
+        # Validar columnas requeridas
+        columnas_requeridas = ['RangoEtario']
+        for col in columnas_requeridas:
+            if col not in df_tarifas.columns:
+                errores.append(f"⚠️ Falta la columna '{col}' en el tarifario")
+                return None
+        return df_tarifas
+    except FileNotFoundError:
+        errores.append("⚠️ No se encontró el archivo 'tarifario_base.csv'")
+        return None
+    except Exception as e:
+        errores.append(f"⚠️ Error al cargar tarifas: {str(e)}")
+        return None
+
+def cargar_campanas():
+    """Carga las campañas activas desde la base de referencia, el archivo CSV o retorna campañas por defecto"""
+    referencia = referencia_configurada()
+    if referencia is not None:
+        with metricas.CARGA_DATOS.medir('referencia.db'):
+            return referencia.df_campanas()
+    try:
+        with metricas.CARGA_DATOS.medir('campanas.csv'):
+            df_campanas = pd.read_csv('campanas.csv')
+            # Convertir columnas de fecha si existen
+            if 'Fecha_Inicio' in df_campanas.columns:
+                df_campanas['Fecha_Inicio'] = pd.to_datetime(df_campanas['Fecha_Inicio'])
+            if 'Fecha_Fin' in df_campanas.columns:
+                df_campanas['Fecha_Fin'] = pd.to_datetime(df_campanas['Fecha_Fin'])
+        return df_campanas
+    except:
+        # Campañas por defecto si no existe el archivo
+        return pd.DataFrame({
+            'Nombre': ['Campaña ESENCIAL', 'Campaña CONTINUIDAD'],
+            'Fecha_Inicio': [datetime(2024, 10, 20), datetime(2024, 10, 20)],
+            'Fecha_Fin': [datetime(2024, 11, 30), datetime(2024, 11, 30)],
+            'Tipo_Campana': ['General', 'Continuidad'],
+            'MSLD': [33, 15], 'AM18': [33, 15],
+            'MINT': [25, 15], 'MNAC': [25, 15], 'AM05': [25, 15],
+            'AM15': [25, 15], 'AM17': [25, 15]
+        })
+
+def validar_edad_sin_continuidad(plan, edad):
+    """
+    Valida si la edad es aceptable para el plan cuando NO hay continuidad
+    
+    Restricciones sin continuidad:
+    - MSLD, MINT, MNAC, AM05: máximo 65 años
+    - AM18, AM17, AM15: máximo 60 años
+    
+    Retorna: (es_valido, mensaje)
+    """
+    edad_maxima = EDAD_MAXIMA_SIN_CONTINUIDAD.get(plan)
+    
+    if edad_maxima is not None and edad > edad_maxima:
+        return False, f"⚠️ Sin continuidad, la edad máxima para {plan} es {edad_maxima} años"
+    
+    # Para otros planes o con continuidad, no hay restricción
+    return True, ""
+
+def tabla_validaciones():
+    """Filas de la tabla de restricciones de edad que muestra Recursos"""
+    return [{
+        'Plan': plan,
+        'Nombre Comercial': NOMBRES_PLANES.get(plan, plan),
+        'Edad Máxima (Sin Continuidad)': edad_maxima,
+        'Edad Máxima (Con Continuidad)': 'Sin límite'
+    } for plan, edad_maxima in EDAD_MAXIMA_SIN_CONTINUIDAD.items()]
+
+def ajustar_plan_por_edad(plan, edad):
+    """
+    Reemplaza el plan si no admite la edad sin continuidad, por el primer
+    plan de PLANES_AJUSTE_EDAD que sí la admite
+    
+    Retorna: (plan_ajustado, mensaje_error); el mensaje es "" si el plan era válido
+    """
+    es_valido, mensaje_error = validar_edad_sin_continuidad(plan, edad)
+    if es_valido:
+        return plan, ""
+    
+    for plan_alt in PLANES_AJUSTE_EDAD:
+        es_valido_alt, _ = validar_edad_sin_continuidad(plan_alt, edad)
+        if es_valido_alt:
+            return plan_alt, mensaje_error
+    return plan, mensaje_error
+
+def obtener_planes_alternativos(plan_principal, edad, tiene_continuidad):
+    """
+    Obtiene planes alternativos válidos según la edad y continuidad
+    
+    Retorna: (segunda_opcion, tercera_opcion)
+    """
+    # Definir todas las opciones posibles
+    if plan_principal == "MNAC":
+        opciones = ["MSLD", "AM15", "MINT"]
+    elif plan_principal == "MSLD":
+        opciones = ["AM15", "AM05", "MNAC"]
+    elif plan_principal == "AM15":
+        opciones = ["AM17", "AM05", "MSLD"]
+    elif plan_principal == "MINT":
+        opciones = ["MNAC", "MSLD", "AM05"]
+    else:
+        opciones = ["MSLD", "AM15", "AM05"]
+    
+    # Filtrar opciones válidas según continuidad y edad
+    opciones_validas = []
+    for plan in opciones:
+        es_valido, _ = validar_edad_sin_continuidad(plan, edad)
+        if tiene_continuidad == "Sí" or es_valido:
+            opciones_validas.append(plan)
+    
+    # Retornar las dos primeras opciones válidas (o None si no hay)
+    segunda = opciones_validas[0] if len(opciones_validas) > 0 else None
+    tercera = opciones_validas[1] if len(opciones_validas) > 1 else None
+    
+    return segunda, tercera
+
+def rango_etario(edad, es_hijo=False):
+    """Retorna el RangoEtario del tarifario que corresponde a la edad"""
+    if es_hijo:
+        if edad <= 17:
+            return 'Hijos 0 - 17 años'
+        elif edad <= 25:
+            return 'Hijos 18 - 25 años'
+        elif edad == 26:
+            return 'Hijos 26 años'
+        # Para hijos mayores de 26 años, usar la edad específica
+        return f'{edad} años'
+    
+    if edad <= 17:
+        return '0 - 17 años'
+    elif edad <= 25:
+        return '18 - 25 años'
+    return f'{edad} años'
+
+def obtener_tarifa_base(df_tarifas, plan, edad, es_hijo=False):
+    """
+    Obtiene la tarifa base según plan, edad y si es hijo
+    
+    Parámetros:
+    - df_tarifas: DataFrame con las tarifas
+    - plan: Código del plan (MINT, MNAC, etc.)
+    - edad: Edad del asegurado
+    - es_hijo: Boolean indicando si es hijo o titular
+    
+    Retorna: Tarifa base anual, o None si el plan o el rango no tienen tarifa
+    (el motivo se cuenta en metricas.TARIFAS_NO_ENCONTRADAS)
+    """
+    if df_tarifas is None:
+        return None
+    
+    # Tarifario cargado de la base de referencia: consulta por (plan, rango)
+    referencia = referencia_configurada()
+    if referencia is not None and referencia.es_fuente(df_tarifas):
+        tarifa, motivo = referencia.tarifa(plan, rango_etario(edad, es_hijo))
+        if motivo is not None:
+            metricas.TARIFAS_NO_ENCONTRADAS.inc(plan, motivo)
+            return None
+        return float(tarifa)
+    
+    # Validar que el plan existe en el tarifario
+    if plan not in df_tarifas.columns:
+        metricas.TARIFAS_NO_ENCONTRADAS.inc(plan, 'plan_inexistente')
+        return None
+    
+    rango = rango_etario(edad, es_hijo)
+    
+    # Buscar la tarifa en el DataFrame
+    try:
+        fila = df_tarifas[df_tarifas['RangoEtario'] == rango]
+        if not fila.empty and plan in fila.columns:
+            tarifa = fila[plan].values[0]
+            if pd.notna(tarifa):
+                return float(tarifa)
+            metricas.TARIFAS_NO_ENCONTRADAS.inc(plan, 'sin_valor')
+            return None
+        metricas.TARIFAS_NO_ENCONTRADAS.inc(plan, 'sin_rango')
+        return None
+    except Exception:
+        metricas.TARIFAS_NO_ENCONTRADAS.inc(plan, 'error')
+        return None
+
+def aplicar_descuento_campana(df_campanas, plan, tiene_continuidad, fecha=None):
+    """
+    Busca el descuento de la campaña vigente según si tiene continuidad o no
+    
+    Parámetros:
+    - fecha: fecha de la cotización (por defecto, ahora)
+    
+    Retorna: (porcentaje_descuento, nombre_campana). La prima con descuento
+    se calcula en céntimos con centimos.aplicar_descuento (ver cotizar_asegurado)
+    """
+    if df_campanas is None or df_campanas.empty:
+        metricas.CAMPANAS_APLICADAS.inc('Continuidad' if tiene_continuidad == "Sí" else 'General', 'sin_campana')
+        return 0, None
+    
+    fecha_actual = fecha if fecha is not None else datetime.now()
+    
+    # Determinar el tipo de campaña a buscar
+    tipo_campana = 'Continuidad' if tiene_continuidad == "Sí" else 'General'
+    
+    referencia = referencia_configurada()
+    if referencia is not None and referencia.es_fuente(df_campanas):
+        # Campañas cargadas de la base de referencia: consulta por (tipo, vigencia)
+        def campana_vigente(tipo):
+            return referencia.campana_vigente(tipo, plan, fecha_actual)
+    else:
+        def campana_vigente(tipo):
+            campanas_vigentes = df_campanas[
+                (df_campanas['Fecha_Inicio'] <= fecha_actual) & 
+                (df_campanas['Fecha_Fin'] >= fecha_actual) &
+                (df_campanas['Tipo_Campana'] == tipo)
+            ]
+            if campanas_vigentes.empty:
+                return None
+            # Tomar la primera campaña vigente
+            campana = campanas_vigentes.iloc[0]
+            descuento = campana[plan] if plan in campana and pd.notna(campana[plan]) else None
+            return campana['Nombre'], descuento
+    
+    # Buscar la campaña vigente del tipo correspondiente
+    vigente = campana_vigente(tipo_campana)
+    resultado = 'campana'
+    
+    # Si no hay campaña específica de continuidad, buscar campaña general
+    if vigente is None and tipo_campana == 'Continuidad':
+        resultado = 'respaldo_general'
+        vigente = campana_vigente('General')
+    
+    if vigente is None:
+        metricas.CAMPANAS_APLICADAS.inc(tipo_campana, 'sin_campana')
+        return 0, None
+    
+    metricas.CAMPANAS_APLICADAS.inc(tipo_campana, resultado)
+    
+    nombre, descuento = vigente
+    if descuento is not None:
+        return float(descuento), nombre
+    
+    return 0, nombre
+
+
+def cotizar_asegurado(df_tarifas, df_campanas, plan, relacion, edad, tiene_continuidad, fecha=None):
+    """
+    Calcula la prima de un asegurado aplicando la campaña vigente a la fecha
+    (por defecto, ahora)
+    
+    Los montos se calculan en céntimos exactos (ver centimos.py) y se
+    devuelven en soles.
+    
+    Retorna: diccionario con relacion, edad, tarifa_base, descuento_pct,
+    tarifa_final y campana, o None si no hay tarifa para la edad
+    """
+    es_hijo = (relacion == "Hijo")
+    tarifa_base = obtener_tarifa_base(df_tarifas, plan, edad, es_hijo)
+    
+    if not tarifa_base:
+        return None
+    
+    desc_pct, campana = aplicar_descuento_campana(df_campanas, plan, tiene_continuidad, fecha)
+    
+    base_centimos = int(centimos.a_centimos(tarifa_base))
+    final_centimos = int(centimos.aplicar_descuento(base_centimos, desc_pct))
+    
+    return {
+        'relacion': relacion,
+        'edad': edad,
+        'tarifa_base': base_centimos / centimos.CENTIMOS,
+        'descuento_pct': desc_pct,
+        'tarifa_final': final_centimos / centimos.CENTIMOS,
+        'campana': campana
+    }
+
+def generar_plan_pagos(total_prima, tasa_interes, num_cuotas):
+    """
+    Genera la tabla de amortización exacta de la prima financiada
+    
+    La última cuota se ajusta para que el saldo termine en 0.
+    
+    Retorna: lista de diccionarios con cuota, pago, capital, interes y saldo (en soles)
+    """
+    pago, capital, interes, saldo = centimos.plan_pagos(
+        centimos.a_centimos(total_prima), tasa_interes, num_cuotas
+    )
+    
+    return [{
+        'cuota': i + 1,
+        'pago': int(pago[0, i]) / centimos.CENTIMOS,
+        'capital': int(capital[0, i]) / centimos.CENTIMOS,
+        'interes': int(interes[0, i]) / centimos.CENTIMOS,
+        'saldo': int(saldo[0, i]) / centimos.CENTIMOS
+    } for i in range(num_cuotas)]
+
+def resumir_cotizacion(plan, asegurados, num_cuotas, tasa_interes, tiene_continuidad):
+    """
+    Arma la cotización completa a partir de los asegurados ya tarificados
+    
+    Los totales se suman en céntimos, sin arrastrar error de punto flotante.
+    
+    Retorna: diccionario con asegurados, totales, campaña aplicada y plan de pagos
+    """
+    total_base = int(centimos.a_centimos([a['tarifa_base'] for a in asegurados]).sum())
+    total_prima = int(centimos.a_centimos([a['tarifa_final'] for a in asegurados]).sum())
+    
+    if num_cuotas > 1:
+        pagos = generar_plan_pagos(total_prima / centimos.CENTIMOS, tasa_interes, num_cuotas)
+        cuota_mensual = int(centimos.calcular_cuotas(total_prima, tasa_interes, num_cuotas))
+        total_financiado = int(centimos.a_centimos([p['pago'] for p in pagos]).sum())
+    else:
+        pagos = []
+        cuota_mensual = total_financiado = total_prima
+    
+    campana = None
+    if asegurados and asegurados[0]['descuento_pct'] > 0:
+        campana = asegurados[0]['campana']
+    
+    return {
+        'plan': plan,
+        'tiene_continuidad': tiene_continuidad,
+        'num_cuotas': num_cuotas,
+        'tasa_interes': tasa_interes,
+        'asegurados': asegurados,
+        'total_base': total_base / centimos.CENTIMOS,
+        'total_prima': total_prima / centimos.CENTIMOS,
+        'cuota_mensual': cuota_mensual / centimos.CENTIMOS,
+        'total_financiado': total_financiado / centimos.CENTIMOS,
+        'costo_financiamiento': (total_financiado - total_prima) / centimos.CENTIMOS,
+        'campana': campana,
+        'pagos': pagos
+    }
+
+def cotizar_familia(df_tarifas, df_campanas, plan, integrantes, num_cuotas, tasa_interes, tiene_continuidad, fecha=None):
+    """
+    Cotiza una familia completa
+    
+    Parámetros:
+    - integrantes: lista de tuplas (relacion, edad), el titular primero
+    - fecha: fecha de la cotización (por defecto, ahora)
+    
+    Retorna: (cotizacion, integrantes_sin_tarifa)
+    """
+    asegurados = []
+    sin_tarifa = []
+    
+    for relacion, edad in integrantes:
+        asegurado = cotizar_asegurado(df_tarifas, df_campanas, plan, relacion, edad, tiene_continuidad, fecha)
+        if asegurado:
+            asegurados.append(asegurado)
+        else:
+            sin_tarifa.append((relacion, edad))
+    
+    cotizacion = resumir_cotizacion(plan, asegurados, num_cuotas, tasa_interes, tiene_continuidad)
+    return cotizacion, sin_tarifa
+
+# ==================== RECOMENDACIÓN ====================
+
+def normalizar_distrito(distrito_display):
+    """Convierte el distrito del formulario al nombre que usa la regla de recomendación"""
+    if distrito_display in DISTRITOS_MAPEO_ESPECIAL:
+        return DISTRITOS_MAPEO_ESPECIAL[distrito_display]
+    return normalizar_texto(distrito_display)
+
+def grupo_distrito(distrito):
+    """Retorna el grupo de la regla de recomendación para un distrito normalizado"""
+    if distrito in DISTRITOS_GRUPO_1:
+        return 1
+    if distrito in DISTRITOS_GRUPO_2:
+        return 2
+    return 0
+
+def recomendar_plan(distrito, sexo, edad, numero_dependientes):
+    """
+    Aplica la regla de recomendación según distrito, sexo, edad y afiliados
+    
+    Parámetros:
+    - distrito: nombre normalizado (ver normalizar_texto)
+    
+    Retorna: código del plan (sin validar la edad por continuidad)
+    """
+    plan = "MSLD"
+    grupo = grupo_distrito(distrito)
+    
+    if grupo == 1:
+        if sexo == "Masculino":
+            plan = "MNAC" if edad >= 30 else "MSLD"
+        else:
+            plan = "MNAC" if edad > 30 else "MSLD"
+    
+    elif grupo == 2:
+        if sexo == "Femenino":
+            plan = "MSLD" if numero_dependientes >= 2 else "AM15"
+        else:
+            plan = "MSLD" if edad > 35 else "AM15"
+    else:
+        if sexo == "Femenino":
+            plan = "MSLD" if edad > 30 and numero_dependientes >= 2 else "AM15"
+        else:
+            plan = "AM15" if edad < 30 else "MSLD"
+    
+    return plan
+
+def tabla_recomendaciones():
+    """
+    Precalcula la regla de recomendación para todas las entradas del formulario
+    
+    Retorna: arreglo int8 [grupo, sexo, edad - EDAD_MIN_TITULAR, afiliados - 1]
+    con el índice del plan en PLANES
+    """
+    representantes = {0: "", 1: DISTRITOS_GRUPO_1[0], 2: DISTRITOS_GRUPO_2[0]}
+    edades = range(EDAD_MIN_TITULAR, EDAD_MAX_TITULAR + 1)
+    tabla = np.empty((3, len(SEXOS), len(edades), MAX_AFILIADOS), dtype=np.int8)
+    
+    for grupo, distrito in representantes.items():
+        for s, sexo in enumerate(SEXOS):
+            for e, edad in enumerate(edades):
+                for n in range(MAX_AFILIADOS):
+                    tabla[grupo, s, e, n] = PLANES.index(recomendar_plan(distrito, sexo, edad, n + 1))
+    
+    return tabla
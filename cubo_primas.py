@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Cubo de primas precalculadas: plan × tipo de asegurado × edad × campaña.
+
+Se arma una sola vez por versión del tarifario y de las campañas. Guarda en
+céntimos la prima base de cada plan, tipo (titular/cónyuge/otro o hijo) y
+edad, y la prima final con el descuento de cada campaña del archivo (la
+posición 0 es "sin campaña"). La continuidad solo decide qué campaña aplica,
+así que se resuelve al consultar con la misma regla que
+cotizador.aplicar_descuento_campana (primera vigente del tipo, General si no
+hay de Continuidad).
+
+Comparar todos los planes para una familia es un único acceso por índice al
+cubo más la suma por plan; los montos son idénticos a los de
+cotizador.cotizar_familia con cada plan. Las cotizaciones masivas (ver
+propuestas.cotizaciones_desde_cartera) usan CuboPrimas.cotizar, que arma la
+misma cotización que cotizar_familia sin consultar el tarifario por asegurado.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import centimos
+from cotizador import NOMBRES_PLANES, cotizar_familia, rango_etario, resumir_cotizacion, validar_edad_sin_continuidad
+
+EDAD_MAX_CUBO = 100  # Máximo del formulario de la calculadora
+
+class CuboPrimas:
+    """Primas base y finales precalculadas para todos los planes"""
+
+    def __init__(self, df_tarifas, df_campanas, edad_max=EDAD_MAX_CUBO):
+        self.planes = [col for col in df_tarifas.columns if col != 'RangoEtario']
+        self._df_tarifas, self._df_campanas = df_tarifas, df_campanas
+        self.edad_max = edad_max
+        edades = range(edad_max + 1)
+
+        # Prima base [plan, tipo, edad] en céntimos; sin tarifa -> no disponible
+        primas = df_tarifas.set_index('RangoEtario')[self.planes].apply(pd.to_numeric, errors='coerce')
+        primas = primas[~primas.index.duplicated()]
+        rangos = [rango_etario(edad, es_hijo) for es_hijo in (False, True) for edad in edades]
+        valores = primas.reindex(rangos).to_numpy(dtype=np.float64).T.reshape(len(self.planes), 2, len(edades))
+        # Igual que cotizar_asegurado: una tarifa 0 o vacía no se cotiza
+        self.disponible = np.nan_to_num(valores) != 0
+        self.base = np.where(self.disponible, centimos.a_centimos(np.nan_to_num(valores)), 0)
+
+        # Descuento [campaña, plan]; la fila 0 es "sin campaña"
+        if df_campanas is None or df_campanas.empty:
+            df_campanas = pd.DataFrame(columns=['Nombre', 'Tipo_Campana', 'Fecha_Inicio', 'Fecha_Fin'])
+        self.nombres_campana = [None] + list(df_campanas['Nombre'])
+        self._tipos = df_campanas['Tipo_Campana'].to_numpy()
+        self._inicios = pd.to_datetime(df_campanas['Fecha_Inicio']).to_numpy(dtype='datetime64[ns]')
+        self._fines = pd.to_datetime(df_campanas['Fecha_Fin']).to_numpy(dtype='datetime64[ns]')
+        self.descuentos = np.zeros((len(df_campanas) + 1, len(self.planes)))
+        for j, plan in enumerate(self.planes):
+            if plan in df_campanas.columns:
+                self.descuentos[1:, j] = pd.to_numeric(df_campanas[plan], errors='coerce').fillna(0).to_numpy()
+        # Porcentaje tal como lo informa aplicar_descuento_campana: float de la campaña, o 0 si no lo define
+        self._pct_informado = [[0] * len(self.planes)] + [
+            [float(campana[plan]) if plan in campana and pd.notna(campana[plan]) else 0 for plan in self.planes]
+            for campana in df_campanas.to_dict('records')
+        ]
+
+        # Prima final [campaña, plan, tipo, edad]
+        self.final = centimos.aplicar_descuento(
+            self.base[None, :, :, :], self.descuentos[:, :, None, None]
+        )
+
+    def campana_vigente(self, tiene_continuidad, fecha=None):
+        """
+        Posición en el cubo de la campaña que aplica a la fecha (por defecto, ahora)
+
+        Retorna: índice de campaña (0 = sin campaña)
+        """
+        fecha = np.datetime64(pd.Timestamp(fecha if fecha is not None else datetime.now()), 'ns')
+        vigentes = (self._inicios <= fecha) & (self._fines >= fecha)
+        tipos = ['Continuidad', 'General'] if tiene_continuidad == "Sí" else ['General']
+        for tipo in tipos:
+            del_tipo = np.flatnonzero(vigentes & (self._tipos == tipo))
+            if del_tipo.size:
+                return int(del_tipo[0]) + 1
+        return 0
+
+    def comparar(self, integrantes, num_cuotas, tasa_interes, tiene_continuidad, fecha=None):
+        """
+        Compara todos los planes para la misma familia
+
+        Parámetros:
+        - integrantes: lista de tuplas (relacion, edad), el titular primero
+        - fecha: fecha de la cotización (por defecto, ahora)
+
+        Retorna: lista de diccionarios por plan con plan, nombre, total_base,
+        descuento_pct, total_prima, cuota_mensual, total_financiado,
+        costo_financiamiento, campana, sin_tarifa (integrantes sin tarifa) y
+        edad_valida / mensaje_edad (validación sin continuidad del titular)
+        """
+        campana = self.campana_vigente(tiene_continuidad, fecha)
+        tipos = np.array([int(relacion == "Hijo") for relacion, _ in integrantes], dtype=np.intp)
+        edades = np.array([edad for _, edad in integrantes], dtype=np.intp)
+        if (edades < 0).any() or (edades > self.edad_max).any():
+            raise ValueError(f"Edad fuera del cubo (0 a {self.edad_max})")
+
+        # Un solo acceso: [plan, integrante]
+        disponible = self.disponible[:, tipos, edades]
+        total_base = np.where(disponible, self.base[:, tipos, edades], 0).sum(axis=1)
+        total_prima = np.where(disponible, self.final[campana][:, tipos, edades], 0).sum(axis=1)
+
+        if num_cuotas > 1:
+            cuota_mensual = centimos.calcular_cuotas(total_prima, tasa_interes, num_cuotas)
+            pago, _, _, _ = centimos.plan_pagos(total_prima, tasa_interes, num_cuotas)
+            total_financiado = pago.sum(axis=1)
+        else:
+            cuota_mensual = total_financiado = total_prima
+
+        titular = integrantes[0][1] if integrantes else None
+        comparacion = []
+        for j, plan in enumerate(self.planes):
+            cotizados = int(disponible[j].sum())
+            descuento_pct = float(self.descuentos[campana, j])
+            if tiene_continuidad == "No" and titular is not None:
+                edad_valida, mensaje_edad = validar_edad_sin_continuidad(plan, titular)
+            else:
+                edad_valida, mensaje_edad = True, ""
+            comparacion.append({
+                'plan': plan,
+                'nombre': NOMBRES_PLANES.get(plan, plan),
+                'total_base': int(total_base[j]) / centimos.CENTIMOS,
+                'descuento_pct': descuento_pct,
+                'total_prima': int(total_prima[j]) / centimos.CENTIMOS,
+                'cuota_mensual': int(cuota_mensual[j]) / centimos.CENTIMOS,
+                'total_financiado': int(total_financiado[j]) / centimos.CENTIMOS,
+                'costo_financiamiento': int(total_financiado[j] - total_prima[j]) / centimos.CENTIMOS,
+                # Igual que resumir_cotizacion: la campaña se informa si hubo descuento
+                'campana': self.nombres_campana[campana] if cotizados and descuento_pct > 0 else None,
+                'sin_tarifa': len(integrantes) - cotizados,
+                'edad_valida': edad_valida,
+                'mensaje_edad': mensaje_edad
+            })
+        return comparacion
+
+    def cotizar(self, plan, integrantes, num_cuotas, tasa_interes, tiene_continuidad, fecha=None):
+        """
+        Cotiza una familia con las primas del cubo; mismo resultado que
+        cotizador.cotizar_familia (sin contar las métricas del tarifario)
+
+        Parámetros:
+        - integrantes: lista de tuplas (relacion, edad), el titular primero
+        - fecha: fecha de la cotización (por defecto, ahora)
+
+        Retorna: (cotizacion, integrantes_sin_tarifa)
+        """
+        if plan not in self.planes or any(not 0 <= edad <= self.edad_max for _, edad in integrantes):
+            # Fuera del cubo: se cotiza con el tarifario
+            return cotizar_familia(self._df_tarifas, self._df_campanas, plan, integrantes,
+                                   num_cuotas, tasa_interes, tiene_continuidad, fecha)
+
+        j = self.planes.index(plan)
+        campana = self.campana_vigente(tiene_continuidad, fecha)
+        asegurados, sin_tarifa = [], []
+        for relacion, edad in integrantes:
+            tipo = int(relacion == "Hijo")
+            if not self.disponible[j, tipo, edad]:
+                sin_tarifa.append((relacion, edad))
+                continue
+            asegurados.append({
+                'relacion': relacion,
+                'edad': edad,
+                'tarifa_base': int(self.base[j, tipo, edad]) / centimos.CENTIMOS,
+                'descuento_pct': self._pct_informado[campana][j],
+                'tarifa_final': int(self.final[campana, j, tipo, edad]) / centimos.CENTIMOS,
+                'campana': self.nombres_campana[campana]
+            })
+        cotizacion = resumir_cotizacion(plan, asegurados, num_cuotas, tasa_interes, tiene_continuidad)
+        return cotizacion, sin_tarifa
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Estado de la app publicado en memoria compartida para varios servidores.
+
+Un proceso cargador parsea el tarifario, el índice de campañas y la tabla de
+recomendaciones y los publica en un segmento de `multiprocessing.shared_memory`.
+Cada proceso de Streamlit se adjunta en modo solo lectura, sin copiar los
+datos. Las recargas crean un segmento nuevo (generación) y cambian el
+manifiesto de forma atómica (os.replace); los procesos detectan el cambio en
+su siguiente rerun y se adjuntan a la nueva generación.
+
+    python estado_compartido.py publicar --vigilar
+    SRP_ESTADO_COMPARTIDO=1 streamlit run streamlit_app.py
+
+El cargador debe seguir en ejecución: es el dueño de los segmentos.
+"""
+import argparse
+import json
+import mmap
+import os
+import signal
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from cotizador import (
+    PLANES, SEXOS, EDAD_MIN_TITULAR, EDAD_MAX_TITULAR, MAX_AFILIADOS,
+    cargar_tarifas, cargar_campanas, grupo_distrito, recomendar_plan, tabla_recomendaciones
+)
+
+RUTA_MANIFIESTO = os.environ.get(
+    "SRP_MANIFIESTO", os.path.join(tempfile.gettempdir(), "srp_estado_compartido.json")
+)
+DIRECTORIO_SHM = "/dev/shm"
+TIPOS_CAMPANA = ['General', 'Continuidad']
+
+# ==================== SERIALIZACIÓN DEL SEGMENTO ====================
+
+def _alinear(n):
+    return (n + 7) // 8 * 8
+
+def _serializar(arreglos, metadatos):
+    """
+    Empaqueta arreglos NumPy y metadatos JSON en un solo buffer
+
+    Formato: [longitud de cabecera (8 bytes)][cabecera JSON][arreglos alineados a 8],
+    con los desplazamientos de la cabecera relativos al inicio de los arreglos
+    """
+    descriptores = {}
+    desplazamiento = 0
+    for nombre, arreglo in arreglos.items():
+        descriptores[nombre] = {
+            'dtype': arreglo.dtype.str, 'shape': arreglo.shape, 'offset': desplazamiento
+        }
+        desplazamiento += _alinear(arreglo.nbytes)
+
+    cabecera = json.dumps({'arreglos': descriptores, 'metadatos': metadatos}, ensure_ascii=False).encode('utf-8')
+    inicio_datos = _alinear(8 + len(cabecera))
+
+    buffer = bytearray(inicio_datos + desplazamiento)
+    struct.pack_into('<Q', buffer, 0, len(cabecera))
+    buffer[8:8 + len(cabecera)] = cabecera
+    for nombre, arreglo in arreglos.items():
+        offset = inicio_datos + descriptores[nombre]['offset']
+        buffer[offset:offset + arreglo.nbytes] = np.ascontiguousarray(arreglo).tobytes()
+    return buffer
+
+def _deserializar(buffer):
+    """Retorna (arreglos sobre el buffer, sin copiar, y metadatos)"""
+    largo, = struct.unpack_from('<Q', buffer, 0)
+    cabecera = json.loads(bytes(buffer[8:8 + largo]).decode('utf-8'))
+    inicio_datos = _alinear(8 + largo)
+    arreglos = {}
+    for nombre, d in cabecera['arreglos'].items():
+        dtype = np.dtype(d['dtype'])
+        cantidad = int(np.prod(d['shape']))
+        arreglo = np.frombuffer(
+            buffer, dtype=dtype, count=cantidad, offset=inicio_datos + d['offset']
+        ).reshape(d['shape'])
+        arreglos[nombre] = arreglo
+    return arreglos, cabecera['metadatos']
+
+def empaquetar_estado(df_tarifas, df_campanas):
+    """Convierte tarifario, campañas y recomendaciones al buffer compartido"""
+    planes_tarifa = [col for col in df_tarifas.columns if col != 'RangoEtario']
+    arreglos = {
+        'tarifas': df_tarifas[planes_tarifa].to_numpy(dtype=np.float64),
+        'recomendaciones': tabla_recomendaciones(),
+    }
+    metadatos = {
+        'planes_tarifa': planes_tarifa,
+        'rangos': df_tarifas['RangoEtario'].tolist(),
+        'planes': PLANES,
+        'campanas': [],
+    }
+
+    if df_campanas is not None and not df_campanas.empty:
+        planes_campana = [p for p in PLANES if p in df_campanas.columns]
+        arreglos['campanas_inicio'] = df_campanas['Fecha_Inicio'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        arreglos['campanas_fin'] = df_campanas['Fecha_Fin'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        descuentos = df_campanas[planes_campana]
+        # Se conserva el entero del archivo: la página muestra "33%" igual que con los CSV, no "33.0%"
+        enteros = all(pd.api.types.is_integer_dtype(tipo) for tipo in descuentos.dtypes)
+        arreglos['campanas_descuentos'] = descuentos.to_numpy(dtype=np.int64 if enteros else np.float64)
+        metadatos['campanas'] = df_campanas['Nombre'].tolist()
+        # Se publica el texto tal cual: un tipo desconocido no se aplica, pero se sigue mostrando
+        metadatos['tipos_campana'] = [None if pd.isna(t) else str(t) for t in df_campanas['Tipo_Campana']]
+        metadatos['planes_campana'] = planes_campana
+
+    return _serializar(arreglos, metadatos)
+
+def tipos_desconocidos(df_campanas):
+    """Tipos de campaña que aplicar_descuento_campana nunca usa (para avisar al publicar)"""
+    if df_campanas is None or df_campanas.empty:
+        return []
+    return sorted({str(t) for t in df_campanas['Tipo_Campana'] if t not in TIPOS_CAMPANA})
+
+# ==================== CARGADOR (PUBLICADOR) ====================
+
+class Publicador:
+    """Publica generaciones del estado y mantiene vivo su segmento"""
+
+    def __init__(self, ruta_manifiesto=RUTA_MANIFIESTO):
+        self.ruta_manifiesto = ruta_manifiesto
+        self.generacion = 0
+        self._segmento = None
+        # El contador reinicia con el cargador; el nombre del segmento no se repite entre ejecuciones
+        self._instancia = uuid.uuid4().hex[:12]
+
+    def publicar(self, df_tarifas, df_campanas):
+        """Crea una nueva generación y la activa atómicamente en el manifiesto"""
+        buffer = empaquetar_estado(df_tarifas, df_campanas)
+        self.generacion += 1
+        nombre = f"srp_{os.getpid()}_{self._instancia}_{self.generacion}"
+        segmento = shared_memory.SharedMemory(name=nombre, create=True, size=len(buffer))
+        segmento.buf[:len(buffer)] = buffer
+
+        temporal = self.ruta_manifiesto + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump({'segmento': nombre, 'generacion': self.generacion, 'publicado': time.time()}, f)
+        os.replace(temporal, self.ruta_manifiesto)
+
+        # Los procesos ya adjuntos conservan su mapeo aunque el nombre se elimine
+        anterior, self._segmento = self._segmento, segmento
+        if anterior is not None:
+            anterior.close()
+            anterior.unlink()
+        return self.generacion
+
+    def cerrar(self):
+        if self._segmento is not None:
+            self._segmento.close()
+            self._segmento.unlink()
+            self._segmento = None
+        if os.path.exists(self.ruta_manifiesto):
+            os.remove(self.ruta_manifiesto)
+
+# ==================== PROCESOS DE LA APP (LECTORES) ====================
+
+class EstadoCompartido:
+    """
+    Vista de solo lectura sobre una generación publicada
+
+    `segmento` identifica la generación de forma única (también entre
+    reinicios del cargador); `generacion` es solo el contador para mostrar.
+    """
+
+    def __init__(self, nombre_segmento, generacion):
+        self.segmento = nombre_segmento
+        self.generacion = generacion
+        # Se mapea el segmento POSIX en modo solo lectura en lugar de usar
+        # SharedMemory, que en Python < 3.13 registra al lector en el
+        # resource_tracker y eliminaría el segmento al salir el proceso.
+        fd = os.open(os.path.join(DIRECTORIO_SHM, nombre_segmento), os.O_RDONLY)
+        try:
+            self._mapa = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+        arreglos, metadatos = _deserializar(self._mapa)
+        self.tabla_recomendaciones = arreglos['recomendaciones']
+        self.planes = metadatos['planes']
+
+        self.df_tarifas = pd.DataFrame(arreglos['tarifas'], columns=metadatos['planes_tarifa'], copy=False)
+        self.df_tarifas.insert(0, 'RangoEtario', metadatos['rangos'])
+
+        if metadatos['campanas']:
+            self.df_campanas = pd.DataFrame(
+                arreglos['campanas_descuentos'], columns=metadatos['planes_campana'], copy=False
+            )
+            self.df_campanas.insert(0, 'Nombre', metadatos['campanas'])
+            self.df_campanas.insert(1, 'Tipo_Campana', metadatos['tipos_campana'])
+            self.df_campanas.insert(2, 'Fecha_Inicio', pd.to_datetime(arreglos['campanas_inicio']))
+            self.df_campanas.insert(3, 'Fecha_Fin', pd.to_datetime(arreglos['campanas_fin']))
+        else:
+            self.df_campanas = pd.DataFrame()
+
+    def recomendar_plan(self, distrito, sexo, edad, numero_dependientes):
+        """Consulta la tabla precalculada (misma regla que cotizador.recomendar_plan)"""
+        if (sexo not in SEXOS or not EDAD_MIN_TITULAR <= edad <= EDAD_MAX_TITULAR
+                or not 1 <= numero_dependientes <= MAX_AFILIADOS):
+            return recomendar_plan(distrito, sexo, edad, numero_dependientes)
+        indice = self.tabla_recomendaciones[
+            grupo_distrito(distrito), SEXOS.index(sexo), edad - EDAD_MIN_TITULAR, numero_dependientes - 1
+        ]
+        return self.planes[indice]
+
+_actual = None
+_firma_manifiesto = None
+_lock = threading.Lock()
+
+def adjuntar(ruta_manifiesto=RUTA_MANIFIESTO, reintentos=3):
+    """
+    Retorna el EstadoCompartido de la generación vigente, o None si no hay
+    cargador publicando
+
+    Solo relee el manifiesto cuando cambia su fecha de modificación, así que
+    llamarla en cada rerun cuesta un stat().
+    """
+    global _actual, _firma_manifiesto
+    try:
+        stat = os.stat(ruta_manifiesto)
+    except FileNotFoundError:
+        return None
+    firma = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    with _lock:
+        if _actual is not None and firma == _firma_manifiesto:
+            return _actual
+
+        for _ in range(reintentos):
+            try:
+                with open(ruta_manifiesto) as f:
+                    manifiesto = json.load(f)
+                if _actual is None or manifiesto['segmento'] != _actual.segmento:
+                    _actual = EstadoCompartido(manifiesto['segmento'], manifiesto['generacion'])
+                _firma_manifiesto = firma
+                return _actual
+            except (FileNotFoundError, ValueError):
+                # El cargador cambió de generación entre la lectura y el adjunto
+                time.sleep(0.05)
+        return _actual
+
+# ==================== CLI ====================
+
+def _terminar(*_):
+    raise KeyboardInterrupt
+
+def _firma_archivos(rutas):
+    return tuple(os.stat(r).st_mtime_ns if os.path.exists(r) else None for r in rutas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica el estado de la app en memoria compartida")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_publicar = sub.add_parser("publicar", help="Carga los CSV y publica una generación")
+    p_publicar.add_argument("--vigilar", action="store_true", help="Republica al cambiar los CSV")
+    p_publicar.add_argument("--intervalo", type=float, default=5.0)
+    sub.add_parser("estado", help="Muestra la generación publicada")
+    args = parser.parse_args()
+
+    if args.comando == "estado":
+        estado = adjuntar()
+        if estado is None:
+            print("No hay estado publicado")
+        else:
+            print(f"Generación {estado.generacion}: {len(estado.df_tarifas)} rangos, {len(estado.df_campanas)} campañas")
+        return
+
+    publicador = Publicador()
+    signal.signal(signal.SIGTERM, _terminar)
+    archivos = ['tarifario_base.csv', 'campanas.csv']
+    firma = None
+    try:
+        while True:
+            firma_nueva = _firma_archivos(archivos)
+            if firma_nueva != firma:
+                errores = []
+                df_tarifas = cargar_tarifas(errores)
+                for error in errores:
+                    print(error)
+                if df_tarifas is not None:
+                    df_campanas = cargar_campanas()
+                    desconocidos = tipos_desconocidos(df_campanas)
+                    if desconocidos:
+                        print(f"⚠️ Tipos de campaña desconocidos (no se aplican): {', '.join(desconocidos)}")
+                    generacion = publicador.publicar(df_tarifas, df_campanas)
+                    print(f"Generación {generacion} publicada")
+                firma = firma_nueva
+            if not args.vigilar:
+                # Sin --vigilar se mantiene el segmento vivo hasta Ctrl+C
+                signal.pause()
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publicador.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación de cotizaciones a Excel (XLSX) o CSV en streaming.
+
+Cada cotización aporta filas a tres tablas: Cotizaciones (una fila por
+cotización), Asegurados (detalle por asegurado) y Cuotas (plan de pagos).
+Las filas se escriben por grupos a medida que llegan las cotizaciones, así
+que la memoria no depende del tamaño de la cartera.
+
+El XLSX se arma a mano (Office Open XML con cadenas en línea, sin
+openpyxl): cada hoja se escribe primero a un archivo temporal y al cerrar se
+copia al ZIP. Las hojas que superan el límite de filas de Excel continúan en
+una hoja nueva ("Cuotas (2)", ...).
+
+    python exportacion.py cartera.csv cotizaciones.xlsx
+    python exportacion.py cartera.csv cotizaciones.csv
+    python exportacion.py cartera.csv - --tablas Cuotas > cuotas.csv
+"""
+import argparse
+import csv
+import io
+import shutil
+import sys
+import tempfile
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from propuestas import hash_cotizacion
+
+# Columnas de cada tabla: (título, tipo); tipos: texto, entero, numero, soles
+TABLAS = {
+    'Cotizaciones': [
+        ('ID', 'texto'), ('Plan', 'texto'), ('Continuidad', 'texto'), ('Asegurados', 'entero'),
+        ('Cuotas', 'entero'), ('Tasa %', 'numero'), ('Prima Base', 'soles'), ('Prima Total', 'soles'),
+        ('Cuota Mensual', 'soles'), ('Total Financiado', 'soles'), ('Costo Financiamiento', 'soles'),
+        ('Campaña', 'texto'),
+    ],
+    'Asegurados': [
+        ('ID', 'texto'), ('Relación', 'texto'), ('Edad', 'entero'), ('Prima Base', 'soles'),
+        ('Descuento %', 'numero'), ('Prima Final', 'soles'), ('Campaña', 'texto'),
+    ],
+    'Cuotas': [
+        ('ID', 'texto'), ('Cuota', 'entero'), ('Pago', 'soles'), ('Capital', 'soles'),
+        ('Interés', 'soles'), ('Saldo', 'soles'),
+    ],
+}
+
+MAX_FILAS_HOJA = 1_048_576
+FILAS_POR_GRUPO = 5000
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# ==================== FILAS ====================
+
+def identificador(cotizacion):
+    """ID de la familia si viene de una cartera; si no, el mismo hash que nombra su PDF"""
+    cliente = cotizacion.get('cliente') or {}
+    if 'Familia' in cliente:
+        return str(cliente['Familia'])
+    return hash_cotizacion(cotizacion)[:16]
+
+def filas_cotizacion(cotizacion):
+    """
+    Filas de las tres tablas para una cotización (ver cotizador.resumir_cotizacion)
+
+    Retorna: diccionario {tabla: lista de filas}
+    """
+    id_cotizacion = identificador(cotizacion)
+    return {
+        'Cotizaciones': [[
+            id_cotizacion, cotizacion['plan'], cotizacion['tiene_continuidad'], len(cotizacion['asegurados']),
+            cotizacion['num_cuotas'], cotizacion['tasa_interes'] * 100, cotizacion['total_base'],
+            cotizacion['total_prima'], cotizacion['cuota_mensual'], cotizacion['total_financiado'],
+            cotizacion['costo_financiamiento'], cotizacion['campana'],
+        ]],
+        'Asegurados': [[
+            id_cotizacion, a['relacion'], a['edad'], a['tarifa_base'], a['descuento_pct'],
+            a['tarifa_final'], a['campana'] if a['descuento_pct'] > 0 else None,
+        ] for a in cotizacion['asegurados']],
+        'Cuotas': [[
+            id_cotizacion, p['cuota'], p['pago'], p['capital'], p['interes'], p['saldo'],
+        ] for p in cotizacion['pagos']],
+    }
+
+# ==================== ESCRITOR XLSX ====================
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{hojas}</Types>'
+)
+_CONTENT_TYPE_HOJA = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{hojas}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{hojas}<Relationship Id="rIdEstilos" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_WORKBOOK_REL_HOJA = (
+    '<Relationship Id="rId{n}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{n}.xml"/>'
+)
+# Estilos: 0 = general, 1 = soles (#,##0.00), 2 = encabezado en negrita
+_ESTILOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_FIN_HOJA = '</sheetData></worksheet>'
+
+def _letra_columna(indice):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letras = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+def _celda(referencia, valor, tipo):
+    if valor is None:
+        return ""
+    if tipo == 'texto':
+        return f'<c r="{referencia}" t="inlineStr"><is><t>{escape(str(valor))}</t></is></c>'
+    estilo = ' s="1"' if tipo == 'soles' else ""
+    if tipo == 'entero':
+        numero = int(valor)
+    elif tipo == 'numero':
+        numero = repr(round(float(valor), 2))
+    else:
+        numero = repr(float(valor))
+    return f'<c r="{referencia}"{estilo}><v>{numero}</v></c>'
+
+class _Hoja:
+    """Una hoja en construcción, escrita a un archivo temporal"""
+
+    def __init__(self, nombre, tabla):
+        self.nombre = nombre
+        self.tabla = tabla
+        self.columnas = TABLAS[tabla]
+        self.letras = [_letra_columna(i) for i in range(len(self.columnas))]
+        self.archivo = tempfile.TemporaryFile()
+        self.filas = 0
+        encabezado = "".join(
+            f'<c r="{letra}1" t="inlineStr" s="2"><is><t>{escape(titulo)}</t></is></c>'
+            for letra, (titulo, _) in zip(self.letras, self.columnas)
+        )
+        self._escribir([f'<row r="1">{encabezado}</row>'])
+
+    def _escribir(self, partes):
+        self.archivo.write("".join(partes).encode('utf-8'))
+        self.filas += len(partes)
+
+    def agregar(self, filas):
+        partes = []
+        for i, fila in enumerate(filas, start=self.filas + 1):
+            celdas = "".join(
+                _celda(f"{letra}{i}", valor, tipo)
+                for letra, valor, (_, tipo) in zip(self.letras, fila, self.columnas)
+            )
+            partes.append(f'<row r="{i}">{celdas}</row>')
+        self._escribir(partes)
+
+class EscritorXLSX:
+    """
+    Escribe las tablas como hojas de un libro XLSX
+
+    Parámetros:
+    - destino: ruta o archivo binario con seek (ej. io.BytesIO)
+    - tablas: nombres de TABLAS a incluir
+    """
+
+    def __init__(self, destino, tablas=tuple(TABLAS)):
+        self.destino = destino
+        self.tablas = list(tablas)
+        self.hojas = []
+        self._actual = {}
+        for tabla in tablas:
+            self._nueva_hoja(tabla)
+
+    def _nueva_hoja(self, tabla):
+        partes = sum(1 for h in self.hojas if h.tabla == tabla)
+        nombre = tabla if partes == 0 else f"{tabla} ({partes + 1})"
+        hoja = _Hoja(nombre, tabla)
+        self.hojas.append(hoja)
+        self._actual[tabla] = hoja
+        return hoja
+
+    def escribir(self, tabla, filas):
+        hoja = self._actual[tabla]
+        while filas:
+            libres = MAX_FILAS_HOJA - hoja.filas
+            if libres == 0:
+                hoja = self._nueva_hoja(tabla)
+                continue
+            hoja.agregar(filas[:libres])
+            filas = filas[libres:]
+
+    def cerrar(self):
+        """Arma el ZIP final copiando cada hoja desde su archivo temporal"""
+        numeradas = list(enumerate(self.hojas, start=1))
+        with zipfile.ZipFile(self.destino, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('[Content_Types].xml', _CONTENT_TYPES.format(
+                hojas="".join(_CONTENT_TYPE_HOJA.format(n=n) for n, _ in numeradas)))
+            zf.writestr('_rels/.rels', _RELS)
+            zf.writestr('xl/workbook.xml', _WORKBOOK.format(hojas="".join(
+                f'<sheet name="{escape(h.nombre)}" sheetId="{n}" r:id="rId{n}"/>' for n, h in numeradas)))
+            zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS.format(
+                hojas="".join(_WORKBOOK_REL_HOJA.format(n=n) for n, _ in numeradas)))
+            zf.writestr('xl/styles.xml', _ESTILOS)
+
+            for n, hoja in numeradas:
+                tamano = hoja.archivo.tell()
+                hoja.archivo.seek(0)
+                # ZIP64 solo si hace falta: algunas versiones de Excel lo rechazan
+                with zf.open(f'xl/worksheets/sheet{n}.xml', 'w',
+                             force_zip64=tamano > zipfile.ZIP64_LIMIT // 2) as salida:
+                    salida.write(_INICIO_HOJA.encode('utf-8'))
+                    shutil.copyfileobj(hoja.archivo, salida, 1 << 20)
+                    salida.write(_FIN_HOJA.encode('utf-8'))
+                hoja.archivo.close()
+
+# ==================== ESCRITOR CSV ====================
+
+def _texto_csv(valor, tipo):
+    if valor is None:
+        return ""
+    if tipo in ('soles', 'numero'):
+        # Sin el ruido de punto flotante (p. ej. Tasa % = 0.04 * 100 = 4.000000000000001)
+        return f"{valor:.2f}"
+    return valor
+
+class EscritorCSV:
+    """
+    Escribe cada tabla en su propio CSV
+
+    Parámetros:
+    - destinos: {tabla: ruta o archivo de texto}; las rutas se escriben en
+      UTF-8 con BOM para que Excel reconozca las tildes
+    """
+
+    def __init__(self, destinos):
+        self.tablas = list(destinos)
+        self._propios = []
+        self._escritores = {}
+        for tabla, destino in destinos.items():
+            if isinstance(destino, str):
+                destino = open(destino, "w", newline="", encoding="utf-8-sig")
+                self._propios.append(destino)
+            escritor = csv.writer(destino)
+            escritor.writerow([titulo for titulo, _ in TABLAS[tabla]])
+            self._escritores[tabla] = escritor
+
+    def escribir(self, tabla, filas):
+        tipos = [tipo for _, tipo in TABLAS[tabla]]
+        self._escritores[tabla].writerows(
+            [_texto_csv(valor, tipo) for valor, tipo in zip(fila, tipos)] for fila in filas
+        )
+
+    def cerrar(self):
+        for archivo in self._propios:
+            archivo.close()
+
+# ==================== EXPORTACIÓN ====================
+
+def exportar(cotizaciones, escritor, filas_por_grupo=FILAS_POR_GRUPO):
+    """
+    Vuelca las cotizaciones al escritor por grupos de filas y lo cierra
+
+    Parámetros:
+    - cotizaciones: iterable (puede ser un generador) de cotizaciones
+    - escritor: EscritorXLSX o EscritorCSV
+    - filas_por_grupo: filas que se acumulan por tabla antes de escribir
+
+    Retorna: cantidad de cotizaciones exportadas
+    """
+    pendientes = {tabla: [] for tabla in escritor.tablas}
+    cantidad = 0
+    try:
+        for cotizacion in cotizaciones:
+            cantidad += 1
+            for tabla, filas in filas_cotizacion(cotizacion).items():
+                if tabla not in pendientes:
+                    continue
+                pendientes[tabla].extend(filas)
+                if len(pendientes[tabla]) >= filas_por_grupo:
+                    escritor.escribir(tabla, pendientes[tabla])
+                    pendientes[tabla] = []
+        for tabla, filas in pendientes.items():
+            if filas:
+                escritor.escribir(tabla, filas)
+    finally:
+        escritor.cerrar()
+    return cantidad
+
+def exportar_xlsx_bytes(cotizaciones):
+    """XLSX en memoria para descargas pequeñas desde la app"""
+    buffer = io.BytesIO()
+    exportar(cotizaciones, EscritorXLSX(buffer))
+    return buffer.getvalue()
+
+def abrir_escritor(ruta, tablas=tuple(TABLAS)):
+    """
+    Escritor según la ruta: .xlsx, .csv (un archivo por tabla, ej.
+    salida_cuotas.csv) o "-" para una sola tabla en CSV por la salida estándar
+    """
+    if ruta == "-":
+        if len(tablas) != 1:
+            raise ValueError("La salida estándar admite una sola tabla (usa --tablas)")
+        return EscritorCSV({tablas[0]: sys.stdout})
+    if ruta.endswith(".xlsx"):
+        return EscritorXLSX(ruta, tablas)
+    base = ruta[:-4] if ruta.endswith(".csv") else ruta
+    return EscritorCSV({tabla: f"{base}_{tabla.lower()}.csv" for tabla in tablas})
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta las cotizaciones de una cartera a Excel o CSV")
+    parser.add_argument("cartera", help="CSV con ID_Familia, Plan, Relacion, Edad, Continuidad, Cuotas[, Tasa]")
+    parser.add_argument("salida", help="Archivo .xlsx, prefijo .csv o - (salida estándar)")
+    parser.add_argument("--tablas", nargs="+", choices=list(TABLAS), default=list(TABLAS))
+    parser.add_argument("--bloque", type=int, default=100_000, help="Filas de la cartera leídas por bloque")
+    args = parser.parse_args()
+
+    from cotizador import cargar_tarifas, cargar_campanas
+    from propuestas import aviso_omitidas, cotizaciones_desde_cartera
+
+    errores = []
+    df_tarifas = cargar_tarifas(errores)
+    if df_tarifas is None:
+        raise SystemExit("\n".join(errores) or "No se pudo cargar el tarifario")
+
+    inicio = datetime.now()
+    omitidas = []
+    cantidad = exportar(
+        cotizaciones_desde_cartera(args.cartera, df_tarifas, cargar_campanas(), filas_por_bloque=args.bloque,
+                                   omitidas=omitidas),
+        abrir_escritor(args.salida, args.tablas)
+    )
+    segundos = (datetime.now() - inicio).total_seconds()
+    if args.salida != "-":
+        print(f"{cantidad} cotizaciones exportadas en {segundos:.1f} s -> {args.salida}")
+    if omitidas:
+        print(aviso_omitidas(omitidas), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de carteras sintéticas para pruebas de escala (sin datos reales).
+
+Produce familias con el mismo esquema que las carteras de renovación
+(ID_Familia, Plan, Relacion, Edad, Continuidad, Cuotas, Tasa) más Distrito,
+Sexo y Afiliados. Las distribuciones de edad, parentesco, distrito, sexo,
+afiliados y continuidad se configuran con un JSON que sobrescribe
+DISTRIBUCION_POR_DEFECTO. El plan de cada familia sale de la misma regla
+del recomendador (incluido el ajuste por edad, que el recomendador aplica
+siempre). Las edades se limitan a las que tienen tarifa en
+tarifario_base.csv; un rango de edad del titular sin ninguna edad con
+tarifa se rechaza al cargar la configuración.
+
+La salida se genera por bloques y se escribe en streaming a CSV o Parquet.
+Cada bloque usa su propia semilla derivada, así la misma semilla y tamaño
+de bloque reproducen la misma cartera.
+
+    python generador_cartera.py 1000000 cartera.csv --semilla 7
+    python generador_cartera.py 20000000 cartera.parquet --config distribucion.json
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cotizador import (
+    PLANES, SEXOS, DISTRITOS, EDAD_MIN_TITULAR, MAX_AFILIADOS,
+    ajustar_plan_por_edad, normalizar_distrito, grupo_distrito, rango_etario, tabla_recomendaciones
+)
+
+DISTRIBUCION_POR_DEFECTO = {
+    # Probabilidad de 1, 2, ... MAX_AFILIADOS afiliados por familia
+    'afiliados': [0.34, 0.24, 0.2, 0.12, 0.05, 0.02, 0.01, 0.01, 0.005, 0.005],
+    # Edad del titular: {"min-max": peso}
+    'edad_titular': {"18-25": 0.1, "26-35": 0.3, "36-45": 0.27, "46-55": 0.18, "56-65": 0.11, "66-90": 0.04},
+    'prob_femenino': 0.5,
+    'prob_continuidad': 0.35,
+    # Peso de cada distrito (mismos nombres que el formulario del recomendador)
+    'distritos': {d: 1.0 for d in DISTRITOS},
+    # Entre los dependientes: probabilidad de que el primero sea cónyuge y de "Otro"
+    'prob_conyuge': 0.6,
+    'prob_otro': 0.03,
+    'desvio_edad_conyuge': 4,
+    'cuotas': {"1": 0.2, "4": 0.1, "6": 0.1, "10": 0.1, "12": 0.5},
+    'prob_con_interes': 0.3,
+}
+
+# ==================== TABLAS AUXILIARES ====================
+
+def edad_maxima_con_tarifa(df_tarifas, es_hijo=False):
+    """Mayor edad para la que obtener_tarifa_base encuentra un rango del tarifario"""
+    rangos = set(df_tarifas['RangoEtario'])
+    edad = 0
+    while rango_etario(edad + 1, es_hijo) in rangos:
+        edad += 1
+    return edad
+
+def tabla_plan_ajustado(edad_maxima):
+    """
+    Plan efectivo para cada (plan recomendado, edad), igual que el ajuste del
+    recomendador (ver cotizador.ajustar_plan_por_edad)
+
+    Retorna: arreglo int8 [plan, edad] con índices de PLANES
+    """
+    tabla = np.empty((len(PLANES), edad_maxima + 1), dtype=np.int8)
+    for p, plan in enumerate(PLANES):
+        for edad in range(edad_maxima + 1):
+            tabla[p, edad] = PLANES.index(ajustar_plan_por_edad(plan, edad)[0])
+    return tabla
+
+def _rangos(pesos, edad_min, edad_max):
+    """
+    Convierte {"min-max": peso} en arreglos (mínimos, máximos, probabilidades),
+    con cada rango recortado a [edad_min, edad_max]
+
+    Retorna: (mínimos, máximos, probabilidades); ValueError si un rango queda vacío
+    """
+    minimos, maximos, probabilidades = [], [], []
+    for rango, peso in pesos.items():
+        minimo, maximo = (int(x) for x in rango.split("-"))
+        minimo, maximo = max(minimo, edad_min), min(maximo, edad_max)
+        if minimo > maximo:
+            raise ValueError(
+                f"El rango de edad '{rango}' no tiene edades con tarifa (de {edad_min} a {edad_max} años)"
+            )
+        minimos.append(minimo)
+        maximos.append(maximo)
+        probabilidades.append(peso)
+    probabilidades = np.array(probabilidades, dtype=float)
+    return np.array(minimos), np.array(maximos), probabilidades / probabilidades.sum()
+
+# ==================== GENERACIÓN ====================
+
+class GeneradorCartera:
+    """Genera bloques de familias sintéticas reproducibles por semilla"""
+
+    def __init__(self, df_tarifas, distribucion=None, semilla=0):
+        self.dist = {**DISTRIBUCION_POR_DEFECTO, **(distribucion or {})}
+        self.semilla = semilla
+
+        self.edad_max_titular = edad_maxima_con_tarifa(df_tarifas)
+        self.edad_max_hijo = edad_maxima_con_tarifa(df_tarifas, es_hijo=True)
+        self.recomendaciones = tabla_recomendaciones()
+        self.ajuste = tabla_plan_ajustado(self.edad_max_titular)
+
+        afiliados = np.array(self.dist['afiliados'][:MAX_AFILIADOS], dtype=float)
+        self.prob_afiliados = afiliados / afiliados.sum()
+        self.edad_min, self.edad_max, self.prob_edad = _rangos(
+            self.dist['edad_titular'], EDAD_MIN_TITULAR, self.edad_max_titular
+        )
+
+        self.distritos = list(self.dist['distritos'])
+        pesos = np.array([self.dist['distritos'][d] for d in self.distritos], dtype=float)
+        self.prob_distrito = pesos / pesos.sum()
+        self.grupo_distrito = np.array([grupo_distrito(normalizar_distrito(d)) for d in self.distritos])
+
+        self.opciones_cuotas = np.array([int(c) for c in self.dist['cuotas']])
+        pesos = np.array(list(self.dist['cuotas'].values()), dtype=float)
+        self.prob_cuotas = pesos / pesos.sum()
+
+    def generar_bloque(self, indice_bloque, familias, primer_id=0):
+        """
+        Genera un bloque de familias (una fila por asegurado)
+
+        Parámetros:
+        - indice_bloque: se combina con la semilla para que cada bloque sea reproducible
+        - familias: cantidad de familias del bloque
+        - primer_id: número de la primera familia del bloque
+
+        Retorna: DataFrame
+        """
+        rng = np.random.default_rng([self.semilla, indice_bloque])
+        d = self.dist
+
+        # Titulares
+        afiliados = rng.choice(np.arange(1, len(self.prob_afiliados) + 1), size=familias, p=self.prob_afiliados)
+        rango = rng.choice(len(self.prob_edad), size=familias, p=self.prob_edad)
+        edad_titular = rng.integers(self.edad_min[rango], self.edad_max[rango] + 1)
+        femenino = rng.random(familias) < d['prob_femenino']
+        continuidad = rng.random(familias) < d['prob_continuidad']
+        distrito = rng.choice(len(self.distritos), size=familias, p=self.prob_distrito)
+        cuotas = rng.choice(self.opciones_cuotas, size=familias, p=self.prob_cuotas)
+        tasa = np.where((cuotas > 1) & (rng.random(familias) < d['prob_con_interes']), 0.04, 0.0)
+
+        # Plan: regla del recomendador y ajuste por edad (el recomendador lo aplica con o sin continuidad)
+        plan = self.recomendaciones[
+            self.grupo_distrito[distrito], femenino.astype(int),
+            edad_titular - EDAD_MIN_TITULAR, np.minimum(afiliados, MAX_AFILIADOS) - 1
+        ]
+        plan = self.ajuste[plan, edad_titular]
+
+        # Una fila por asegurado; posición 0 es el titular
+        familia = np.repeat(np.arange(familias), afiliados)
+        posicion = np.arange(len(familia)) - np.repeat(np.cumsum(afiliados) - afiliados, afiliados)
+        titular_edad = edad_titular[familia]
+        n = len(familia)
+
+        sorteo = rng.random(n)
+        es_conyuge = (posicion == 1) & (sorteo < d['prob_conyuge'])
+        es_otro = (posicion > 0) & ~es_conyuge & (sorteo > 1 - d['prob_otro'])
+        es_hijo = (posicion > 0) & ~es_conyuge & ~es_otro
+
+        edad_conyuge = np.clip(
+            np.rint(titular_edad + rng.normal(0, d['desvio_edad_conyuge'], n)), EDAD_MIN_TITULAR, self.edad_max_titular
+        )
+        # Hijos: entre 0 y (edad del titular - 18), sin pasar de la edad máxima con tarifa de hijo
+        edad_hijo = np.floor(rng.random(n) * (np.minimum(titular_edad - EDAD_MIN_TITULAR, self.edad_max_hijo) + 1))
+        edad_otro = rng.integers(0, self.edad_max_titular + 1, n)
+
+        edad = np.select([posicion == 0, es_conyuge, es_hijo], [titular_edad, edad_conyuge, edad_hijo], edad_otro)
+        relacion = np.select([posicion == 0, es_conyuge, es_hijo], ["Titular", "Cónyuge", "Hijo"], "Otro")
+
+        return pd.DataFrame({
+            'ID_Familia': familia + primer_id,
+            'Plan': np.array(PLANES)[plan][familia],
+            'Relacion': relacion,
+            'Edad': edad.astype(np.int16),
+            'Continuidad': np.where(continuidad, "Sí", "No")[familia],
+            'Cuotas': cuotas[familia].astype(np.int8),
+            'Tasa': tasa[familia],
+            'Distrito': np.array(self.distritos)[distrito][familia],
+            'Sexo': np.where(femenino, SEXOS[1], SEXOS[0])[familia],
+            'Afiliados': afiliados[familia].astype(np.int8),
+        })
+
+    def bloques(self, familias, familias_por_bloque=200_000):
+        """Itera los bloques necesarios para generar `familias` familias"""
+        for indice, inicio in enumerate(range(0, familias, familias_por_bloque)):
+            yield self.generar_bloque(indice, min(familias_por_bloque, familias - inicio), primer_id=inicio)
+
+# ==================== ESCRITURA EN STREAMING ====================
+
+def escribir_cartera(bloques, ruta):
+    """
+    Escribe los bloques a CSV o Parquet (según la extensión) sin acumularlos
+
+    Retorna: cantidad de filas escritas
+    """
+    filas = 0
+    if ruta.endswith(".parquet"):
+        # pyarrow es opcional: solo se necesita para la salida Parquet
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        escritor = None
+        try:
+            for bloque in bloques:
+                tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tabla.schema)
+                escritor.write_table(tabla)
+                filas += len(bloque)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return filas
+
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        for i, bloque in enumerate(bloques):
+            bloque.to_csv(f, header=(i == 0), index=False)
+            filas += len(bloque)
+    return filas
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una cartera sintética de familias")
+    parser.add_argument("familias", type=int, help="Cantidad de familias")
+    parser.add_argument("salida", help="Archivo .csv o .parquet")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--config", help="JSON que sobrescribe DISTRIBUCION_POR_DEFECTO")
+    parser.add_argument("--bloque", type=int, default=200_000, help="Familias por bloque en memoria")
+    args = parser.parse_args()
+
+    from cotizador import cargar_tarifas
+
+    errores = []
+    df_tarifas = cargar_tarifas(errores)
+    if df_tarifas is None:
+        raise SystemExit("\n".join(errores) or "No se pudo cargar el tarifario")
+
+    distribucion = None
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            distribucion = json.load(f)
+
+    try:
+        generador = GeneradorCartera(df_tarifas, distribucion, semilla=args.semilla)
+    except ValueError as e:
+        raise SystemExit(f"Configuración inválida: {e}")
+    inicio = datetime.now()
+    filas = escribir_cartera(generador.bloques(args.familias, args.bloque), args.salida)
+    segundos = (datetime.now() - inicio).total_seconds()
+    megas = os.path.getsize(args.salida) / 2**20
+    print(f"{args.familias} familias, {filas} asegurados en {segundos:.1f} s -> {args.salida} ({megas:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
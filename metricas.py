@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de operación en formato de texto de Prometheus.
+
+Contadores e histogramas con etiquetas, agregados en el propio proceso. Cada
+hilo acumula en su propio diccionario, así que registrar un valor no toma
+ningún lock (solo el primer uso de cada hilo se anota en la lista de
+fragmentos). Streamlit usa un hilo nuevo por rerun, así que los fragmentos
+de hilos terminados se consolidan y se descartan al exponer y también cada
+PODA_FRAGMENTOS hilos nuevos, aunque nadie consulte el endpoint.
+
+El endpoint se activa con SRP_METRICAS_PUERTO (solo escucha en 127.0.0.1
+salvo que se indique SRP_METRICAS_HOST). Otros módulos pueden colgar sondas
+en el mismo servidor (ver calentamiento.py, que expone /listo):
+
+    SRP_METRICAS_PUERTO=9464 streamlit run streamlit_app.py
+    curl http://127.0.0.1:9464/metrics
+
+Las métricas son del proceso: cada instancia de la app (cada `streamlit run`
+o `calentamiento.py servir`) necesita su propio SRP_METRICAS_PUERTO. Si el
+puerto ya está ocupado, la instancia avisa por stderr y sigue sin endpoint
+(sin /metrics ni /listo).
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==================== AGREGACIÓN POR HILO ====================
+
+PODA_FRAGMENTOS = 64  # Hilos nuevos entre consolidaciones de los terminados
+
+class _Fragmentos:
+    """Valores separados por hilo; cada hilo solo escribe en el suyo"""
+
+    def __init__(self, sumar):
+        self._sumar = sumar
+        self._local = threading.local()
+        self._vivos = []
+        self._consolidado = {}
+        self._lock = threading.Lock()
+
+    def propio(self):
+        try:
+            return self._local.valores
+        except AttributeError:
+            valores = self._local.valores = {}
+            with self._lock:
+                self._vivos.append((threading.current_thread(), valores))
+                if len(self._vivos) % PODA_FRAGMENTOS == 0:
+                    self._consolidar_terminados()
+            return valores
+
+    def _consolidar_terminados(self):
+        """Suma al consolidado los fragmentos de hilos terminados y los descarta (con el lock tomado)"""
+        vivos = []
+        for hilo, valores in self._vivos:
+            if hilo.is_alive():
+                vivos.append((hilo, valores))
+            else:
+                self._sumar(self._consolidado, valores)
+        self._vivos = vivos
+
+    def total(self):
+        """Suma de todos los hilos (los terminados se consolidan una sola vez)"""
+        with self._lock:
+            self._consolidar_terminados()
+            vivos = self._vivos
+            total = {}
+            self._sumar(total, self._consolidado)
+            for _, valores in vivos:
+                # list() copia de una vez aunque el hilo siga escribiendo
+                self._sumar(total, dict(list(valores.items())))
+        return total
+
+def _sumar_contadores(destino, origen):
+    for clave, valor in origen.items():
+        destino[clave] = destino.get(clave, 0) + valor
+
+def _sumar_histogramas(destino, origen):
+    for clave, valores in origen.items():
+        acumulado = destino.setdefault(clave, [0] * len(valores))
+        for i, valor in enumerate(list(valores)):
+            acumulado[i] += valor
+
+# ==================== TIPOS DE MÉTRICA ====================
+
+def _etiquetas(nombres, valores, extra=""):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+class Contador:
+    """Contador monótono con etiquetas"""
+
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._fragmentos = _Fragmentos(_sumar_contadores)
+
+    def inc(self, *valores, cantidad=1):
+        """Suma `cantidad` a la serie de esas etiquetas (en el orden declarado)"""
+        propio = self._fragmentos.propio()
+        propio[valores] = propio.get(valores, 0) + cantidad
+
+    def valores(self):
+        return self._fragmentos.total()
+
+    def exponer(self):
+        lineas = []
+        for clave, valor in sorted(self.valores().items()):
+            lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}")
+        return lineas
+
+class Histograma:
+    """Histograma con cubetas fijas y etiquetas"""
+
+    tipo = "histogram"
+    CUBETAS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.cubetas = tuple(cubetas)
+        self._fragmentos = _Fragmentos(_sumar_histogramas)
+
+    def observar(self, valor, *valores):
+        """Registra una observación; se guardan conteos por cubeta, suma y cantidad"""
+        propio = self._fragmentos.propio()
+        serie = propio.get(valores)
+        if serie is None:
+            serie = propio[valores] = [0] * (len(self.cubetas) + 3)
+        serie[bisect.bisect_left(self.cubetas, valor)] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def medir(self, *valores):
+        """Context manager que observa la duración del bloque en segundos"""
+        return _Cronometro(self, valores)
+
+    def valores(self):
+        return self._fragmentos.total()
+
+    def exponer(self):
+        lineas = []
+        for clave, serie in sorted(self.valores().items()):
+            acumulado = 0
+            for limite, conteo in zip(self.cubetas + (float("inf"),), serie):
+                acumulado += conteo
+                le = 'le="+Inf"' if limite == float("inf") else f'le="{limite!r}"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie[-2])}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {serie[-1]}")
+        return lineas
+
+class _Cronometro:
+    def __init__(self, histograma, valores):
+        self.histograma = histograma
+        self.valores = valores
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histograma.observar(time.perf_counter() - self.inicio, *self.valores)
+
+# ==================== REGISTRO ====================
+
+REGISTRO = []
+
+def _registrar(metrica):
+    REGISTRO.append(metrica)
+    return metrica
+
+RECOMENDACIONES = _registrar(Contador(
+    "srp_recomendaciones_total", "Recomendaciones generadas por plan y distrito", ("plan", "distrito")
+))
+COTIZACIONES = _registrar(Contador(
+    "srp_cotizaciones_total", "Cotizaciones distintas calculadas por plan y número de cuotas", ("plan", "cuotas")
+))
+TARIFAS_NO_ENCONTRADAS = _registrar(Contador(
+    "srp_tarifas_no_encontradas_total",
+    "Consultas al tarifario sin tarifa (plan_inexistente, sin_rango para la edad, sin_valor o error)",
+    ("plan", "motivo")
+))
+CAMPANAS_APLICADAS = _registrar(Contador(
+    "srp_campanas_aplicadas_total",
+    "Búsquedas de campaña por tipo solicitado y resultado (campana, respaldo_general, sin_campana)",
+    ("tipo", "resultado")
+))
+CARGA_DATOS = _registrar(Histograma(
+    "srp_carga_datos_segundos", "Duración de la carga de los CSV de referencia", ("archivo",)
+))
+CALENTAMIENTO = _registrar(Histograma(
+    "srp_calentamiento_segundos", "Duración de cada paso del calentamiento al iniciar y su resultado",
+    ("paso", "estado")
+))
+
+def exponer():
+    """Texto de todas las métricas en el formato de exposición de Prometheus"""
+    lineas = []
+    for metrica in REGISTRO:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
+
+# ==================== ENDPOINT ====================
+
+# Ruta -> función sin argumentos que retorna (código HTTP, tipo de contenido, cuerpo)
+SONDAS = {}
+
+def registrar_sonda(ruta, funcion):
+    """Publica `funcion` en `ruta` del servidor de métricas"""
+    SONDAS[ruta] = funcion
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        ruta = self.path.split("?")[0]
+        if ruta in SONDAS:
+            codigo, tipo, cuerpo = SONDAS[ruta]()
+        elif ruta in ("/metrics", "/"):
+            codigo, tipo, cuerpo = 200, "text/plain; version=0.0.4; charset=utf-8", exponer()
+        else:
+            self.send_error(404)
+            return
+        cuerpo = cuerpo.encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *_):
+        pass
+
+_servidor = None
+_error_servidor = None
+_lock_servidor = threading.Lock()
+
+def iniciar_servidor(puerto=None, host=None):
+    """
+    Inicia el endpoint en un hilo de fondo (una vez por proceso)
+
+    Parámetros:
+    - puerto: por defecto SRP_METRICAS_PUERTO; sin puerto no se inicia
+    - host: por defecto SRP_METRICAS_HOST o 127.0.0.1
+
+    Retorna: el servidor, o None si no está configurado o el puerto está
+    ocupado (se avisa una sola vez por stderr y no se reintenta)
+    """
+    global _servidor, _error_servidor
+    puerto = puerto or os.environ.get("SRP_METRICAS_PUERTO")
+    if not puerto:
+        return None
+    with _lock_servidor:
+        if _error_servidor is not None:
+            return None
+        if _servidor is None:
+            host = host or os.environ.get("SRP_METRICAS_HOST", "127.0.0.1")
+            try:
+                _servidor = ThreadingHTTPServer((host, int(puerto)), _Manejador)
+            except OSError as e:
+                # Típicamente otra instancia de la app ya usa el puerto
+                _error_servidor = e
+                print(f"⚠️ Métricas: no se pudo escuchar en {host}:{puerto} ({e}); esta instancia no expone "
+                      f"/metrics ni /listo. Usa un SRP_METRICAS_PUERTO distinto por instancia.", file=sys.stderr)
+                return None
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name="srp-metricas", daemon=True).start()
+    return _servidor
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+Páginas de la app. streamlit_app.py importa solo el módulo de la opción
+activa del menú; cada página carga sus propios datos al mostrarse.
+"""
+
+# Opción del menú -> módulo de la página
+PAGINAS = {
+    "🎯 Recomendador de Plan": "paginas.recomendador",
+    "💰 Calculadora de Tarifas": "paginas.calculadora",
+    "📊 Campañas Vigentes": "paginas.campanas",
+    "📚 Recursos": "paginas.recursos"
+}
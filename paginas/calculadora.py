@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""Módulo 2: Calculadora de Tarifas"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+import metricas
+from cotizador import validar_edad_sin_continuidad, cotizar_asegurado, resumir_cotizacion
+from propuestas import ServicioPropuestas, con_fecha, hash_cotizacion
+from cola_email import ColaEmail, Despachador, mensaje_propuesta
+from exportacion import MIME_XLSX, exportar_xlsx_bytes
+from paginas.datos import obtener_tarifas, obtener_campanas
+from paginas.comparador import mostrar_comparacion
+
+# Segundos que se espera el PDF en el mismo rerun antes de ofrecer "Actualizar"
+ESPERA_PDF = 2.0
+
+@st.cache_resource
+def obtener_servicio_propuestas():
+    """Servicio de propuestas PDF compartido por todas las sesiones del servidor"""
+    return ServicioPropuestas()
+
+@st.cache_resource
+def obtener_cola_email():
+    """
+    Cola de correos del servidor; inicia el despachador en segundo plano salvo
+    que se ejecute aparte (EMAIL_DESPACHADOR_EXTERNO=1)
+    """
+    cola = ColaEmail()
+    if os.environ.get("EMAIL_DESPACHADOR_EXTERNO") != "1":
+        Despachador(cola).iniciar()
+    return cola
+
+def mostrar():
+    """Muestra la cotización por asegurado, el resumen y el plan de pagos"""
+    st.header("💰 Calculadora de Tarifas")
+    
+    df_tarifas = obtener_tarifas()
+    df_campanas = obtener_campanas()
+    
+    if df_tarifas is None:
+        st.error("⚠️ No se pudo cargar el archivo de tarifas. Verifica que 'tarifario_base.csv' esté en la carpeta correcta.")
+    else:
+        # Mostrar si hay datos pre-cargados
+        if st.session_state.recomendacion_generada:
+            st.success("✅ Datos cargados desde la recomendación anterior")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.info(f"**Plan:** {st.session_state.plan_recomendado}")
+            with col2:
+                st.info(f"**Edad Titular:** {st.session_state.edad_titular} años")
+            with col3:
+                st.info(f"**Afiliados:** {st.session_state.numero_afiliados}")
+            
+            # Opción para resetear
+            if st.button("🔄 Empezar cotización nueva", help="Limpia los datos pre-cargados"):
+                st.session_state.recomendacion_generada = False
+                st.session_state.plan_recomendado = None
+                st.rerun()
+        
+        st.markdown("### 📝 Datos de la Cotización")
+        
+        # Selección de plan (usar el recomendado si existe)
+        planes_disponibles = [col for col in df_tarifas.columns if col != 'RangoEtario']
+        
+        # Determinar índice por defecto
+        if st.session_state.recomendacion_generada and st.session_state.plan_recomendado:
+            try:
+                index_default = planes_disponibles.index(st.session_state.plan_recomendado)
+            except:
+                index_default = 0
+        else:
+            index_default = 0
+        
+        plan_seleccionado = st.selectbox("Plan de Seguro", planes_disponibles, index=index_default)
+        
+        # Configuración de cuotas
+        col1, col2 = st.columns(2)
+        with col1:
+            num_cuotas = st.selectbox("Número de Cuotas", [1, 4, 6, 10, 12], index=4)
+        with col2:
+            tipo_financiamiento = st.selectbox("Tipo de Financiamiento", ["Sin Interés (0%)", "Con Interés (4%)"])
+            tasa_interes = 0.0 if tipo_financiamiento == "Sin Interés (0%)" else 0.04
+        
+        st.markdown("---")
+        st.markdown("### 👥 Asegurados")
+        
+        # Número de asegurados (usar el de la recomendación si existe)
+        num_asegurados_default = st.session_state.numero_afiliados if st.session_state.recomendacion_generada else 1
+        num_asegurados = st.number_input("Número de asegurados", min_value=1, max_value=10, value=num_asegurados_default)
+        
+        # Recopilar datos de cada asegurado
+        asegurados = []
+        integrantes = []
+        total_prima = 0
+        
+        for i in range(num_asegurados):
+            st.markdown(f"#### Asegurado {i+1}")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if i == 0:
+                    st.text_input(
+                        f"Relación de parentesco",
+                        value="Titular",
+                        disabled=True,
+                        key=f"rel_{i}"
+                    )
+                    relacion = "Titular"
+                else:
+                    relacion = st.selectbox(
+                        f"Relación de parentesco",
+                        ["Hijo", "Cónyuge", "Otro"],
+                        key=f"rel_{i}"
+                    )
+            
+            with col2:
+                if i == 0 and st.session_state.recomendacion_generada:
+                    edad_default = st.session_state.edad_titular
+                else:
+                    edad_default = 30 if i == 0 else 5
+                
+                edad = st.number_input(
+                    f"Edad",
+                    min_value=0,
+                    max_value=100,
+                    value=edad_default,
+                    key=f"edad_{i}"
+                )
+            
+            integrantes.append((relacion, edad))
+            
+            # Validar edad según continuidad para el titular
+            if i == 0 and st.session_state.tiene_continuidad == "No":
+                es_valido, mensaje_error = validar_edad_sin_continuidad(plan_seleccionado, edad)
+                if not es_valido:
+                    st.error(mensaje_error)
+                    st.warning("⚠️ Considera cambiar el plan o verificar si el cliente tiene continuidad")
+            
+            # Obtener tarifa y aplicar descuento de campaña
+            asegurado = cotizar_asegurado(
+                df_tarifas, 
+                df_campanas, 
+                plan_seleccionado, 
+                relacion, 
+                edad, 
+                st.session_state.tiene_continuidad
+            )
+            
+            if asegurado:
+                asegurados.append(asegurado)
+                total_prima += asegurado['tarifa_final']
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Prima Base", f"S/ {asegurado['tarifa_base']:,.2f}")
+                with col2:
+                    if asegurado['descuento_pct'] > 0:
+                        st.metric("Descuento", f"{asegurado['descuento_pct']}%", help=f"Campaña: {asegurado['campana']}")
+                    else:
+                        st.metric("Descuento", "0%")
+                with col3:
+                    st.metric("Prima Final", f"S/ {asegurado['tarifa_final']:,.2f}")
+            else:
+                st.warning(f"⚠️ No se encontró tarifa para la edad {edad} en el plan {plan_seleccionado}")
+            
+            st.markdown("---")
+        
+        # Resumen total
+        if total_prima > 0:
+            st.markdown("### 💳 Resumen de Cotización")
+            
+            # Calcular cuota mensual y plan de pagos
+            cotizacion = resumir_cotizacion(
+                plan_seleccionado, asegurados, num_cuotas, tasa_interes, st.session_state.tiene_continuidad
+            )
+            
+            # Mostrar métricas
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("Prima Total Anual", f"S/ {cotizacion['total_prima']:,.2f}")
+            with col2:
+                st.metric("Número de Cuotas", num_cuotas)
+            with col3:
+                st.metric("Cuota Mensual", f"S/ {cotizacion['cuota_mensual']:,.2f}")
+            with col4:
+                st.metric("Costo Financiamiento", f"S/ {cotizacion['costo_financiamiento']:,.2f}")
+            
+            # Mostrar información de campaña aplicada
+            if cotizacion['campana']:
+                tipo_campana = "Continuidad" if st.session_state.tiene_continuidad == "Sí" else "General"
+                st.info(f"🎉 **Campaña aplicada:** {cotizacion['campana']} ({tipo_campana}) - Ahorro: S/ {(cotizacion['total_base'] - cotizacion['total_prima']):,.2f}")
+            
+            # Tabla detallada
+            st.markdown("#### 📊 Detalle por Asegurado")
+            df_resumen = pd.DataFrame(asegurados)
+            df_resumen['tarifa_base'] = df_resumen['tarifa_base'].apply(lambda x: f"S/ {x:,.2f}")
+            df_resumen['descuento_pct'] = df_resumen['descuento_pct'].apply(lambda x: f"{x}%")
+            df_resumen['tarifa_final'] = df_resumen['tarifa_final'].apply(lambda x: f"S/ {x:,.2f}")
+            df_resumen = df_resumen[['relacion', 'edad', 'tarifa_base', 'descuento_pct', 'tarifa_final']]
+            df_resumen.columns = ['Relación', 'Edad', 'Prima Base', 'Descuento', 'Prima Final']
+            
+            st.dataframe(df_resumen, use_container_width=True)
+            
+            # Tabla de amortización
+            if num_cuotas > 1:
+                st.markdown("#### 📅 Plan de Pagos")
+                
+                with st.expander("Ver detalle de cuotas"):
+                    df_pagos = pd.DataFrame([{
+                        'Cuota': p['cuota'],
+                        'Pago': f"S/ {p['pago']:,.2f}",
+                        'Capital': f"S/ {p['capital']:,.2f}",
+                        'Interés': f"S/ {p['interes']:,.2f}",
+                        'Saldo': f"S/ {p['saldo']:,.2f}"
+                    } for p in cotizacion['pagos']])
+                    st.dataframe(df_pagos, use_container_width=True)
+            
+            # Todos los planes para la misma familia, desde el cubo precalculado
+            mostrar_comparacion(
+                integrantes, num_cuotas, tasa_interes, st.session_state.tiene_continuidad, plan_seleccionado
+            )
+            
+            # Botón para generar propuesta
+            st.markdown("### 📄 Generar Propuesta")
+            col1, col2 = st.columns(2)
+            
+            cotizacion['cliente'] = {
+                'Titular': f"{st.session_state.sexo_cliente}, {asegurados[0]['edad']} años",
+                'Distrito': st.session_state.distrito_cliente
+            }
+            # La fecha de la propuesta entra en la clave: otro día es otro PDF
+            cotizacion = con_fecha(cotizacion)
+            clave_cotizacion = hash_cotizacion(cotizacion)
+            
+            # Cada cotización distinta se cuenta una vez, no en cada rerun
+            if st.session_state.cotizacion_medida != clave_cotizacion:
+                st.session_state.cotizacion_medida = clave_cotizacion
+                metricas.COTIZACIONES.inc(plan_seleccionado, num_cuotas)
+            
+            with col1:
+                # El PDF se genera en segundo plano; cada rerun consulta si ya está listo
+                servicio_propuestas = obtener_servicio_propuestas()
+                if st.button("📥 Descargar Propuesta en PDF", type="primary"):
+                    st.session_state.propuesta_clave = servicio_propuestas.solicitar(cotizacion)
+                
+                if st.session_state.propuesta_clave == clave_cotizacion:
+                    try:
+                        # El render tarda milisegundos: se espera un momento antes de mostrar "Generando"
+                        pdf_propuesta = servicio_propuestas.obtener(st.session_state.propuesta_clave, espera=ESPERA_PDF)
+                    except Exception as e:
+                        pdf_propuesta = None
+                        st.session_state.propuesta_clave = None
+                        st.error(f"Error al generar la propuesta: {str(e)}")
+                    
+                    if pdf_propuesta:
+                        st.download_button(
+                            label="📄 Guardar PDF",
+                            data=pdf_propuesta,
+                            file_name=f"Propuesta_{plan_seleccionado}.pdf",
+                            mime='application/pdf'
+                        )
+                    elif st.session_state.propuesta_clave:
+                        st.info("⏳ Generando la propuesta...")
+                        st.button("🔄 Actualizar")
+            
+            with col2:
+                email_cliente = st.text_input("Correo del cliente", placeholder="cliente@correo.com")
+                if st.button("📧 Enviar por Email"):
+                    if "@" not in email_cliente:
+                        st.warning("⚠️ Ingresa un correo válido")
+                    else:
+                        # Solo se encola; el despachador adjunta el PDF y lo envía
+                        obtener_cola_email().encolar(email_cliente, *mensaje_propuesta(cotizacion), cotizacion)
+                        st.success(f"✅ Propuesta encolada para envío a {email_cliente}")
+            
+            # El Excel (cotización, detalle y plan de pagos) se arma recién al hacer clic
+            st.download_button(
+                label="📊 Descargar Cotización en Excel",
+                data=lambda: exportar_xlsx_bytes([cotizacion]),
+                file_name=f"Cotizacion_{plan_seleccionado}.xlsx",
+                mime=MIME_XLSX
+            )
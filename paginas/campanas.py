@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Módulo 3: Campañas Vigentes"""
+from datetime import date, datetime
+
+import streamlit as st
+
+from cotizador import PLANES
+from paginas.datos import obtener_calendario
+
+def _mostrar_campana(campana):
+    """Tarjeta de una campaña con sus fechas y descuentos por plan"""
+    st.markdown(f"#### 🎉 {campana['nombre']}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.info(f"**Inicio:** {campana['inicio'].strftime('%d/%m/%Y')}")
+    with col2:
+        st.info(f"**Fin:** {campana['fin'].strftime('%d/%m/%Y')}")
+
+    st.markdown("##### 💎 Descuentos por Plan")
+
+    cols = st.columns(len(PLANES))
+    for i, plan in enumerate(PLANES):
+        if plan in campana['descuentos']:
+            with cols[i]:
+                st.metric(plan, f"{campana['descuentos'][plan]}%")
+
+    st.markdown("---")
+
+def mostrar():
+    """Muestra las campañas vigentes y próximas a la fecha elegida"""
+    st.header("📊 Campañas y Descuentos Vigentes")
+
+    calendario = obtener_calendario()
+
+    if calendario.campanas:
+        hoy = date.today()
+        fecha = st.date_input("📅 Fecha de consulta", value=hoy, format="DD/MM/YYYY",
+                              help="Elige cualquier fecha para ver qué campañas estaban o estarán vigentes")
+        # Hoy se muestra lo que cobra la calculadora ahora mismo (vigencia con la hora actual)
+        foto = calendario.instantanea_en(datetime.now()) if fecha == hoy else calendario.instantanea(fecha)
+        if fecha != hoy:
+            st.caption(f"Mostrando las campañas al {fecha.strftime('%d/%m/%Y')}")
+
+        if foto['generales'] or foto['continuidad']:
+            # Mostrar campañas generales
+            if foto['generales']:
+                st.markdown("### 🎯 Campañas Generales")
+                for campana in foto['generales']:
+                    _mostrar_campana(campana)
+
+            # Mostrar campañas de continuidad
+            if foto['continuidad']:
+                st.markdown("### 🔄 Campañas de Continuidad")
+                st.info("✨ Estas campañas aplican solo para clientes que vienen de otro seguro de salud")
+                for campana in foto['continuidad']:
+                    _mostrar_campana(campana)
+
+            # Descuento que aplica la calculadora a cada plan en esa fecha
+            st.markdown("### 🧮 Descuento aplicado en la cotización")
+            st.dataframe(
+                {
+                    'Plan': PLANES,
+                    'Sin continuidad': [f"{foto['descuentos']['General'][p]}%" for p in PLANES],
+                    'Con continuidad': [f"{foto['descuentos']['Continuidad'][p]}%" for p in PLANES],
+                },
+                hide_index=True
+            )
+        elif fecha == hoy:
+            st.warning("⚠️ No hay campañas vigentes en este momento")
+        else:
+            st.warning("⚠️ No hay campañas vigentes en la fecha elegida")
+
+        # Mostrar próximas campañas
+        if foto['proximas']:
+            st.markdown("### 📅 Próximas Campañas")
+            for campana in foto['proximas']:
+                tipo_icon = "🔄" if campana['tipo'] == 'Continuidad' else "🎯"
+                st.info(f"{tipo_icon} **{campana['nombre']}** ({campana['tipo']}) - Inicia: {campana['inicio'].strftime('%d/%m/%Y')}")
+    else:
+        st.warning("⚠️ No se encontraron campañas configuradas")
+        st.info("Para configurar campañas, crea un archivo 'campanas.csv' con las columnas: Nombre, Fecha_Inicio, Fecha_Fin, Tipo_Campana (General/Continuidad), y los planes con sus respectivos descuentos.")
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Comparación de todos los planes para la familia de la calculadora (ver cubo_primas.py)"""
+import pandas as pd
+import streamlit as st
+
+from paginas.datos import obtener_cubo
+
+def tabla_comparacion(comparacion, num_cuotas, plan_seleccionado):
+    """Arma la tabla a mostrar a partir de CuboPrimas.comparar"""
+    filas = []
+    for fila in comparacion:
+        observaciones = []
+        if fila['sin_tarifa']:
+            observaciones.append(f"{fila['sin_tarifa']} asegurado(s) sin tarifa")
+        if not fila['edad_valida']:
+            observaciones.append("Requiere continuidad por edad")
+        filas.append({
+            'Plan': f"👉 {fila['plan']}" if fila['plan'] == plan_seleccionado else fila['plan'],
+            'Nombre Comercial': fila['nombre'],
+            'Prima Base': f"S/ {fila['total_base']:,.2f}",
+            'Descuento': f"{fila['descuento_pct']:g}%",
+            'Prima Total Anual': f"S/ {fila['total_prima']:,.2f}",
+            'Cuota' if num_cuotas == 1 else f'Cuota ({num_cuotas})': f"S/ {fila['cuota_mensual']:,.2f}",
+            'Costo Financiamiento': f"S/ {fila['costo_financiamiento']:,.2f}",
+            'Observaciones': "; ".join(observaciones)
+        })
+    return pd.DataFrame(filas)
+
+def mostrar_comparacion(integrantes, num_cuotas, tasa_interes, tiene_continuidad, plan_seleccionado):
+    """
+    Muestra lado a lado la prima y la cuota de cada plan para la familia
+
+    Parámetros:
+    - integrantes: lista de tuplas (relacion, edad), el titular primero
+    """
+    cubo = obtener_cubo()
+    if cubo is None or not integrantes:
+        return
+
+    st.markdown("### ⚖️ Comparación de Planes")
+    st.caption("Misma familia, cuotas y financiamiento en todos los planes, con la campaña vigente hoy")
+    comparacion = cubo.comparar(integrantes, num_cuotas, tasa_interes, tiene_continuidad)
+    st.dataframe(tabla_comparacion(comparacion, num_cuotas, plan_seleccionado), use_container_width=True, hide_index=True)
+
+    cotizables = [fila for fila in comparacion if not fila['sin_tarifa'] and fila['edad_valida']]
+    if cotizables:
+        economico = min(cotizables, key=lambda fila: fila['total_prima'])
+        st.caption(f"💡 Plan más económico para esta familia: **{economico['plan']}** "
+                   f"({economico['nombre']}) - S/ {economico['total_prima']:,.2f} al año")
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Acceso a los datos que necesitan las páginas (tarifario, campañas, estado compartido)"""
+import os
+
+import streamlit as st
+
+from calendario_campanas import CalendarioCampanas
+from cubo_primas import CuboPrimas
+from cotizador import cargar_tarifas, cargar_campanas, tabla_validaciones, referencia_configurada
+
+RUTA_TARIFAS = 'tarifario_base.csv'
+RUTA_CAMPANAS = 'campanas.csv'
+RUTA_LOGO = 'pacifico.png'
+
+def obtener_estado():
+    """
+    Retorna el estado en memoria compartida si hay un cargador publicando
+    (SRP_ESTADO_COMPARTIDO=1), o None para leer los CSV
+    """
+    if os.environ.get("SRP_ESTADO_COMPARTIDO") == "1":
+        import estado_compartido
+        return estado_compartido.adjuntar()
+    return None
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _tarifas(version):
+    errores = []
+    return cargar_tarifas(errores), errores
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _campanas(version):
+    return cargar_campanas()
+
+def obtener_tarifas():
+    """Tarifario desde la memoria compartida o desde el CSV (leído una vez por versión; no modificar)"""
+    estado = obtener_estado()
+    if estado is not None:
+        return estado.df_tarifas
+    df_tarifas, errores = _tarifas(version_tarifas())
+    for error in errores:
+        st.error(error)
+    return df_tarifas
+
+def obtener_campanas():
+    """Campañas desde la memoria compartida o desde el CSV (leídas una vez por versión; no modificar)"""
+    estado = obtener_estado()
+    if estado is not None:
+        return estado.df_campanas
+    return _campanas(version_campanas())
+
+def obtener_referencia():
+    """Base de referencia SQLite si SRP_REFERENCIA_DB apunta a una base cargada, o None"""
+    return referencia_configurada()
+
+def obtener_validaciones():
+    """Restricciones de edad por plan desde la base de referencia o las tablas del cotizador"""
+    referencia = obtener_referencia()
+    if referencia is not None:
+        return referencia.validaciones()
+    return tabla_validaciones()
+
+def version_tarifas():
+    """Identifica la versión vigente del tarifario (generación publicada, base de referencia o fecha del CSV)"""
+    estado = obtener_estado()
+    if estado is not None:
+        return ('compartido', estado.segmento)
+    referencia = obtener_referencia()
+    if referencia is not None:
+        return ('referencia', referencia.ruta_db, os.stat(referencia.ruta_db).st_mtime_ns)
+    try:
+        return ('csv', os.stat(RUTA_TARIFAS).st_mtime_ns)
+    except FileNotFoundError:
+        return ('sin_tarifario', None)
+
+def version_campanas():
+    """Identifica la versión vigente de la tabla de campañas (generación publicada o fecha del CSV)"""
+    estado = obtener_estado()
+    if estado is not None:
+        return ('compartido', estado.segmento)
+    referencia = obtener_referencia()
+    if referencia is not None:
+        return ('referencia', referencia.ruta_db, os.stat(referencia.ruta_db).st_mtime_ns)
+    try:
+        return ('csv', os.stat(RUTA_CAMPANAS).st_mtime_ns)
+    except FileNotFoundError:
+        return ('por_defecto', None)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _calendario(version):
+    return CalendarioCampanas(obtener_campanas())
+
+def obtener_calendario():
+    """Calendario de campañas, armado una vez por versión de la tabla"""
+    return _calendario(version_campanas())
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cubo(version_tarifas, version_campanas):
+    df_tarifas = obtener_tarifas()
+    if df_tarifas is None:
+        return None
+    return CuboPrimas(df_tarifas, obtener_campanas())
+
+def obtener_cubo():
+    """Cubo de primas de todos los planes, armado una vez por versión del tarifario y las campañas"""
+    return _cubo(version_tarifas(), version_campanas())
+
+@st.cache_resource(show_spinner=False)
+def _logo(version):
+    with open(RUTA_LOGO, 'rb') as f:
+        return f.read()
+
+def obtener_logo():
+    """Bytes del logo (leído una vez por versión del archivo), o None si no existe"""
+    try:
+        return _logo(os.stat(RUTA_LOGO).st_mtime_ns)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Módulo 1: Recomendador de Plan"""
+import streamlit as st
+
+import metricas
+
+from cotizador import (
+    DISTRITOS, normalizar_distrito, ajustar_plan_por_edad, obtener_planes_alternativos, recomendar_plan
+)
+from paginas.datos import obtener_estado, obtener_referencia
+
+def mostrar():
+    """Muestra el formulario del cliente y el plan recomendado"""
+    st.sidebar.header("Información del Cliente")
+    
+    # Campo de Continuidad
+    tiene_continuidad = st.sidebar.selectbox(
+        "¿Cuenta con continuidad?",
+        ["No", "Sí"],
+        help="La continuidad indica si el cliente viene de otro seguro de salud"
+    )
+    
+    # Guardar en session_state
+    st.session_state.tiene_continuidad = tiene_continuidad
+    
+    # Mostrar información sobre continuidad
+    if tiene_continuidad == "Sí":
+        st.sidebar.success("✅ Con continuidad: Sin restricción de edad")
+    else:
+        st.sidebar.warning("⚠️ Sin continuidad: Aplican restricciones de edad")
+    
+    Edad = st.sidebar.slider("Edad del Titular", min_value=18, max_value=90, step=1, value=st.session_state.edad_titular)
+    st.session_state.edad_titular = Edad
+    
+    Numero_dependientes = st.sidebar.slider("Número de afiliados", min_value=1, max_value=10, step=1, value=st.session_state.numero_afiliados)
+    st.session_state.numero_afiliados = Numero_dependientes
+
+    Distrito_display = st.sidebar.selectbox("Selecciona el distrito", DISTRITOS, 
+                                            index=DISTRITOS.index(st.session_state.distrito_cliente) 
+                                            if st.session_state.distrito_cliente in DISTRITOS else 0)
+    st.session_state.distrito_cliente = Distrito_display
+    Distrito = normalizar_distrito(Distrito_display)
+
+    Sexo = st.sidebar.selectbox("Sexo", ["Masculino", "Femenino"], 
+                                index=0 if st.session_state.sexo_cliente == "Masculino" else 1)
+    st.session_state.sexo_cliente = Sexo
+    
+    Tiene_Hijo_Menor = st.sidebar.selectbox("¿Incluye hijo menor de edad?", ["No", "Si"])
+
+    if st.sidebar.button("Generar Recomendación", type="primary"):
+        with st.spinner('🔍 Analizando perfil del cliente...'):
+            # Lógica de recomendación
+            estado = obtener_estado()
+            referencia = obtener_referencia()
+            if estado is not None:
+                plan = estado.recomendar_plan(Distrito, Sexo, Edad, Numero_dependientes)
+            elif referencia is not None:
+                plan = referencia.recomendar_plan(Distrito, Sexo, Edad, Numero_dependientes)
+            else:
+                plan = recomendar_plan(Distrito, Sexo, Edad, Numero_dependientes)
+
+            # Validar edad según continuidad
+            plan_ajustado, mensaje_error = ajustar_plan_por_edad(plan, Edad)
+            
+            if mensaje_error:
+                st.error(mensaje_error)
+                st.warning("💡 **Sugerencia:** El cliente necesita continuidad para acceder a este plan, o considera planes alternativos.")
+                # Plan alternativo válido para la edad
+                if plan_ajustado != plan:
+                    plan = plan_ajustado
+                    st.info(f"✅ Plan ajustado a: {plan}")
+            
+            # Guardar en session_state
+            metricas.RECOMENDACIONES.inc(plan, Distrito_display)
+            st.session_state.plan_recomendado = plan
+            st.session_state.recomendacion_generada = True
+            
+            # Obtener planes alternativos válidos
+            segunda_opcion, tercera_opcion = obtener_planes_alternativos(plan, Edad, tiene_continuidad)
+            
+            # Mostrar resultado - Plan Recomendado
+            st.success("✅ Recomendación generada exitosamente")
+            
+            st.markdown(
+                f"""
+                <div style="background-color:#e6f7ff; padding:30px; border-radius:15px; margin-bottom:20px; border:3px solid #00BFFF;">
+                    <h1 style='text-align:center; color:#00BFFF; font-weight:bold; text-shadow: 2px 2px 4px #aaa; margin-bottom:10px;'>
+                        🎯 PLAN RECOMENDADO: {plan}
+                    </h1>
+                    <p style='text-align:center; color:#0080ff; font-size:16px; margin-top:15px;'>
+                        Este es el plan más adecuado según el perfil del cliente
+                    </p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            
+            # Mostrar información de continuidad aplicada
+            if tiene_continuidad == "Sí":
+                st.info("ℹ️ **Campaña de Continuidad:** Este cliente califica para descuentos especiales por continuidad")
+            
+            # Opciones alternativas
+            st.markdown("### 🔄 Opciones Alternativas")
+            
+            col1, col2 = st.columns(2)
+            
+            # Segunda opción
+            if segunda_opcion:
+                with col1:
+                    st.markdown(
+                        f"""
+                        <div style="background-color:#f0f8ff; padding:20px; border-radius:12px; border:2px solid #87CEEB; height:160px; display:flex; flex-direction:column; justify-content:center;">
+                            <h3 style='text-align:center; color:#4682B4; margin-bottom:10px; font-size:18px;'>
+                                Segunda Opción
+                            </h3>
+                            <h2 style='text-align:center; color:#00BFFF; font-weight:bold; font-size:24px; line-height:1.2; word-wrap:break-word; padding:0 10px;'>
+                                {segunda_opcion}
+                            </h2>
+                            <p style='text-align:center; color:#666; font-size:14px; margin-top:10px;'>
+                                Alternativa recomendada
+                            </p>
+                        </div>
+                        """,
+                        unsafe_allow_html=True
+                    )
+            
+            # Tercera opción
+            if tercera_opcion:
+                with col2:
+                    st.markdown(
+                        f"""
+                        <div style="background-color:#f8f9fa; padding:15px; border-radius:10px; border:1px solid #B0C4DE; height:160px; display:flex; flex-direction:column; justify-content:center;">
+                            <h4 style='text-align:center; color:#708090; margin-bottom:8px; font-size:16px;'>
+                                Tercera Opción
+                            </h4>
+                            <h3 style='text-align:center; color:#4682B4; font-weight:bold; font-size:20px; line-height:1.2; word-wrap:break-word; padding:0 10px;'>
+                                {tercera_opcion}
+                            </h3>
+                            <p style='text-align:center; color:#888; font-size:13px; margin-top:8px;'>
+                                Opción adicional
+                            </p>
+                        </div>
+                        """,
+                        unsafe_allow_html=True
+                    )
+            
+            st.markdown("---")
+            
+            # Información adicional del cliente
+            st.markdown("### 📋 Detalles de la Recomendación")
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.info(f"**Cliente:** {Sexo}, {Edad} años")
+            with col2:
+                st.info(f"**Afiliados:** {Numero_dependientes} persona(s)")
+            with col3:
+                st.info(f"**Distrito:** {Distrito_display}")
+            with col4:
+                continuidad_icon = "✅" if tiene_continuidad == "Sí" else "❌"
+                st.info(f"**Continuidad:** {continuidad_icon} {tiene_continuidad}")
+            
+            # Llamado a acción para cotización
+            st.markdown(
+                """
+                <div style="background-color:#d1ecf1; padding:20px; border-radius:10px; border-left:5px solid #0c5460; margin:20px 0;">
+                    <h4 style='color:#0c5460; margin-bottom:10px;'>💰 ¿Listo para cotizar?</h4>
+                    <p style='color:#0c5460; margin:0;'>
+                        Los datos del cliente ya están cargados. 
+                        Ve a la <strong>Calculadora de Tarifas</strong> para generar la cotización con un solo clic.
+                    </p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+            # Registro de gestión
+            st.markdown("### 🎯 Siguiente Paso")
+            st.markdown(
+                """
+                <div style="text-align:center; margin:30px 0; padding:20px; background-color:#f0f8ff; border-radius:10px;">
+                    <p style="font-size:18px; margin-bottom:20px; color:#333;">No olvides registrar esta gestión</p>
+                    <a href="https://pacificocia-my.sharepoint.com/:f:/g/personal/mcamino_pacifico_com_pe/EoKRHieZhB9LkpJa6tCqClYBrvHnM6LK_nUkumbFrnALug?e=utUJBJ" target="_blank">
+                        <button style="background-color:#28a745; color:white; padding:15px 30px; font-size:18px; border:none; border-radius:10px; cursor:pointer; box-shadow:0 4px 8px rgba(40,167,69,0.3);">
+                            📝 Registrar Gestión
+                        </button>
+                    </a>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+    else:
+        st.markdown("### 👋 Bienvenido al Sistema de Recomendación")
+        st.write("Este sistema te ayudará a encontrar el plan de seguro integral más adecuado para cada cliente.")
+        
+        st.markdown("#### 📋 Instrucciones:")
+        st.write("""
+        1. **Completa la información** del cliente en el panel lateral
+        2. **Indica si tiene continuidad** (viene de otro seguro)
+        3. **Haz clic en 'Generar Recomendación'** para obtener el plan sugerido
+        4. **Revisa los detalles** del plan recomendado
+        5. **Ve a la Calculadora de Tarifas** para cotizar (datos ya cargados)
+        6. **Registra la gestión** según el resultado de la propuesta
+        """)
+        
+        # Mostrar información sobre continuidad
+        st.markdown("#### ℹ️ Sobre la Continuidad:")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("""
+            **Con Continuidad (Sí):**
+            - ✅ Sin restricción de edad
+            - ✅ Descuentos especiales (15%)
+            - ✅ Más opciones de planes
+            """)
+        with col2:
+            st.markdown("""
+            **Sin Continuidad (No):**
+            - ⚠️ Edad máxima 65 años (MSLD, MINT, MNAC, AM05)
+            - ⚠️ Edad máxima 60 años (AM18, AM17, AM15)
+            - 📊 Descuentos estándar
+            """)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Módulo 4: Recursos para asesores (no usa tarifario ni campañas)"""
+import base64
+import os
+
+import pandas as pd
+import streamlit as st
+
+from paginas.datos import obtener_validaciones
+
+def mostrar_pdf(archivo_pdf):
+    """Muestra un PDF en Streamlit"""
+    if not os.path.exists(archivo_pdf):
+        st.warning(f"El archivo {archivo_pdf} no está disponible.")
+        return False
+        
+    try:
+        with open(archivo_pdf, "rb") as f:
+            base64_pdf = base64.b64encode(f.read()).decode('utf-8')
+        
+        pdf_display = f"""
+        <embed src="data:application/pdf;base64,{base64_pdf}" 
+               width="100%" 
+               height="600" 
+               type="application/pdf">
+        """
+        st.markdown(pdf_display, unsafe_allow_html=True)
+        return True
+    except Exception as e:
+        st.error(f"Error al cargar el PDF: {str(e)}")
+        return False
+
+def crear_boton_descarga_pdf(archivo_pdf):
+    """Crea un botón para descargar el PDF"""
+    if not os.path.exists(archivo_pdf):
+        return False
+        
+    try:
+        with open(archivo_pdf, "rb") as pdf_file:
+            PDFbyte = pdf_file.read()
+
+        st.download_button(
+            label="📄 Descargar Cartilla Comparativa",
+            data=PDFbyte,
+            file_name="Cartilla_Comparativa_Seguros_Integrales_2024.pdf",
+            mime='application/octet-stream',
+            help="Haz clic para descargar la cartilla comparativa completa"
+        )
+        return True
+    except:
+        return False
+
+def mostrar():
+    """Muestra la cartilla, la guía de venta y la tabla de validaciones"""
+    st.header("📚 Recursos para Asesores")
+    
+    tab1, tab2, tab3 = st.tabs(["📄 Cartilla Comparativa", "💡 Guía de Venta", "📊 Validaciones"])
+    
+    with tab1:
+        st.subheader("Cartilla Comparativa de Seguros Integrales 2024")
+        
+        if not crear_boton_descarga_pdf("Cartilla Comparativa Seguros Integrales_2024.pdf"):
+            st.info("📋 La cartilla comparativa estará disponible próximamente.")
+        
+        st.markdown("---")
+        
+        if os.path.exists("Cartilla Comparativa Seguros Integrales_2024.pdf"):
+            st.write("**Vista previa del documento:**")
+            mostrar_pdf("Cartilla Comparativa Seguros Integrales_2024.pdf")
+        else:
+            st.markdown("""
+            ### 📋 Información de Planes Disponibles
+            
+            **Planes Principales:**
+            - **MNAC**: Medicvida Nacional - Plan premium con cobertura nacional amplia
+            - **MINT**: Medicvida Internacional - Plan con cobertura internacional
+            - **MSLD**: Multisalud - Plan estándar versátil para diferentes perfiles
+            - **AM18**: Multisalud Base - Plan base con red preferente
+            - **AM17**: Salud Esencial Plus - Versión mejorada del plan esencial
+            - **AM15**: Salud Esencial - Plan económico con coberturas esenciales
+            - **AM05**: Multisalud Base - Plan base con red preferente
+            
+            *La cartilla completa con coberturas detalladas estará disponible próximamente.*
+            """)
+    
+    with tab2:
+        st.subheader("🎯 Guía Rápida para Asesores")
+        
+        with st.expander("📞 Consejos para la Venta", expanded=True):
+            st.markdown("""
+            **✅ Mejores Prácticas:**
+            - Enfatiza los **beneficios específicos** del plan recomendado
+            - Explica las **diferencias entre planes** usando la cartilla
+            - Menciona la **cobertura por dependientes**
+            - Resalta las **redes de prestadores** disponibles
+            - Ofrece **formas de pago flexibles**
+            - Personaliza la propuesta según el **perfil del cliente**
+            - **Pregunta siempre por continuidad** para maximizar descuentos
+            """)
+        
+        with st.expander("❓ Preguntas Frecuentes"):
+            st.markdown("""
+            **P: ¿Qué pasa si el cliente no vive en los distritos listados?**  
+            R: Se aplican las reglas de "Otros distritos" del sistema
+            
+            **P: ¿Qué significa continuidad?**  
+            R: El cliente viene de otro seguro de salud. Con continuidad obtiene descuentos especiales (15%) y no tiene restricción de edad.
+            
+            **P: ¿Cuáles son las restricciones de edad sin continuidad?**  
+            R: MSLD, MINT, MNAC, AM05: máximo 65 años. AM18, AM17, AM15: máximo 60 años.
+            
+            **P: ¿Los precios incluyen IGV?**  
+            R: Verificar en la cartilla comparativa las condiciones específicas
+            
+            **P: ¿Se puede cambiar de plan después?**  
+            R: Consultar las condiciones de modificación en la cartilla
+            
+            **P: ¿Cómo funciona la cobertura para dependientes?**  
+            R: Cada dependiente tiene cobertura según el plan seleccionado
+            """)
+        
+        with st.expander("🔄 Sobre la Continuidad"):
+            st.markdown("""
+            **¿Qué es la continuidad?**
+            
+            La continuidad se refiere a que el cliente viene de otro seguro de salud sin interrupciones.
+            
+            **Ventajas de tener continuidad:**
+            - ✅ Sin restricción de edad de ingreso
+            - ✅ Descuentos especiales hasta 15%
+            - ✅ Más flexibilidad en la selección de planes
+            - ✅ Proceso de afiliación más ágil
+            
+            **Documentos requeridos para continuidad:**
+            - Certificado de cobertura del seguro anterior
+            - Carta de no adeudo (si aplica)
+            - Constancia de cese del seguro anterior
+            
+            **Importante:** La continuidad debe ser sin interrupciones mayores a 30 días.
+            """)
+    
+    with tab3:
+        st.subheader("📊 Tabla de Validaciones")
+        
+        st.markdown("""
+        ### Restricciones de Edad sin Continuidad
+        
+        Esta tabla muestra las edades máximas permitidas para cada plan cuando el cliente NO tiene continuidad:
+        """)
+        
+        # Crear tabla de validaciones
+        df_validaciones = pd.DataFrame(obtener_validaciones())
+        st.dataframe(df_validaciones, use_container_width=True)
+        
+        st.markdown("---")
+        
+        st.markdown("""
+        ### 💡 Recomendaciones según validaciones
+        
+        **Si el cliente tiene más de 65 años sin continuidad:**
+        - Ofrecer planes AM18, AM17 o AM15 solo si tiene 60 años o menos
+        - Sugerir obtener continuidad de su seguro anterior
+        - Considerar otras alternativas de seguro
+        
+        **Si el cliente tiene entre 60-65 años sin continuidad:**
+        - Recomendar MSLD, MINT, MNAC o AM05
+        - Evitar AM18, AM17 y AM15
+        
+        **Si el cliente tiene continuidad:**
+        - ✅ Todas las edades son válidas
+        - ✅ Aplicar descuento del 15%
+        - ✅ Mayor flexibilidad en la selección
+        """)
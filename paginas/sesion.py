@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Guardado y restauración del estado de la sesión del asesor (ver sesiones.py)
+
+Si el asesor está autenticado (st.user con email: login OIDC configurado en
+[auth] de secrets.toml, o un proxy que lo envía en una cabecera mapeada con
+server.trustedUserHeaders), la sesión se guarda bajo su identidad y la
+recupera desde cualquier navegador. Sin autenticación se identifica por un
+?sesion= aleatorio que se genera al entrar; así una recarga del navegador
+tras un reinicio del servidor recupera los mismos datos, y nadie puede
+adivinar la clave de otra sesión.
+"""
+import secrets
+
+import streamlit as st
+
+from sesiones import AlmacenSesiones
+
+# Datos de la recomendación que se conservan entre reinicios
+CAMPOS_SESION = [
+    'recomendacion_generada', 'plan_recomendado', 'edad_titular', 'numero_afiliados',
+    'tiene_continuidad', 'distrito_cliente', 'sexo_cliente'
+]
+
+@st.cache_resource
+def obtener_almacen_sesiones():
+    """Almacén de sesiones compartido por todas las sesiones del servidor"""
+    return AlmacenSesiones()
+
+def clave_sesion():
+    """Clave del asesor autenticado (st.user) o de la sesión (?sesion=, token aleatorio que se crea si falta)"""
+    email = st.user.get('email')
+    if email:
+        return f"usuario:{email.strip().lower()}"
+    parametros = st.query_params
+    if not parametros.get('sesion'):
+        parametros['sesion'] = secrets.token_urlsafe(16)
+    return f"sesion:{parametros['sesion']}"
+
+def restaurar_sesion():
+    """Carga la foto guardada una sola vez, al inicio de la sesión"""
+    if 'sesion_clave' in st.session_state:
+        return
+    st.session_state.sesion_clave = clave_sesion()
+    datos = obtener_almacen_sesiones().restaurar(st.session_state.sesion_clave) or {}
+    for campo in CAMPOS_SESION:
+        if campo in datos:
+            st.session_state[campo] = datos[campo]
+    st.session_state.sesion_guardada = {campo: datos.get(campo) for campo in CAMPOS_SESION}
+
+def guardar_sesion():
+    """Encola la foto de la sesión si cambió desde el último guardado"""
+    foto = {campo: st.session_state.get(campo) for campo in CAMPOS_SESION}
+    if foto != st.session_state.sesion_guardada:
+        obtener_almacen_sesiones().guardar(st.session_state.sesion_clave, foto)
+        st.session_state.sesion_guardada = foto
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+Generación de propuestas en PDF a partir de una cotización.
+
+El PDF se arma directamente (Helvetica, sin dependencias externas) en un pool
+de hilos para no bloquear el hilo del script de Streamlit. Los documentos se
+guardan en caché por el hash de la cotización. Para las renovaciones existe
+un modo masivo que reparte las propuestas entre varios procesos:
+
+    python propuestas.py renovacion.csv propuestas/ --procesos 8
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+
+# ==================== ESCRITURA DE PDF ====================
+
+ANCHO_PAGINA = 595
+ALTO_PAGINA = 842
+MARGEN = 50
+
+FORMATO_FECHA = '%d/%m/%Y'
+
+def _texto_pdf(texto):
+    """Codifica un texto como literal PDF (WinAnsi), descartando emojis"""
+    datos = str(texto).encode('cp1252', 'ignore')
+    datos = datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return b'(' + datos + b')'
+
+def _construir_pdf(renglones):
+    """
+    Construye un PDF paginado a partir de una lista de renglones
+
+    Parámetros:
+    - renglones: lista de tuplas (fuente, tamaño, celdas), donde fuente es
+      'F1' (normal) o 'F2' (negrita) y celdas es una lista de (x, texto)
+
+    Retorna: bytes del documento
+    """
+    paginas = []
+    contenido = []
+    y = ALTO_PAGINA - MARGEN
+
+    for fuente, tamano, celdas in renglones:
+        alto = tamano + 6
+        if y - alto < MARGEN:
+            paginas.append(b'\n'.join(contenido))
+            contenido = []
+            y = ALTO_PAGINA - MARGEN
+        y -= alto
+        for x, texto in celdas:
+            contenido.append(
+                b'BT /%s %d Tf %d %d Td %s Tj ET' % (fuente.encode(), tamano, x, y, _texto_pdf(texto))
+            )
+    paginas.append(b'\n'.join(contenido))
+
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3-4 fuentes, luego página + contenido
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    kids = []
+    for stream in paginas:
+        num_pagina = len(objetos) + 1
+        kids.append(b'%d 0 R' % num_pagina)
+        objetos.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+            % (ANCHO_PAGINA, ALTO_PAGINA, num_pagina + 1)
+        )
+        objetos.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+    objetos[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+    salida = bytearray(b'%PDF-1.4\n')
+    posiciones = []
+    for i, objeto in enumerate(objetos, start=1):
+        posiciones.append(len(salida))
+        salida += b'%d 0 obj\n%s\nendobj\n' % (i, objeto)
+    inicio_xref = len(salida)
+    salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    for posicion in posiciones:
+        salida += b'%010d 00000 n \n' % posicion
+    salida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+    return bytes(salida)
+
+# ==================== PROPUESTA ====================
+
+def _soles(monto):
+    return f"S/ {monto:,.2f}"
+
+def hash_cotizacion(cotizacion):
+    """Calcula la clave de caché de una cotización (SHA-256 de su JSON canónico)"""
+    serializada = json.dumps(cotizacion, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(serializada.encode('utf-8')).hexdigest()
+
+def con_fecha(cotizacion, fecha=None):
+    """
+    Cotización con la fecha que imprime su propuesta (por defecto, hoy)
+
+    La fecha entra en el hash, así la caché no sirve el PDF de otro día.
+    Retorna la misma cotización si ya trae 'fecha', si no una copia.
+    """
+    if cotizacion.get('fecha'):
+        return cotizacion
+    return dict(cotizacion, fecha=(fecha or datetime.now()).strftime(FORMATO_FECHA))
+
+def renderizar_propuesta(cotizacion):
+    """
+    Genera el PDF de la propuesta comercial
+
+    Parámetros:
+    - cotizacion: diccionario devuelto por cotizador.resumir_cotizacion, con
+      las claves opcionales 'cliente' (dict) y 'fecha' (texto)
+
+    Retorna: bytes del PDF
+    """
+    renglones = [
+        ('F2', 18, [(MARGEN, "Pacífico Seguros - Propuesta de Seguro Integral")]),
+        ('F1', 10, [(MARGEN, f"Fecha: {cotizacion.get('fecha') or datetime.now().strftime(FORMATO_FECHA)}")]),
+        ('F1', 6, []),
+        ('F2', 13, [(MARGEN, f"Plan: {cotizacion['plan']}")]),
+    ]
+
+    cliente = cotizacion.get('cliente') or {}
+    for etiqueta, valor in cliente.items():
+        renglones.append(('F1', 10, [(MARGEN, f"{etiqueta}: {valor}")]))
+    renglones.append(('F1', 10, [(MARGEN, f"Continuidad: {cotizacion['tiene_continuidad']}")]))
+
+    # Tabla de asegurados
+    columnas = [MARGEN, 160, 220, 320, 400]
+    renglones.append(('F1', 6, []))
+    renglones.append(('F2', 12, [(MARGEN, "Detalle por Asegurado")]))
+    renglones.append(('F2', 10, list(zip(columnas, ['Relación', 'Edad', 'Prima Base', 'Descuento', 'Prima Final']))))
+    for a in cotizacion['asegurados']:
+        renglones.append(('F1', 10, list(zip(columnas, [
+            a['relacion'], a['edad'], _soles(a['tarifa_base']), f"{a['descuento_pct']}%", _soles(a['tarifa_final'])
+        ]))))
+
+    # Resumen
+    renglones.append(('F1', 6, []))
+    renglones.append(('F2', 12, [(MARGEN, "Resumen de Cotización")]))
+    renglones.append(('F1', 10, [(MARGEN, f"Prima Total Anual: {_soles(cotizacion['total_prima'])}")]))
+    renglones.append(('F1', 10, [(MARGEN, f"Número de Cuotas: {cotizacion['num_cuotas']}")]))
+    renglones.append(('F1', 10, [(MARGEN, f"Cuota Mensual: {_soles(cotizacion['cuota_mensual'])}")]))
+    renglones.append(('F1', 10, [(MARGEN, f"Costo Financiamiento: {_soles(cotizacion['costo_financiamiento'])}")]))
+
+    if cotizacion.get('campana'):
+        tipo_campana = "Continuidad" if cotizacion['tiene_continuidad'] == "Sí" else "General"
+        ahorro = cotizacion['total_base'] - cotizacion['total_prima']
+        renglones.append(('F1', 10, [(MARGEN, f"Campaña aplicada: {cotizacion['campana']} ({tipo_campana}) - Ahorro: {_soles(ahorro)}")]))
+
+    # Plan de pagos
+    if cotizacion.get('pagos'):
+        renglones.append(('F1', 6, []))
+        renglones.append(('F2', 12, [(MARGEN, "Plan de Pagos")]))
+        renglones.append(('F2', 10, list(zip(columnas, ['Cuota', 'Pago', 'Capital', 'Interés', 'Saldo']))))
+        for p in cotizacion['pagos']:
+            renglones.append(('F1', 10, list(zip(columnas, [
+                p['cuota'], _soles(p['pago']), _soles(p['capital']), _soles(p['interes']), _soles(p['saldo'])
+            ]))))
+
+    return _construir_pdf(renglones)
+
+# ==================== SERVICIO EN SEGUNDO PLANO ====================
+
+class ServicioPropuestas:
+    """
+    Pool de hilos que renderiza propuestas con caché LRU por hash de cotización.
+
+    solicitar() retorna de inmediato la clave; obtener() devuelve el PDF cuando
+    está listo (None mientras se genera) y relanza el error si el render falló.
+    """
+
+    def __init__(self, max_workers=2, max_documentos=256):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="propuestas")
+        self._max_documentos = max_documentos
+        self._cache = OrderedDict()
+        self._pendientes = {}
+        self._lock = threading.Lock()
+
+    def solicitar(self, cotizacion):
+        """Encola el render de la cotización (si no está en caché) y retorna su clave"""
+        cotizacion = con_fecha(cotizacion)
+        clave = hash_cotizacion(cotizacion)
+        with self._lock:
+            if clave in self._cache or clave in self._pendientes:
+                return clave
+            futuro = self._executor.submit(renderizar_propuesta, cotizacion)
+            self._pendientes[clave] = futuro
+        futuro.add_done_callback(lambda f: self._guardar(clave, f))
+        return clave
+
+    def _guardar(self, clave, futuro):
+        if futuro.exception() is not None:
+            return
+        with self._lock:
+            self._pendientes.pop(clave, None)
+            self._cache[clave] = futuro.result()
+            while len(self._cache) > self._max_documentos:
+                self._cache.popitem(last=False)
+
+    def obtener(self, clave, espera=0):
+        """
+        Retorna el PDF si ya está generado, None si sigue en proceso
+
+        Parámetros:
+        - espera: segundos que se espera al render en curso antes de retornar None
+        """
+        with self._lock:
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                return self._cache[clave]
+            futuro = self._pendientes.get(clave)
+        if futuro is None:
+            return None
+        if espera:
+            wait([futuro], timeout=espera)
+        if not futuro.done():
+            return None
+        with self._lock:
+            self._pendientes.pop(clave, None)
+        return futuro.result()
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# ==================== MODO MASIVO (RENOVACIONES) ====================
+
+def _escribir_propuesta(cotizacion, directorio):
+    cotizacion = con_fecha(cotizacion)
+    ruta = os.path.join(directorio, f"propuesta_{hash_cotizacion(cotizacion)[:16]}.pdf")
+    if not os.path.exists(ruta):
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(renderizar_propuesta(cotizacion))
+        os.replace(temporal, ruta)
+    return ruta
+
+def _escribir_bloque(args):
+    cotizaciones, directorio = args
+    return [_escribir_propuesta(cotizacion, directorio) for cotizacion in cotizaciones]
+
+def generar_propuestas_masivas(cotizaciones, directorio, procesos=None, chunksize=64):
+    """
+    Genera un PDF por cotización en el directorio indicado usando varios procesos
+
+    Los archivos se nombran por el hash de la cotización (con su fecha), por
+    lo que una corrida repetida el mismo día reutiliza los documentos ya
+    generados. Las cotizaciones se envían por bloques de `chunksize`, con a lo
+    sumo dos bloques en curso por proceso: la memoria no crece con la cartera.
+
+    Retorna: generador de rutas, en el mismo orden de las cotizaciones
+    """
+    os.makedirs(directorio, exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+    pendientes = iter(cotizaciones)
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        en_curso = deque()
+        while True:
+            while len(en_curso) < 2 * procesos:
+                bloque = list(itertools.islice(pendientes, chunksize))
+                if not bloque:
+                    break
+                en_curso.append(executor.submit(_escribir_bloque, (bloque, directorio)))
+            if not en_curso:
+                return
+            yield from en_curso.popleft().result()
+
+def _cotizar_bloque(df_cartera, cubo, fecha, omitidas):
+    """Cotiza cada ID_Familia de un bloque de la cartera con las primas del cubo"""
+    import pandas as pd
+
+    if 'Tasa' not in df_cartera.columns:
+        df_cartera = df_cartera.assign(Tasa=0.0)
+
+    # Se leen las columnas una vez; cada familia es una lista de posiciones
+    ids = df_cartera['ID_Familia'].tolist()
+    planes = df_cartera['Plan'].tolist()
+    relaciones = df_cartera['Relacion'].tolist()
+    edades = df_cartera['Edad'].astype(int).tolist()
+    cuotas = df_cartera['Cuotas'].astype(int).tolist()
+    tasas = df_cartera['Tasa'].astype(float).tolist()
+    continuidades = df_cartera['Continuidad'].tolist()
+    emails = df_cartera['Email'].tolist() if 'Email' in df_cartera.columns else None
+
+    for posiciones in df_cartera.groupby('ID_Familia', sort=False).indices.values():
+        primera = posiciones[0]
+        cotizacion, _ = cubo.cotizar(
+            planes[primera], [(relaciones[i], edades[i]) for i in posiciones],
+            cuotas[primera], tasas[primera], continuidades[primera], fecha
+        )
+        if not cotizacion['asegurados']:
+            # Ningún integrante tiene tarifa para el plan: no hay propuesta que generar
+            if omitidas is not None:
+                omitidas.append(ids[primera])
+            continue
+        cotizacion['cliente'] = {'Familia': ids[primera]}
+        if emails is not None and pd.notna(emails[primera]):
+            cotizacion['cliente']['Email'] = emails[primera]
+        yield cotizacion
+
+def aviso_omitidas(omitidas, maximo=10):
+    """Texto para informar las familias omitidas por cotizaciones_desde_cartera"""
+    muestra = ", ".join(str(id_familia) for id_familia in omitidas[:maximo])
+    return (f"{len(omitidas)} familia(s) sin tarifa para su plan, sin cotización: "
+            f"{muestra}{' ...' if len(omitidas) > maximo else ''}")
+
+def cotizaciones_desde_cartera(ruta_cartera, df_tarifas, df_campanas, filas_por_bloque=None, fecha=None,
+                               omitidas=None):
+    """
+    Cotiza una cartera de renovación en CSV
+
+    Columnas esperadas: ID_Familia, Plan, Relacion, Edad, Continuidad, Cuotas
+    y opcionalmente Tasa (0 por defecto) y Email. Cada ID_Familia es una
+    cotización. Las primas salen de un CuboPrimas armado una vez (mismos
+    montos que cotizador.cotizar_familia) y toda la cartera se cotiza con la
+    misma fecha.
+
+    Parámetros:
+    - filas_por_bloque: si se indica, la cartera se lee por bloques de ese
+      tamaño en lugar de cargarla entera; las filas de cada familia deben
+      estar juntas (como las escribe generador_cartera.py)
+    - fecha: fecha de la cotización (por defecto, el inicio de la corrida)
+    - omitidas: lista opcional donde se agregan los ID_Familia sin ningún
+      integrante con tarifa para su plan (no generan cotización)
+
+    Retorna: generador de cotizaciones
+    """
+    import pandas as pd
+    from cubo_primas import CuboPrimas
+
+    cubo = CuboPrimas(df_tarifas, df_campanas)
+    fecha = fecha if fecha is not None else datetime.now()
+
+    if not filas_por_bloque:
+        yield from _cotizar_bloque(pd.read_csv(ruta_cartera), cubo, fecha, omitidas)
+        return
+
+    resto = None
+    for bloque in pd.read_csv(ruta_cartera, chunksize=filas_por_bloque):
+        if resto is not None:
+            bloque = pd.concat([resto, bloque], ignore_index=True)
+        # La última familia del bloque puede continuar en el siguiente
+        ultima = bloque['ID_Familia'].iloc[-1]
+        es_ultima = (bloque['ID_Familia'] == ultima).to_numpy()
+        resto = bloque[es_ultima]
+        yield from _cotizar_bloque(bloque[~es_ultima], cubo, fecha, omitidas)
+    if resto is not None:
+        yield from _cotizar_bloque(resto, cubo, fecha, omitidas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera propuestas PDF para una cartera de renovación")
+    parser.add_argument("cartera", help="CSV con ID_Familia, Plan, Relacion, Edad, Continuidad, Cuotas[, Tasa]")
+    parser.add_argument("directorio", help="Carpeta de salida de los PDF")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de render (por defecto, núcleos disponibles)")
+    args = parser.parse_args()
+
+    from cotizador import cargar_tarifas, cargar_campanas
+
+    errores = []
+    df_tarifas = cargar_tarifas(errores)
+    if df_tarifas is None:
+        raise SystemExit("\n".join(errores) or "No se pudo cargar el tarifario")
+    df_campanas = cargar_campanas()
+
+    inicio = datetime.now()
+    omitidas = []
+    rutas = generar_propuestas_masivas(
+        cotizaciones_desde_cartera(args.cartera, df_tarifas, df_campanas, omitidas=omitidas),
+        args.directorio, procesos=args.procesos
+    )
+    cantidad = sum(1 for _ in rutas)
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"{cantidad} propuestas generadas en {segundos:.1f} s -> {args.directorio}")
+    if omitidas:
+        print(aviso_omitidas(omitidas))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga: simula asesores concurrentes sobre una sola instancia de la app.
+
+Se inicia un servidor de streamlit_app.py (con `calentamiento.py servir`,
+como en producción) y N clientes se conectan a la vez por el mismo websocket
+que usa el navegador (/_stcore/stream). Cada cliente es una sesión de
+Streamlit que repite el flujo típico de un asesor: recomendar, pasar a la
+Calculadora, editar edades, cambiar cuotas y revisar Campañas Vigentes.
+Todas las sesiones comparten el proceso del servidor: las cachés de
+cache_resource, el GIL y el runtime de Streamlit, igual que en un despliegue.
+
+    python prueba_carga.py --sesiones 1 2 4 8 --flujos 5
+    python prueba_carga.py --url http://127.0.0.1:8501 --pid 12345   (servidor ya levantado)
+
+La latencia de un paso va desde que el cliente envía el rerun hasta que el
+servidor informa el fin del script. El CPU y la memoria son los del proceso
+del servidor: la memoria por sesión es el aumento del RSS sobre el servidor
+en reposo (medido antes de cada nivel, ya calentado), dividido por las
+sesiones del nivel. Los clientes corren en este proceso con asyncio y solo
+decodifican mensajes, así que no compiten por el GIL del servidor.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from cotizador import SEXOS, EDAD_MIN_TITULAR, EDAD_MAX_TITULAR
+
+RUTA_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+RUTA_CALENTAMIENTO = os.path.join(os.path.dirname(RUTA_APP), "calentamiento.py")
+
+DISTRITOS = ["Santiago de Surco", "Miraflores", "San Juan de Lurigancho", "Cercado de Lima", "Otro"]
+
+# Widgets que el flujo del asesor maneja
+TIPOS_WIDGET = {'radio', 'selectbox', 'slider', 'number_input', 'button'}
+
+# Muestreo del RSS del servidor mientras corre un nivel (s)
+INTERVALO_MUESTREO = 0.05
+
+# ==================== SERVIDOR ====================
+
+def puerto_libre():
+    """Un puerto TCP libre en 127.0.0.1"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def iniciar_servidor(puerto=None, timeout=60):
+    """
+    Levanta streamlit_app.py con `calentamiento.py servir` y espera a que responda
+
+    Las sesiones desconectadas se liberan de inmediato (disconnectedSessionTTL
+    = 0) para que el reposo entre niveles no arrastre las del nivel anterior.
+
+    Retorna: (proceso, url)
+    """
+    puerto = puerto or puerto_libre()
+    entorno = dict(os.environ, SRP_METRICAS_PUERTO=str(puerto_libre()))
+    proceso = subprocess.Popen(
+        [sys.executable, RUTA_CALENTAMIENTO, "servir", "--",
+         "--server.port", str(puerto), "--server.address", "127.0.0.1", "--server.headless", "true",
+         "--server.disconnectedSessionTTL", "0", "--browser.gatherUsageStats", "false"],
+        cwd=os.path.dirname(RUTA_APP), env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al iniciar (código {proceso.returncode})")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1) as respuesta:
+                if respuesta.status == 200:
+                    return proceso, url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError(f"El servidor no respondió en {timeout:g} s")
+
+def detener_servidor(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+def rss_mb(pid):
+    """RSS actual de un proceso (Linux); 0 si no está disponible"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def cpu_s(pid):
+    """Tiempo de CPU (usuario + sistema) consumido por un proceso (Linux); 0 si no está disponible"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Los campos 14 y 15 (utime, stime) van después del nombre entre paréntesis
+            campos = f.read().rsplit(")", 1)[1].split()
+        return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+# ==================== CLIENTE WEBSOCKET ====================
+
+class SesionWeb:
+    """
+    Sesión de Streamlit manejada por websocket, como la abre un navegador.
+
+    Guarda los widgets del último rerun (por etiqueta o clave) y los valores
+    que el asesor fue cambiando; cada rerun envía esos valores como haría el
+    navegador.
+    """
+
+    def __init__(self, url, timeout=60):
+        self.url = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.timeout = timeout
+        self.widgets = []
+        self._valores = {}
+        self._disparos = set()
+        self._consulta = ""
+        self._ws = None
+
+    async def __aenter__(self):
+        import websockets
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *_):
+        await self._ws.close()
+
+    def widget(self, etiqueta=None, clave=None, barra_lateral=None):
+        """Busca un widget del último rerun por etiqueta o por clave (key=)"""
+        for en_barra, tipo, elemento in self.widgets:
+            if barra_lateral is not None and en_barra != barra_lateral:
+                continue
+            if (etiqueta is not None and elemento.label == etiqueta) or \
+                    (clave is not None and elemento.id.endswith(f"-{clave}")):
+                return tipo, elemento
+        raise LookupError(f"No se encontró el widget '{etiqueta or clave}'")
+
+    def fijar(self, valor, etiqueta=None, clave=None, barra_lateral=None):
+        """Cambia el valor de un radio, selectbox, slider o number_input"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        tipo, elemento = self.widget(etiqueta, clave, barra_lateral)
+        estado = WidgetState(id=elemento.id)
+        if tipo in ('radio', 'selectbox'):
+            texto = str(valor)
+            if texto not in elemento.options:
+                raise ValueError(f"'{texto}' no es una opción de '{elemento.label}'")
+            estado.string_value = texto
+        elif tipo == 'slider':
+            estado.double_array_value.data[:] = [valor]
+        elif tipo == 'number_input':
+            estado.double_value = valor
+        else:
+            raise TypeError(f"Widget no soportado: {tipo}")
+        self._valores[elemento.id] = estado
+
+    def clic(self, etiqueta, barra_lateral=None):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, elemento = self.widget(etiqueta, barra_lateral=barra_lateral)
+        self._valores[elemento.id] = WidgetState(id=elemento.id, trigger_value=True)
+        self._disparos.add(elemento.id)
+
+    async def rerun(self, paso, latencias):
+        """Envía un rerun con los valores actuales y espera el fin del script"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = self._consulta
+        mensaje.rerun_script.widget_states.widgets.extend(self._valores.values())
+        # Un botón vale True solo en el rerun del clic
+        for id_widget in self._disparos:
+            self._valores.pop(id_widget, None)
+        self._disparos.clear()
+
+        inicio = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+        elementos = {}
+        while True:
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(await asyncio.wait_for(self._ws.recv(), self.timeout))
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "delta" and respuesta.delta.WhichOneof("type") == "new_element":
+                elemento = respuesta.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                if tipo_elemento == "exception":
+                    raise RuntimeError(f"Excepción en el paso '{paso}': {elemento.exception.message}")
+                ruta = tuple(respuesta.metadata.delta_path)
+                elementos[ruta] = (ruta[0] == 1, tipo_elemento, getattr(elemento, tipo_elemento))
+            elif tipo == "page_info_changed":
+                # La app cambió los parámetros de la URL (?sesion=); el navegador los reenvía
+                self._consulta = respuesta.page_info_changed.query_string
+            elif tipo == "script_finished" and respuesta.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                if respuesta.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError(f"Error de compilación en el paso '{paso}'")
+                break
+        latencias.append((paso, (time.perf_counter() - inicio) * 1000))
+        self.widgets = [w for _, w in sorted(elementos.items()) if w[1] in TIPOS_WIDGET]
+
+# ==================== FLUJO DE UN ASESOR ====================
+
+async def flujo_asesor(sesion, rng, latencias):
+    """Recorre un flujo completo sobre una sesión ya iniciada"""
+    # 1. Recomendador
+    sesion.fijar("🎯 Recomendador de Plan", "📋 Menú Principal")
+    await sesion.rerun("menu_recomendador", latencias)
+    sesion.fijar(rng.choice(["No", "Sí"]), "¿Cuenta con continuidad?")
+    sesion.fijar(rng.randint(EDAD_MIN_TITULAR, 60), "Edad del Titular")
+    sesion.fijar(rng.randint(1, 4), "Número de afiliados")
+    sesion.fijar(rng.choice(DISTRITOS), "Selecciona el distrito")
+    sesion.fijar(rng.choice(SEXOS), "Sexo")
+    sesion.clic("Generar Recomendación")
+    await sesion.rerun("recomendar", latencias)
+
+    # 2. Calculadora con los datos precargados
+    sesion.fijar("💰 Calculadora de Tarifas", "📋 Menú Principal")
+    await sesion.rerun("menu_calculadora", latencias)
+
+    # 3. Editar edades de los asegurados
+    num_asegurados = rng.randint(2, 4)
+    sesion.fijar(num_asegurados, "Número de asegurados")
+    await sesion.rerun("num_asegurados", latencias)
+    sesion.fijar(rng.randint(EDAD_MIN_TITULAR, EDAD_MAX_TITULAR - 30), clave="edad_0")
+    await sesion.rerun("editar_edad", latencias)
+    for i in range(1, num_asegurados):
+        sesion.fijar(rng.randint(0, 25), clave=f"edad_{i}")
+        await sesion.rerun("editar_edad", latencias)
+
+    # 4. Cuotas y financiamiento
+    sesion.fijar(rng.choice([1, 4, 6, 10, 12]), "Número de Cuotas")
+    await sesion.rerun("cuotas", latencias)
+    sesion.fijar("Con Interés (4%)", "Tipo de Financiamiento")
+    await sesion.rerun("cuotas", latencias)
+
+    # 5. Campañas vigentes
+    sesion.fijar("📊 Campañas Vigentes", "📋 Menú Principal")
+    await sesion.rerun("menu_campanas", latencias)
+
+async def ejecutar_sesion(url, semilla, flujos, timeout):
+    """Una sesión de asesor: abre la app y corre `flujos` flujos; retorna sus latencias"""
+    rng = random.Random(semilla)
+    latencias = []
+    async with SesionWeb(url, timeout) as sesion:
+        await sesion.rerun("inicio", latencias)
+        for _ in range(flujos):
+            await flujo_asesor(sesion, rng, latencias)
+    return latencias
+
+# ==================== MEDICIÓN ====================
+
+def percentil(valores, p):
+    """Percentil por interpolación lineal (p entre 0 y 100)"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+async def _correr_nivel(url, pid, sesiones, flujos, semilla, timeout):
+    rss_maximo = rss_reposo = rss_mb(pid)
+    cpu_inicial = cpu_s(pid)
+
+    async def muestrear():
+        nonlocal rss_maximo
+        while True:
+            rss_maximo = max(rss_maximo, rss_mb(pid))
+            await asyncio.sleep(INTERVALO_MUESTREO)
+
+    monitor = asyncio.create_task(muestrear())
+    inicio = time.perf_counter()
+    try:
+        resultados = await asyncio.gather(
+            *(ejecutar_sesion(url, semilla + i, flujos, timeout) for i in range(sesiones))
+        )
+    finally:
+        monitor.cancel()
+    duracion = time.perf_counter() - inicio
+    rss_maximo = max(rss_maximo, rss_mb(pid))
+    return resultados, duracion, cpu_s(pid) - cpu_inicial, rss_reposo, rss_maximo
+
+def correr_nivel(url, pid, sesiones, flujos, semilla, timeout):
+    """
+    Lanza `sesiones` sesiones concurrentes contra el servidor y resume sus mediciones
+
+    Parámetros:
+    - pid: proceso del servidor para CPU y memoria (None para no medirlos)
+    """
+    resultados, duracion, cpu, rss_reposo, rss_maximo = asyncio.run(
+        _correr_nivel(url, pid, sesiones, flujos, semilla, timeout)
+    )
+    latencias = [ms for r in resultados for _, ms in r]
+    por_paso = {}
+    for r in resultados:
+        for paso, ms in r:
+            por_paso.setdefault(paso, []).append(ms)
+
+    return {
+        'sesiones': sesiones,
+        'reruns': len(latencias),
+        'duracion_s': duracion,
+        'reruns_por_s': len(latencias) / duracion,
+        'p50_ms': percentil(latencias, 50),
+        'p90_ms': percentil(latencias, 90),
+        'p99_ms': percentil(latencias, 99),
+        'max_ms': max(latencias),
+        'media_ms': statistics.mean(latencias),
+        'cpu_s_por_sesion': cpu / sesiones,
+        'rss_reposo_mb': rss_reposo,
+        'rss_max_mb': rss_maximo,
+        'rss_mb_por_sesion': (rss_maximo - rss_reposo) / sesiones,
+        'p90_ms_por_paso': {paso: percentil(v, 90) for paso, v in por_paso.items()},
+    }
+
+# ==================== REPORTE ====================
+
+def imprimir_reporte(niveles):
+    print(f"{'Sesiones':>8} {'Reruns':>7} {'Rerun/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'máx ms':>8} {'CPU s/ses':>9} {'+MB/ses':>8} {'RSS máx':>8}")
+    for n in niveles:
+        print(f"{n['sesiones']:>8} {n['reruns']:>7} {n['reruns_por_s']:>8.1f} {n['p50_ms']:>8.1f} "
+              f"{n['p90_ms']:>8.1f} {n['p99_ms']:>8.1f} {n['max_ms']:>8.1f} "
+              f"{n['cpu_s_por_sesion']:>9.2f} {n['rss_mb_por_sesion']:>8.1f} {n['rss_max_mb']:>8.1f}")
+
+    print("\np90 por paso (ms):")
+    pasos = list(niveles[0]['p90_ms_por_paso'])
+    print(f"{'Paso':<18}" + "".join(f"{n['sesiones']:>9}" for n in niveles))
+    for paso in pasos:
+        print(f"{paso:<18}" + "".join(f"{n['p90_ms_por_paso'].get(paso, 0):>9.1f}" for n in niveles))
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de sesiones de asesores sobre una instancia")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Niveles de concurrencia a medir")
+    parser.add_argument("--flujos", type=int, default=3, help="Flujos completos por sesión")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout por rerun (s)")
+    parser.add_argument("--url", help="Servidor ya iniciado (por defecto se levanta uno)")
+    parser.add_argument("--pid", type=int, help="PID de ese servidor, para medir su CPU y memoria")
+    parser.add_argument("--json", help="Guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    proceso = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        proceso, url = iniciar_servidor(timeout=args.timeout)
+        pid = proceso.pid
+    try:
+        # Una sesión previa deja el servidor caliente; el reposo se mide después
+        asyncio.run(ejecutar_sesion(url, args.semilla - 1, 1, args.timeout))
+        niveles = []
+        for sesiones in args.sesiones:
+            niveles.append(correr_nivel(url, pid, sesiones, args.flujos, args.semilla, args.timeout))
+            print(f"{sesiones} sesión(es): p90 {niveles[-1]['p90_ms']:.1f} ms", flush=True)
+    finally:
+        if proceso is not None:
+            detener_servidor(proceso)
+
+    print()
+    imprimir_reporte(niveles)
+    if pid is None:
+        print("\n(sin --pid no se miden CPU ni memoria del servidor)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(niveles, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+Base de referencia en SQLite: tarifario, campañas, planes y reglas en un
+solo archivo indexado.
+
+`construir_referencia` carga de una vez el tarifario y las campañas (CSV o
+XLSX, sin openpyxl) junto con las tablas de código de cotizador.py (planes,
+nombres comerciales, edades máximas, orden de ajuste, grupos de distritos y
+la regla de recomendación precalculada). La base se arma en un archivo
+temporal y se activa con os.replace, así los lectores nunca ven una carga a
+medias.
+
+`Referencia` es el camino de lectura: una conexión de solo lectura por hilo
+y consultas parametrizadas con SQL fijo, que sqlite3 mantiene preparadas en
+su caché de sentencias. Con SRP_REFERENCIA_DB definido, cotizador.cargar_tarifas
+y cargar_campanas leen de esta base en lugar de los CSV, así la app y las
+herramientas por lotes usan la misma fuente, y cotizador.obtener_tarifa_base
+y aplicar_descuento_campana consultan la base (tarifa por clave primaria
+(plan, rango etario); campaña por el índice (tipo, vigencia)) cuando reciben
+esos DataFrames. El cubo de primas y las cotizaciones masivas siguen
+calculando sobre los DataFrames.
+
+    python referencia.py cargar
+    python referencia.py cargar --tarifas tarifario_base.xlsx --campanas campanas.xlsx
+    SRP_REFERENCIA_DB=referencia.db streamlit run streamlit_app.py
+"""
+import argparse
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pandas as pd
+
+from cotizador import (
+    PLANES, NOMBRES_PLANES, EDAD_MAXIMA_SIN_CONTINUIDAD, PLANES_AJUSTE_EDAD, SEXOS,
+    EDAD_MIN_TITULAR, DISTRITOS_GRUPO_1, DISTRITOS_GRUPO_2, recomendar_plan,
+    tabla_recomendaciones
+)
+
+RUTA_REFERENCIA = os.environ.get("SRP_REFERENCIA_DB", "referencia.db")
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S.%f"
+
+ESQUEMA = """
+CREATE TABLE planes (
+    codigo TEXT PRIMARY KEY,
+    nombre TEXT,
+    edad_max_sin_continuidad INTEGER,
+    orden INTEGER NOT NULL,
+    orden_ajuste INTEGER
+) WITHOUT ROWID;
+CREATE TABLE rangos (
+    rango TEXT PRIMARY KEY,
+    orden INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE tarifas (
+    plan TEXT NOT NULL,
+    rango TEXT NOT NULL,
+    prima REAL,
+    PRIMARY KEY (plan, rango)
+) WITHOUT ROWID;
+CREATE TABLE campanas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    fecha_inicio TEXT NOT NULL,
+    fecha_fin TEXT NOT NULL
+);
+CREATE INDEX idx_campanas_vigencia ON campanas (tipo, fecha_inicio, fecha_fin);
+CREATE TABLE descuentos (
+    campana INTEGER NOT NULL,
+    plan TEXT NOT NULL,
+    descuento REAL,
+    PRIMARY KEY (campana, plan)
+) WITHOUT ROWID;
+CREATE TABLE distritos (
+    distrito TEXT PRIMARY KEY,
+    grupo INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE reglas (
+    grupo INTEGER NOT NULL,
+    sexo TEXT NOT NULL,
+    edad INTEGER NOT NULL,
+    afiliados INTEGER NOT NULL,
+    plan TEXT NOT NULL,
+    PRIMARY KEY (grupo, sexo, edad, afiliados)
+) WITHOUT ROWID;
+CREATE TABLE metadatos (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+) WITHOUT ROWID;
+"""
+
+# ==================== LECTURA DE ARCHIVOS FUENTE ====================
+
+_NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+def _columna(referencia):
+    """'C12' -> 2"""
+    indice = 0
+    for letra in re.match(r'[A-Z]+', referencia).group():
+        indice = indice * 26 + ord(letra) - 64
+    return indice - 1
+
+def leer_xlsx(ruta):
+    """
+    Lee la primera hoja de un XLSX (primera fila como encabezado)
+
+    Lector mínimo con zipfile: cadenas compartidas y en línea, números y
+    booleanos; las fechas quedan como número de serie de Excel.
+
+    Retorna: DataFrame
+    """
+    with zipfile.ZipFile(ruta) as zf:
+        compartidas = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            raiz = ET.fromstring(zf.read('xl/sharedStrings.xml'))
+            compartidas = ["".join(t.text or "" for t in si.iter(f"{{{_NS['m']}}}t"))
+                           for si in raiz.findall('m:si', _NS)]
+
+        libro = ET.fromstring(zf.read('xl/workbook.xml'))
+        id_hoja = libro.find('m:sheets/m:sheet', _NS).get(_NS_REL)
+        relaciones = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        destino = next(r.get('Target') for r in relaciones if r.get('Id') == id_hoja)
+        ruta_hoja = destino.lstrip('/') if destino.startswith('/') else f"xl/{destino}"
+        hoja = ET.fromstring(zf.read(ruta_hoja))
+
+    filas = []
+    for fila in hoja.iterfind('m:sheetData/m:row', _NS):
+        valores = {}
+        for celda in fila.iterfind('m:c', _NS):
+            tipo = celda.get('t')
+            v = celda.find('m:v', _NS)
+            if tipo == 'inlineStr':
+                valor = "".join(t.text or "" for t in celda.iter(f"{{{_NS['m']}}}t"))
+            elif v is None:
+                continue
+            elif tipo == 's':
+                valor = compartidas[int(v.text)]
+            elif tipo in ('str', 'e'):
+                valor = v.text
+            elif tipo == 'b':
+                valor = v.text == '1'
+            else:
+                numero = float(v.text)
+                valor = int(numero) if numero.is_integer() else numero
+            valores[_columna(celda.get('r'))] = valor
+        filas.append(valores)
+
+    if not filas:
+        return pd.DataFrame()
+    encabezado = filas[0]
+    columnas = [encabezado[i] for i in sorted(encabezado)]
+    return pd.DataFrame(
+        [[fila.get(i) for i in sorted(encabezado)] for fila in filas[1:] if fila], columns=columnas
+    )
+
+def _leer_tabla(ruta):
+    return leer_xlsx(ruta) if ruta.lower().endswith('.xlsx') else pd.read_csv(ruta)
+
+def _a_fecha(serie):
+    """Fechas de CSV (texto) o de Excel (número de serie)"""
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.to_datetime(serie, unit='D', origin='1899-12-30')
+    return pd.to_datetime(serie)
+
+def _nulo(valor):
+    return None if pd.isna(valor) else float(valor)
+
+# ==================== CARGA MASIVA ====================
+
+def construir_referencia(ruta_db=RUTA_REFERENCIA, ruta_tarifas='tarifario_base.csv', ruta_campanas='campanas.csv'):
+    """
+    Arma la base de referencia completa y la activa atómicamente
+
+    Retorna: diccionario con la cantidad de filas por tabla
+    """
+    df_tarifas = _leer_tabla(ruta_tarifas)
+    if 'RangoEtario' not in df_tarifas.columns:
+        raise ValueError(f"Falta la columna 'RangoEtario' en {ruta_tarifas}")
+    planes_tarifa = [col for col in df_tarifas.columns if col != 'RangoEtario']
+
+    df_campanas = _leer_tabla(ruta_campanas) if os.path.exists(ruta_campanas) else pd.DataFrame()
+    if not df_campanas.empty:
+        df_campanas['Fecha_Inicio'] = _a_fecha(df_campanas['Fecha_Inicio'])
+        df_campanas['Fecha_Fin'] = _a_fecha(df_campanas['Fecha_Fin'])
+    planes_campana = [p for p in df_campanas.columns if p not in ('Nombre', 'Tipo_Campana', 'Fecha_Inicio', 'Fecha_Fin')]
+
+    # El orden de los planes es el de la tabla de validaciones de Recursos
+    planes = list(dict.fromkeys(list(EDAD_MAXIMA_SIN_CONTINUIDAD) + PLANES + planes_tarifa))
+    filas = {
+        'planes': [(
+            plan, NOMBRES_PLANES.get(plan), EDAD_MAXIMA_SIN_CONTINUIDAD.get(plan), orden,
+            PLANES_AJUSTE_EDAD.index(plan) if plan in PLANES_AJUSTE_EDAD else None
+        ) for orden, plan in enumerate(planes)],
+        # El rango de cada edad lo decide cotizador.rango_etario, igual que con el CSV
+        'rangos': [(rango, orden) for orden, rango in enumerate(df_tarifas['RangoEtario'])],
+        'tarifas': [(plan, rango, _nulo(prima)) for plan in planes_tarifa
+                    for rango, prima in zip(df_tarifas['RangoEtario'], df_tarifas[plan])],
+        'campanas': [(i, c['Nombre'], c['Tipo_Campana'], c['Fecha_Inicio'].strftime(FORMATO_FECHA),
+                      c['Fecha_Fin'].strftime(FORMATO_FECHA)) for i, c in enumerate(df_campanas.to_dict('records'))],
+        'descuentos': [(i, plan, _nulo(c[plan])) for i, c in enumerate(df_campanas.to_dict('records'))
+                       for plan in planes_campana],
+        'distritos': [(d, 1) for d in DISTRITOS_GRUPO_1] + [(d, 2) for d in DISTRITOS_GRUPO_2],
+    }
+    tabla = tabla_recomendaciones()
+    filas['reglas'] = [
+        (grupo, sexo, EDAD_MIN_TITULAR + e, n + 1, PLANES[tabla[grupo, s, e, n]])
+        for grupo in range(tabla.shape[0]) for s, sexo in enumerate(SEXOS)
+        for e in range(tabla.shape[2]) for n in range(tabla.shape[3])
+    ]
+    filas['metadatos'] = [
+        ('cargado', datetime.now().isoformat(timespec='seconds')),
+        ('fuente_tarifas', os.path.abspath(ruta_tarifas)),
+        ('fuente_campanas', os.path.abspath(ruta_campanas)),
+        ('columnas_tarifario', json.dumps(list(df_tarifas.columns), ensure_ascii=False)),
+        ('columnas_campanas', json.dumps(list(df_campanas.columns), ensure_ascii=False)),
+    ]
+
+    temporal = ruta_db + ".tmp"
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    conexion = sqlite3.connect(temporal, isolation_level=None)
+    try:
+        conexion.executescript(ESQUEMA)
+        conexion.execute("BEGIN")
+        for nombre, datos in filas.items():
+            if datos:
+                marcadores = ", ".join("?" * len(datos[0]))
+                conexion.executemany(f"INSERT INTO {nombre} VALUES ({marcadores})", datos)
+        conexion.execute("COMMIT")
+        conexion.execute("ANALYZE")
+    finally:
+        conexion.close()
+    os.replace(temporal, ruta_db)
+    return {nombre: len(datos) for nombre, datos in filas.items()}
+
+# ==================== CAMINO DE LECTURA ====================
+
+class Referencia:
+    """Consultas de solo lectura sobre la base de referencia"""
+
+    def __init__(self, ruta_db=RUTA_REFERENCIA):
+        self.ruta_db = ruta_db
+        self._uri = pathlib.Path(ruta_db).absolute().as_uri() + "?mode=ro"
+        self._local = threading.local()
+        self._df_tarifas = None
+        self._df_campanas = None
+        self._lock = threading.Lock()
+
+    def _conexion(self):
+        """Una conexión por hilo; cada una cachea sus sentencias preparadas"""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self._uri, uri=True, check_same_thread=False, cached_statements=64)
+            self._local.conexion = conexion
+        return conexion
+
+    def _uno(self, sql, parametros=()):
+        return self._conexion().execute(sql, parametros).fetchone()
+
+    def _todos(self, sql, parametros=()):
+        return self._conexion().execute(sql, parametros).fetchall()
+
+    def metadato(self, clave):
+        fila = self._uno("SELECT valor FROM metadatos WHERE clave = ?", (clave,))
+        return fila[0] if fila else None
+
+    # ---------- Planes y reglas ----------
+
+    def validaciones(self):
+        """Filas de la tabla de restricciones de edad (ver cotizador.tabla_validaciones)"""
+        return [{
+            'Plan': codigo,
+            'Nombre Comercial': nombre or codigo,
+            'Edad Máxima (Sin Continuidad)': edad_maxima,
+            'Edad Máxima (Con Continuidad)': 'Sin límite'
+        } for codigo, nombre, edad_maxima in self._todos(
+            "SELECT codigo, nombre, edad_max_sin_continuidad FROM planes "
+            "WHERE edad_max_sin_continuidad IS NOT NULL ORDER BY orden"
+        )]
+
+    def recomendar_plan(self, distrito, sexo, edad, numero_dependientes):
+        """Regla de recomendación precalculada (misma que cotizador.recomendar_plan)"""
+        fila = self._uno("SELECT grupo FROM distritos WHERE distrito = ?", (distrito,))
+        grupo = fila[0] if fila else 0
+        fila = self._uno(
+            "SELECT plan FROM reglas WHERE grupo = ? AND sexo = ? AND edad = ? AND afiliados = ?",
+            (grupo, sexo, edad, numero_dependientes)
+        )
+        if fila is None:
+            # Fuera de la grilla del formulario
+            return recomendar_plan(distrito, sexo, edad, numero_dependientes)
+        return fila[0]
+
+    # ---------- Tarifas y campañas ----------
+
+    def es_fuente(self, df):
+        """True si el DataFrame es el que se cargó de esta base (ver df_tarifas y df_campanas)"""
+        return df is not None and (df is self._df_tarifas or df is self._df_campanas)
+
+    def tarifa(self, plan, rango):
+        """
+        Prima del plan en el rango etario (por clave primaria)
+
+        Retorna: (prima, motivo); motivo es None si hay tarifa, o 'plan_inexistente',
+        'sin_rango' o 'sin_valor' como en cotizador.obtener_tarifa_base
+        """
+        fila = self._uno("SELECT prima FROM tarifas WHERE plan = ? AND rango = ?", (plan, rango))
+        if fila is None:
+            existe = self._uno("SELECT 1 FROM tarifas WHERE plan = ? LIMIT 1", (plan,))
+            return None, 'sin_rango' if existe else 'plan_inexistente'
+        if fila[0] is None:
+            return None, 'sin_valor'
+        return fila[0], None
+
+    def campana_vigente(self, tipo, plan, fecha):
+        """
+        Primera campaña del tipo vigente a la fecha, en el orden del archivo
+
+        Retorna: (nombre, descuento del plan o None), o None si no hay
+        """
+        fecha = pd.Timestamp(fecha).strftime(FORMATO_FECHA)
+        return self._uno(
+            "SELECT c.nombre, d.descuento FROM campanas c "
+            "LEFT JOIN descuentos d ON d.campana = c.id AND d.plan = ? "
+            "WHERE c.tipo = ? AND c.fecha_inicio <= ? AND c.fecha_fin >= ? ORDER BY c.id LIMIT 1",
+            (plan, tipo, fecha, fecha)
+        )
+
+    # ---------- DataFrames para el código existente ----------
+
+    def df_tarifas(self):
+        """Tarifario con el mismo formato que tarifario_base.csv (compartido: no modificar)"""
+        with self._lock:
+            if self._df_tarifas is None:
+                columnas = json.loads(self.metadato('columnas_tarifario'))
+                largo = pd.DataFrame(
+                    self._todos("SELECT t.rango, t.plan, t.prima FROM tarifas t JOIN rangos r ON r.rango = t.rango"),
+                    columns=['RangoEtario', 'plan', 'prima']
+                )
+                rangos = [fila[0] for fila in self._todos("SELECT rango FROM rangos ORDER BY orden")]
+                ancho = largo.pivot(index='RangoEtario', columns='plan', values='prima').reindex(rangos)
+                self._df_tarifas = ancho.reset_index()[columnas]
+                self._df_tarifas.columns.name = None
+            return self._df_tarifas
+
+    def df_campanas(self):
+        """Campañas con el mismo formato que cargar_campanas (compartido: no modificar)"""
+        with self._lock:
+            if self._df_campanas is None:
+                columnas = json.loads(self.metadato('columnas_campanas'))
+                campanas = pd.DataFrame(
+                    self._todos("SELECT id, nombre, tipo, fecha_inicio, fecha_fin FROM campanas ORDER BY id"),
+                    columns=['id', 'Nombre', 'Tipo_Campana', 'Fecha_Inicio', 'Fecha_Fin']
+                )
+                if campanas.empty:
+                    self._df_campanas = pd.DataFrame(columns=columnas)
+                    return self._df_campanas
+                campanas['Fecha_Inicio'] = pd.to_datetime(campanas['Fecha_Inicio'])
+                campanas['Fecha_Fin'] = pd.to_datetime(campanas['Fecha_Fin'])
+                descuentos = pd.DataFrame(
+                    self._todos("SELECT campana, plan, descuento FROM descuentos"), columns=['id', 'plan', 'descuento']
+                ).pivot(index='id', columns='plan', values='descuento')
+                df = campanas.join(descuentos, on='id')
+                for plan in descuentos.columns:
+                    # Igual que pd.read_csv: enteros si no hay vacíos ni decimales
+                    if df[plan].notna().all() and (df[plan] % 1 == 0).all():
+                        df[plan] = df[plan].astype('int64')
+                self._df_campanas = df[columnas]
+            return self._df_campanas
+
+_abiertas = {}
+_lock_abiertas = threading.Lock()
+
+def abrir_referencia(ruta_db=RUTA_REFERENCIA):
+    """
+    Referencia de la versión vigente del archivo; se reabre solo cuando una
+    nueva carga lo reemplaza (cambia su fecha o inodo), así llamarla en cada
+    rerun cuesta un stat()
+    """
+    stat = os.stat(ruta_db)
+    firma = (stat.st_mtime_ns, stat.st_ino)
+    with _lock_abiertas:
+        actual = _abiertas.get(ruta_db)
+        if actual is None or actual[0] != firma:
+            actual = _abiertas[ruta_db] = (firma, Referencia(ruta_db))
+        return actual[1]
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Base de referencia de tarifas, campañas y reglas")
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument("--db", default=RUTA_REFERENCIA)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_cargar = sub.add_parser("cargar", parents=[comun], help="Carga el tarifario y las campañas (CSV o XLSX)")
+    p_cargar.add_argument("--tarifas", default="tarifario_base.csv")
+    p_cargar.add_argument("--campanas", default="campanas.csv")
+    sub.add_parser("estado", parents=[comun], help="Muestra el contenido de la base")
+    args = parser.parse_args()
+
+    if args.comando == "cargar":
+        inicio = time.perf_counter()
+        conteos = construir_referencia(args.db, args.tarifas, args.campanas)
+        detalle = ", ".join(f"{n} {tabla}" for tabla, n in conteos.items() if tabla != 'metadatos')
+        print(f"Referencia cargada en {time.perf_counter() - inicio:.2f} s -> {args.db} ({detalle})")
+        return
+
+    referencia = Referencia(args.db)
+    print(f"Cargada: {referencia.metadato('cargado')}")
+    print(f"Tarifario: {referencia.metadato('fuente_tarifas')}")
+    print(f"Campañas: {referencia.metadato('fuente_campanas')}")
+    for tabla in ['planes', 'rangos', 'tarifas', 'campanas', 'descuentos', 'distritos', 'reglas']:
+        print(f"  {tabla}: {referencia._uno(f'SELECT COUNT(*) FROM {tabla}')[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Persistencia de las sesiones de los asesores para sobrevivir reinicios.
+
+Cada sesión guarda una foto compacta (JSON) de los datos de la
+recomendación en una base SQLite local. La app no escribe en cada rerun:
+`guardar` solo deja la foto en memoria (la última gana) y un hilo en segundo
+plano vuelca los cambios por lotes, en una transacción, cada `intervalo`
+segundos y al cerrar el proceso. Restaurar es una lectura por clave
+primaria.
+
+Configuración: SESIONES_DB (por defecto sesiones.db).
+
+    python sesiones.py estado
+    python sesiones.py purgar --dias 7
+"""
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+RUTA_SESIONES = os.environ.get("SESIONES_DB", "sesiones.db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sesiones (
+    clave TEXT PRIMARY KEY,
+    datos TEXT NOT NULL,
+    actualizado REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sesiones_actualizado ON sesiones (actualizado);
+"""
+
+class AlmacenSesiones:
+    """Fotos de sesión con escritura diferida por lotes (segura entre hilos y procesos)"""
+
+    def __init__(self, ruta_db=None, intervalo=0.5):
+        self._conexion = sqlite3.connect(ruta_db or RUTA_SESIONES, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._lock_db = threading.Lock()
+
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="srp-sesiones", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def guardar(self, clave, datos):
+        """Deja la foto de la sesión para el próximo volcado (no toca la base)"""
+        with self._lock:
+            self._pendientes[clave] = (json.dumps(datos, separators=(",", ":"), ensure_ascii=False), time.time())
+
+    def restaurar(self, clave):
+        """Retorna la última foto de la sesión, o None si no hay"""
+        with self._lock:
+            pendiente = self._pendientes.get(clave)
+        if pendiente is not None:
+            return json.loads(pendiente[0])
+        with self._lock_db:
+            fila = self._conexion.execute("SELECT datos FROM sesiones WHERE clave = ?", (clave,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def volcar(self):
+        """Escribe los cambios pendientes en una transacción; retorna cuántas sesiones escribió"""
+        with self._lock:
+            lote, self._pendientes = self._pendientes, {}
+        if not lote:
+            return 0
+        try:
+            with self._lock_db:
+                self._conexion.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conexion.executemany(
+                        "INSERT INTO sesiones (clave, datos, actualizado) VALUES (?, ?, ?) "
+                        "ON CONFLICT(clave) DO UPDATE SET datos = excluded.datos, actualizado = excluded.actualizado",
+                        [(clave, datos, actualizado) for clave, (datos, actualizado) in lote.items()]
+                    )
+                    self._conexion.execute("COMMIT")
+                except Exception:
+                    self._conexion.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            # Se reintenta en el próximo volcado sin pisar fotos más nuevas
+            with self._lock:
+                for clave, foto in lote.items():
+                    self._pendientes.setdefault(clave, foto)
+            raise
+        return len(lote)
+
+    def _ciclo(self):
+        while not self._detener.wait(self._intervalo):
+            try:
+                self.volcar()
+            except sqlite3.Error:
+                pass
+
+    def purgar(self, dias):
+        """Elimina las sesiones sin cambios en los últimos `dias` días; retorna cuántas eliminó"""
+        with self._lock_db:
+            cursor = self._conexion.execute(
+                "DELETE FROM sesiones WHERE actualizado < ?", (time.time() - dias * 86400,)
+            )
+        return cursor.rowcount
+
+    def resumen(self):
+        """Retorna (sesiones guardadas, última actualización o None)"""
+        with self._lock_db:
+            return self._conexion.execute("SELECT COUNT(*), MAX(actualizado) FROM sesiones").fetchone()
+
+    def cerrar(self):
+        """Detiene el hilo y vuelca lo pendiente"""
+        if self._detener.is_set():
+            return
+        self._detener.set()
+        self._hilo.join(timeout=5)
+        self.volcar()
+
+def main():
+    parser = argparse.ArgumentParser(description="Sesiones de asesores guardadas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("estado", help="Cantidad de sesiones guardadas")
+    p_purgar = sub.add_parser("purgar", help="Elimina sesiones antiguas")
+    p_purgar.add_argument("--dias", type=float, default=7)
+    args = parser.parse_args()
+
+    almacen = AlmacenSesiones()
+    if args.comando == "estado":
+        cantidad, ultima = almacen.resumen()
+        ultima = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ultima)) if ultima else "—"
+        print(f"{cantidad} sesiones guardadas, última actualización: {ultima}")
+    else:
+        print(f"{almacen.purgar(args.dias)} sesiones eliminadas")
+    almacen.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Simulador de campañas: impacto en primas y recaudación antes de publicar
+una fila en campanas.csv.
+
+Un escenario es una campaña hipotética con descuentos por plan para el tipo
+General y, opcionalmente, Continuidad. Se aplica con la misma semántica que
+aplicar_descuento_campana: los clientes con continuidad usan la campaña de
+Continuidad y, si el escenario no la tiene, la General; un plan sin valor no
+tiene descuento. Los montos se calculan en céntimos exactos.
+
+La cartera se compacta en celdas (plan x rango etario x continuidad) con su
+cantidad de asegurados, así cientos de escenarios se evalúan en una sola
+pasada vectorizada:
+
+    python simulador_campanas.py cartera.csv --escenarios candidatas.csv
+    python simulador_campanas.py cartera.csv --grilla MSLD=20,25,33 AM18=25,33 --continuidad 15
+"""
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import centimos
+from cotizador import PLANES, rango_etario
+
+TIPOS = ['General', 'Continuidad']
+
+# Rangos de edad para los reportes (límite superior inclusive)
+BANDAS_EDAD = [(17, '0-17'), (25, '18-25'), (35, '26-35'), (45, '36-45'), (55, '46-55'), (65, '56-65'), (200, '66+')]
+
+# ==================== CARTERA ====================
+
+def compactar_cartera(df_cartera, df_tarifas):
+    """
+    Agrupa la cartera en celdas con prima base idéntica
+
+    Parámetros:
+    - df_cartera: columnas Plan, Relacion, Edad, Continuidad (una fila por asegurado)
+    - df_tarifas: tarifario (RangoEtario + planes)
+
+    Retorna: (celdas, asegurados_sin_tarifa). Las celdas tienen Plan,
+    RangoEtario, Banda, Continuidad, Asegurados y Prima_Base (céntimos)
+    """
+    cartera = pd.DataFrame({
+        'Plan': df_cartera['Plan'].to_numpy(),
+        'Edad': df_cartera['Edad'].astype(int).to_numpy(),
+        'Es_Hijo': (df_cartera['Relacion'] == "Hijo").to_numpy(),
+        'Continuidad': (df_cartera['Continuidad'] == "Sí").to_numpy(),
+    })
+    celdas = cartera.groupby(['Plan', 'Edad', 'Es_Hijo', 'Continuidad'], sort=False).size().rename('Asegurados').reset_index()
+
+    # La regla de rango etario se evalúa una vez por combinación edad/hijo
+    celdas['RangoEtario'] = [rango_etario(e, h) for e, h in zip(celdas['Edad'], celdas['Es_Hijo'])]
+
+    tarifas = df_tarifas.set_index('RangoEtario')
+    planes_tarifa = [p for p in tarifas.columns if p in PLANES]
+    tarifas_largo = tarifas[planes_tarifa].stack().rename('Tarifa').reset_index()
+    tarifas_largo.columns = ['RangoEtario', 'Plan', 'Tarifa']
+    celdas = celdas.merge(tarifas_largo, on=['RangoEtario', 'Plan'], how='left')
+
+    sin_tarifa = int(celdas.loc[celdas['Tarifa'].isna() | (celdas['Tarifa'] == 0), 'Asegurados'].sum())
+    celdas = celdas[celdas['Tarifa'].notna() & (celdas['Tarifa'] != 0)].copy()
+
+    celdas['Prima_Base'] = centimos.a_centimos(celdas['Tarifa'].to_numpy())
+    celdas['Banda'] = pd.cut(
+        celdas['Edad'], bins=[-1] + [b for b, _ in BANDAS_EDAD], labels=[n for _, n in BANDAS_EDAD]
+    )
+    celdas = (celdas.groupby(['Plan', 'RangoEtario', 'Banda', 'Continuidad', 'Prima_Base'], observed=True, sort=False)
+              ['Asegurados'].sum().reset_index())
+    return celdas, sin_tarifa
+
+# ==================== ESCENARIOS ====================
+
+def escenarios_desde_campanas(df_campanas):
+    """
+    Convierte filas con el formato de campanas.csv en escenarios (uno por Nombre)
+
+    Retorna: lista de diccionarios {'Nombre', 'General', 'Continuidad'}, donde
+    General/Continuidad son {plan: porcentaje} o None
+    """
+    escenarios = []
+    for nombre, filas in df_campanas.groupby('Nombre', sort=False):
+        escenario = {'Nombre': nombre, 'General': None, 'Continuidad': None}
+        for tipo in TIPOS:
+            del_tipo = filas[filas['Tipo_Campana'] == tipo]
+            if not del_tipo.empty:
+                # Como en aplicar_descuento_campana, vale la primera fila del tipo
+                fila = del_tipo.iloc[0]
+                escenario[tipo] = {p: float(fila[p]) for p in PLANES if p in fila and pd.notna(fila[p])}
+        escenarios.append(escenario)
+    return escenarios
+
+def escenario_vigente(df_campanas, fecha=None):
+    """Escenario con las campañas vigentes a la fecha (por defecto hoy)"""
+    fecha = fecha or datetime.now()
+    vigentes = df_campanas[(df_campanas['Fecha_Inicio'] <= fecha) & (df_campanas['Fecha_Fin'] >= fecha)]
+    escenario = {'Nombre': 'Vigente', 'General': None, 'Continuidad': None}
+    for tipo in TIPOS:
+        del_tipo = vigentes[vigentes['Tipo_Campana'] == tipo]
+        if not del_tipo.empty:
+            fila = del_tipo.iloc[0]
+            escenario[tipo] = {p: float(fila[p]) for p in PLANES if p in fila and pd.notna(fila[p])}
+    return escenario
+
+def grilla_escenarios(valores_general, continuidad=None):
+    """
+    Genera todas las combinaciones de descuentos generales por plan
+
+    Parámetros:
+    - valores_general: {plan: [porcentajes candidatos]}
+    - continuidad: {plan: porcentaje} común a todos los escenarios, o None
+      para que los clientes con continuidad usen la General
+
+    Retorna: lista de escenarios
+    """
+    planes = list(valores_general)
+    escenarios = []
+    for combinacion in itertools.product(*(valores_general[p] for p in planes)):
+        general = dict(zip(planes, combinacion))
+        nombre = ", ".join(f"{p}={v:g}" for p, v in general.items())
+        escenarios.append({'Nombre': nombre, 'General': general, 'Continuidad': continuidad})
+    return escenarios
+
+def matriz_descuentos(escenarios):
+    """
+    Retorna el arreglo [escenario, tipo de cliente, plan] de porcentajes de
+    descuento efectivos, ya resuelta la caída de Continuidad a General
+    """
+    matriz = np.zeros((len(escenarios), len(TIPOS), len(PLANES)))
+    for s, escenario in enumerate(escenarios):
+        general = escenario.get('General') or {}
+        continuidad = escenario.get('Continuidad')
+        if continuidad is None:
+            continuidad = general
+        for t, descuentos in enumerate([general, continuidad]):
+            for p, plan in enumerate(PLANES):
+                matriz[s, t, p] = descuentos.get(plan, 0)
+    return matriz
+
+# ==================== SIMULACIÓN ====================
+
+def _totales(args):
+    """Prima final total por escenario para un bloque de la matriz"""
+    matriz, plan_idx, tipo_idx, base, cantidad = args
+    pct = matriz[:, tipo_idx, plan_idx]                 # [escenarios, celdas]
+    final = centimos.aplicar_descuento(base[None, :], pct)
+    return final @ cantidad
+
+def simular(celdas, escenarios, procesos=None, tamano_bloque=512):
+    """
+    Evalúa todos los escenarios sobre la cartera compactada
+
+    Con procesos > 1 los escenarios se reparten en bloques entre procesos.
+
+    Retorna: DataFrame con una fila por escenario y sus totales en soles
+    """
+    matriz = matriz_descuentos(escenarios)
+    plan_idx = celdas['Plan'].map(PLANES.index).to_numpy()
+    tipo_idx = celdas['Continuidad'].astype(int).to_numpy()
+    base = celdas['Prima_Base'].to_numpy(dtype=np.int64)
+    cantidad = celdas['Asegurados'].to_numpy(dtype=np.int64)
+
+    bloques = [
+        (matriz[i:i + tamano_bloque], plan_idx, tipo_idx, base, cantidad)
+        for i in range(0, len(matriz), tamano_bloque)
+    ]
+    if procesos and procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            resultados = list(executor.map(_totales, bloques))
+    else:
+        resultados = [_totales(b) for b in bloques]
+    finales = np.concatenate(resultados)
+
+    total_base = int(base @ cantidad)
+    resumen = pd.DataFrame({
+        'Escenario': [e['Nombre'] for e in escenarios],
+        'Prima_Base': total_base / centimos.CENTIMOS,
+        'Prima_Final': finales / centimos.CENTIMOS,
+    })
+    resumen['Costo_Descuento'] = resumen['Prima_Base'] - resumen['Prima_Final']
+    resumen['Descuento_Efectivo_%'] = 100 * resumen['Costo_Descuento'] / resumen['Prima_Base']
+    return resumen
+
+def detalle_escenario(celdas, escenario):
+    """
+    Totales de un escenario por plan y banda de edad
+
+    Retorna: DataFrame con Asegurados, Prima_Base, Prima_Final, Costo_Descuento
+    y Prima_Promedio (soles)
+    """
+    matriz = matriz_descuentos([escenario])[0]
+    pct = matriz[celdas['Continuidad'].astype(int).to_numpy(), celdas['Plan'].map(PLANES.index).to_numpy()]
+    base = celdas['Prima_Base'].to_numpy(dtype=np.int64)
+    cantidad = celdas['Asegurados'].to_numpy(dtype=np.int64)
+    final = centimos.aplicar_descuento(base, pct)
+
+    filas = celdas[['Plan', 'Banda']].copy()
+    filas['Asegurados'] = cantidad
+    filas['Prima_Base'] = base * cantidad
+    filas['Prima_Final'] = final * cantidad
+    detalle = filas.groupby(['Plan', 'Banda'], observed=True)[['Asegurados', 'Prima_Base', 'Prima_Final']].sum()
+    detalle[['Prima_Base', 'Prima_Final']] /= centimos.CENTIMOS
+    detalle['Costo_Descuento'] = detalle['Prima_Base'] - detalle['Prima_Final']
+    detalle['Prima_Promedio'] = detalle['Prima_Final'] / detalle['Asegurados']
+    return detalle.reset_index()
+
+# ==================== CLI ====================
+
+def _parsear_grilla(argumentos):
+    valores = {}
+    for argumento in argumentos:
+        plan, lista = argumento.split("=")
+        if plan not in PLANES:
+            raise SystemExit(f"Plan desconocido en --grilla: {plan}")
+        valores[plan] = [float(v) for v in lista.split(",")]
+    return valores
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula campañas de descuento sobre una cartera")
+    parser.add_argument("cartera", help="CSV con Plan, Relacion, Edad, Continuidad (una fila por asegurado)")
+    parser.add_argument("--escenarios", help="CSV con el formato de campanas.csv; cada Nombre es un escenario")
+    parser.add_argument("--grilla", nargs="+", default=[], metavar="PLAN=v1,v2",
+                        help="Descuentos generales candidatos por plan (se combinan todos)")
+    parser.add_argument("--continuidad", type=float, help="Descuento de continuidad común para la grilla")
+    parser.add_argument("--detalle", help="Nombre del escenario a detallar por plan y banda de edad")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20, help="Escenarios a mostrar (menor costo primero)")
+    args = parser.parse_args()
+
+    from cotizador import cargar_tarifas, cargar_campanas
+
+    errores = []
+    df_tarifas = cargar_tarifas(errores)
+    if df_tarifas is None:
+        raise SystemExit("\n".join(errores) or "No se pudo cargar el tarifario")
+
+    celdas, sin_tarifa = compactar_cartera(pd.read_csv(args.cartera), df_tarifas)
+
+    escenarios = [escenario_vigente(cargar_campanas())]
+    if args.escenarios:
+        escenarios += escenarios_desde_campanas(pd.read_csv(args.escenarios))
+    if args.grilla:
+        continuidad = {p: args.continuidad for p in PLANES} if args.continuidad is not None else None
+        escenarios += grilla_escenarios(_parsear_grilla(args.grilla), continuidad)
+
+    inicio = datetime.now()
+    resumen = simular(celdas, escenarios, procesos=args.procesos)
+    segundos = (datetime.now() - inicio).total_seconds()
+
+    print(f"{int(celdas['Asegurados'].sum())} asegurados en {len(celdas)} celdas "
+          f"({sin_tarifa} sin tarifa); {len(escenarios)} escenarios en {segundos:.2f} s\n")
+    with pd.option_context('display.max_colwidth', 60, 'display.width', 160, 'display.float_format', '{:,.2f}'.format):
+        print(resumen.sort_values('Costo_Descuento').head(args.top).to_string(index=False))
+        if args.detalle:
+            escenario = next((e for e in escenarios if e['Nombre'] == args.detalle), None)
+            if escenario is None:
+                raise SystemExit(f"No existe el escenario '{args.detalle}'")
+            print(f"\nDetalle de {args.detalle}:")
+            print(detalle_escenario(celdas, escenario).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Configuración común de las pruebas: se ejecutan desde la raíz del repo (los CSV se leen con rutas relativas)"""
+import pathlib
+
+import pytest
+
+RAIZ = pathlib.Path(__file__).resolve().parent.parent
+
+@pytest.fixture(autouse=True)
+def _en_raiz(monkeypatch):
+    monkeypatch.chdir(RAIZ)
+
+@pytest.fixture(scope="session")
+def df_tarifas():
+    import pandas as pd
+    return pd.read_csv(RAIZ / "tarifario_base.csv")
+
+@pytest.fixture(scope="session")
+def df_campanas():
+    import pandas as pd
+    df = pd.read_csv(RAIZ / "campanas.csv")
+    df['Fecha_Inicio'] = pd.to_datetime(df['Fecha_Inicio'])
+    df['Fecha_Fin'] = pd.to_datetime(df['Fecha_Fin'])
+    return df
+
+@pytest.fixture(scope="session", autouse=True)
+def _sesiones_temporales(tmp_path_factory):
+    """Las sesiones (pruebas, AppTest, servidores lanzados) se guardan fuera del repo"""
+    import sesiones
+    ruta = str(tmp_path_factory.mktemp("sesiones") / "sesiones.db")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("SESIONES_DB", ruta)
+        mp.setattr(sesiones, "RUTA_SESIONES", ruta)
+        yield ruta
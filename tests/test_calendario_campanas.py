@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from calendario_campanas import CalendarioCampanas
+from cotizador import PLANES, aplicar_descuento_campana
+
+def _momentos(df_campanas):
+    """Bordes de vigencia a medianoche y a media mañana"""
+    momentos = []
+    for fecha in list(df_campanas['Fecha_Inicio']) + list(df_campanas['Fecha_Fin']):
+        for dias in (-1, 0, 1):
+            dia = fecha.to_pydatetime() + timedelta(days=dias)
+            momentos += [dia, dia + timedelta(hours=10)]
+    return momentos
+
+@pytest.fixture
+def calendario(df_campanas):
+    return CalendarioCampanas(df_campanas)
+
+def test_instantanea_en_coincide_con_la_calculadora(calendario, df_campanas):
+    for momento in _momentos(df_campanas):
+        foto = calendario.instantanea_en(momento)
+        for tipo, continuidad in [('General', "No"), ('Continuidad', "Sí")]:
+            for plan in PLANES:
+                pct, campana = aplicar_descuento_campana(df_campanas, plan, continuidad, momento)
+                assert foto['descuentos'][tipo][plan] == pct, (momento, tipo, plan)
+                assert foto['campana_aplicada'][tipo] == campana
+
+def test_instantanea_del_dia_es_a_medianoche(calendario, df_campanas):
+    for momento in _momentos(df_campanas):
+        medianoche = pd.Timestamp(momento).normalize()
+        assert calendario.instantanea(momento) == calendario.instantanea_en(medianoche)
+
+def test_ultimo_dia_por_la_manana_ya_no_aplica(calendario, df_campanas):
+    fin = df_campanas['Fecha_Fin'].max().to_pydatetime()
+    assert calendario.instantanea(fin)['generales']
+    foto = calendario.instantanea_en(fin + timedelta(hours=10))
+    assert foto['generales'] == []
+    assert foto['campana_aplicada'] == {'General': None, 'Continuidad': None}
+
+def test_proximas_y_fuera_de_rango(calendario, df_campanas):
+    inicio = df_campanas['Fecha_Inicio'].min().to_pydatetime()
+    assert len(calendario.instantanea(inicio - timedelta(days=30))['proximas']) == len(df_campanas)
+    assert calendario.instantanea(datetime(2100, 1, 1))['proximas'] == []
+
+def test_sin_campanas():
+    calendario = CalendarioCampanas(None)
+    assert calendario.campanas == []
+    foto = calendario.instantanea_en(datetime.now())
+    assert foto['generales'] == [] and foto['proximas'] == []
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+import calentamiento
+from calentamiento import Calentamiento, ErrorCalentamiento, validar_campanas, validar_tarifario
+
+def test_datos_del_repo_son_validos(df_tarifas, df_campanas):
+    errores, _ = validar_tarifario(df_tarifas)
+    assert errores == []
+    errores, _ = validar_campanas(df_campanas)
+    assert errores == []
+
+def test_tarifario_invalido(df_tarifas):
+    malo = df_tarifas.drop(columns=['AM15']).copy()
+    malo.loc[0, 'MNAC'] = None
+    malo = pd.concat([malo, malo.iloc[[1]]], ignore_index=True)
+    errores, _ = validar_tarifario(malo)
+    texto = "\n".join(errores)
+    assert "Faltan planes en el tarifario: AM15" in texto
+    assert f"Tarifa inválida para MNAC en '{malo.loc[0, 'RangoEtario']}': vacía" in texto
+    assert "Rangos repetidos" in texto
+    assert validar_tarifario(None) == (["No se pudo cargar el tarifario"], [])
+
+def test_campanas_invalidas(df_campanas):
+    malas = df_campanas.copy()
+    malas.loc[0, 'Fecha_Fin'] = malas.loc[0, 'Fecha_Inicio'] - timedelta(days=1)
+    malas.loc[1, 'MNAC'] = 130
+    malas.loc[1, 'Tipo_Campana'] = 'Corporativa'
+    errores, advertencias = validar_campanas(malas)
+    assert any("termina antes de empezar" in e for e in errores)
+    assert any("Descuento inválido para MNAC" in e for e in errores)
+    assert any("Corporativa" in a for a in advertencias)
+    assert validar_campanas(None) == ([], ["No hay campañas cargadas: no se aplicarán descuentos"])
+
+def test_pasos_y_advertencias():
+    ejecucion = Calentamiento([('uno', lambda: None), ('dos', lambda: ["aviso"])])
+    assert ejecucion.estado == 'pendiente'
+    assert ejecucion.ejecutar()
+    assert ejecucion.estado == 'listo'
+    assert [paso['advertencias'] for paso in ejecucion.informe] == [[], ["aviso"]]
+    assert "Calentamiento: listo" in ejecucion.texto()
+
+def test_paso_fallido_detiene_y_no_queda_listo():
+    def falla():
+        raise ErrorCalentamiento(["Tarifa inválida"])
+    llamados = []
+    ejecucion = Calentamiento([('uno', falla), ('dos', lambda: llamados.append(1))])
+    assert not ejecucion.ejecutar()
+    assert ejecucion.estado == 'fallido'
+    assert ejecucion.errores() == ["Tarifa inválida"]
+    assert llamados == []
+
+def test_sonda_listo_503_mientras_calienta(monkeypatch):
+    liberar = threading.Event()
+    ejecucion = Calentamiento([('lento', lambda: liberar.wait(5) and None)])
+    monkeypatch.setattr(calentamiento, "CALENTAMIENTO", ejecucion)
+
+    codigo, _, cuerpo = calentamiento._sonda_listo()
+    assert codigo == 503 and json.loads(cuerpo)['estado'] == 'pendiente'
+
+    ejecucion.iniciar(imprimir=False)
+    assert ejecucion.iniciar(imprimir=False) is ejecucion
+    assert not ejecucion.esperar(0.05)
+    codigo, _, cuerpo = calentamiento._sonda_listo()
+    assert codigo == 503 and json.loads(cuerpo)['estado'] == 'calentando'
+
+    liberar.set()
+    assert ejecucion.esperar(5)
+    codigo, _, cuerpo = calentamiento._sonda_listo()
+    assert codigo == 200 and json.loads(cuerpo)['listo'] is True
+
+def test_pasos_de_datos_del_repo():
+    # Los pasos de la app salvo los servicios de fondo (crean archivos y hilos)
+    pasos = [(nombre, funcion) for nombre, funcion in calentamiento.PASOS if nombre != 'servicios']
+    ejecucion = Calentamiento(pasos)
+    assert ejecucion.ejecutar(), ejecucion.texto()
+
+def test_servir_inicia_streamlit_con_el_calentamiento_terminado(monkeypatch):
+    import time
+    from streamlit.web import cli
+
+    ejecucion = Calentamiento([('lento', lambda: time.sleep(0.2))])
+    monkeypatch.setattr(calentamiento, "CALENTAMIENTO", ejecucion)
+    monkeypatch.setattr(calentamiento.metricas, "iniciar_servidor", lambda: None)
+    al_iniciar = []
+    monkeypatch.setattr(cli, "main", lambda: al_iniciar.append(ejecucion.estado) or 0)
+    monkeypatch.setattr("sys.argv", ["calentamiento.py", "servir", "--", "--server.port", "8501"])
+    with pytest.raises(SystemExit):
+        calentamiento.main()
+    # Streamlit (y su /_stcore/health) arranca recién con los datos listos
+    assert al_iniciar == ['listo']
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+import centimos
+
+def test_a_centimos_redondea_al_centimo_mas_cercano():
+    assert centimos.a_centimos(3761.9999999999995) == 376200
+    assert list(centimos.a_centimos([0.1, 0.2, 1234.565])) == [10, 20, 123456]
+
+def test_descuento_redondea_mitad_hacia_arriba():
+    # 1001 céntimos * 25% = 250.25 -> 250; 1002 * 25% = 250.5 -> 251
+    assert list(centimos.aplicar_descuento([1001, 1002], 25)) == [751, 751]
+    assert centimos.aplicar_descuento(376200, 33) == 376200 - 124146
+    assert centimos.aplicar_descuento(376200, 12.5) == 376200 - 47025
+
+def test_tasa_en_puntos_basicos():
+    assert centimos.tasa_puntos_basicos(0.04) == 400
+    assert centimos.tasa_puntos_basicos(0.0) == 0
+
+def test_cuota_sin_interes_reparte_la_prima():
+    assert centimos.calcular_cuotas(120000, 0.0, 12) == 10000
+    pago, capital, interes, saldo = centimos.plan_pagos(100001, 0.0, 4)
+    assert pago.sum() == 100001
+    assert (interes == 0).all()
+    assert saldo[0, -1] == 0
+
+def test_plan_pagos_cierra_el_saldo_en_cero():
+    totales = np.array([376200, 99999, 1])
+    pago, capital, interes, saldo = centimos.plan_pagos(totales, 0.04, 12)
+    assert (saldo[:, -1] == 0).all()
+    assert (capital.sum(axis=1) == totales).all()
+    assert (pago == capital + interes).all()
+
+def test_cuota_y_plan_usan_la_misma_tasa():
+    # La cuota se calcula con la tasa en puntos básicos, igual que el interés del plan
+    totales = np.arange(1000, 500000, 977)
+    cuota = centimos.calcular_cuotas(totales, 0.04, 12)
+    for tasa in (0.04000001, 0.0399999):
+        assert (centimos.calcular_cuotas(totales, tasa, 12) == cuota).all()
+        pago, _, interes, _ = centimos.plan_pagos(totales, tasa, 12)
+        assert (pago[:, :-1] == cuota[:, None]).all()
+        assert (interes == centimos.plan_pagos(totales, 0.04, 12)[2]).all()
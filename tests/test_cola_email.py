@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import smtplib
+import sqlite3
+import time
+
+import pytest
+
+from cola_email import ColaEmail, Despachador, LimiteTasa, PoolSMTP
+
+class ConexionFalsa:
+    def __init__(self, errores=None):
+        self.errores = errores or {}
+        self.enviados = []
+
+    def send_message(self, mensaje):
+        error = self.errores.get(mensaje['To'])
+        if error is not None:
+            raise error
+        self.enviados.append(mensaje['To'])
+
+class PoolFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.tomadas = self.devueltas = self.descartadas = 0
+
+    def tomar(self):
+        self.tomadas += 1
+        return self.conexion
+
+    def devolver(self, conexion):
+        self.devueltas += 1
+
+    def descartar(self, conexion):
+        self.descartadas += 1
+
+    def cerrar(self):
+        pass
+
+@pytest.fixture
+def cola(tmp_path):
+    return ColaEmail(str(tmp_path / "cola.db"))
+
+def _estados(cola):
+    return dict(cola._conexion.execute("SELECT id, estado FROM envios").fetchall())
+
+def test_tomar_lote_asigna_despachador_y_no_repite(cola):
+    cola.encolar_lote([(f"c{i}@x.pe", "a", "b", None) for i in range(5)])
+    primero = cola.tomar_lote(3, "A")
+    segundo = cola.tomar_lote(10, "B")
+    assert [f[0] for f in primero] == [1, 2, 3]
+    assert [f[0] for f in segundo] == [4, 5]
+    duenos = dict(cola._conexion.execute("SELECT id, despachador FROM envios").fetchall())
+    assert duenos == {1: "A", 2: "A", 3: "A", 4: "B", 5: "B"}
+
+def test_otro_despachador_no_recupera_envios_con_plazo_vigente(cola):
+    cola.encolar("c@x.pe", "a", "b")
+    cola.tomar_lote(10, "A", plazo=60)
+    assert cola.liberar_vencidos() == 0
+    assert cola.tomar_lote(10, "B") == []
+    assert _estados(cola) == {1: "enviando"}
+
+def test_envios_con_plazo_vencido_se_recuperan(cola):
+    cola.encolar("c@x.pe", "a", "b")
+    cola.tomar_lote(10, "A", plazo=-1)
+    filas = cola.tomar_lote(10, "B")
+    assert [f[0] for f in filas] == [1]
+    assert cola._conexion.execute("SELECT despachador FROM envios").fetchone()[0] == "B"
+
+def test_liberar_propios_solo_libera_los_del_despachador(cola):
+    cola.encolar_lote([("a@x.pe", "a", "b", None), ("b@x.pe", "a", "b", None)])
+    cola.tomar_lote(1, "A")
+    cola.tomar_lote(1, "B")
+    assert cola.liberar_propios("A") == 1
+    assert _estados(cola) == {1: "pendiente", 2: "enviando"}
+
+def test_error_en_transaccion_revierte_y_no_bloquea(cola, tmp_path):
+    # La segunda fila viola NOT NULL después de insertar la primera
+    with pytest.raises(sqlite3.IntegrityError):
+        cola.encolar_lote([("a@x.pe", "a", "b", None), (None, "a", "b", None)])
+    assert cola.resumen() == {}
+    # Otra conexión puede escribir: no quedó una transacción abierta
+    otra = sqlite3.connect(str(tmp_path / "cola.db"), timeout=0.1)
+    otra.execute("INSERT INTO envios (destinatario, asunto, cuerpo, creado) VALUES ('x', 'a', 'b', 0)")
+    otra.commit()
+    assert cola.encolar("c@x.pe", "a", "b") == 2
+
+def test_esquema_antiguo_se_migra(tmp_path):
+    ruta = str(tmp_path / "vieja.db")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(
+        "CREATE TABLE envios (id INTEGER PRIMARY KEY AUTOINCREMENT, destinatario TEXT NOT NULL, "
+        "asunto TEXT NOT NULL, cuerpo TEXT NOT NULL, cotizacion TEXT, estado TEXT NOT NULL DEFAULT 'pendiente', "
+        "intentos INTEGER NOT NULL DEFAULT 0, proximo_intento REAL NOT NULL DEFAULT 0, error TEXT, creado REAL NOT NULL)"
+    )
+    conexion.execute("INSERT INTO envios (destinatario, asunto, cuerpo, estado, creado) VALUES ('a', 'b', 'c', 'enviando', 0)")
+    conexion.commit()
+    conexion.close()
+    cola = ColaEmail(ruta)
+    # Un envío tomado por una versión anterior (sin plazo) se considera vencido
+    assert [f[0] for f in cola.tomar_lote(10, "A")] == [1]
+
+def test_rechazo_de_destinatario_conserva_la_conexion(cola):
+    rechazo = smtplib.SMTPRecipientsRefused({"malo@x.pe": (550, b"no existe")})
+    conexion = ConexionFalsa({"malo@x.pe": rechazo})
+    pool = PoolFalso(conexion)
+    cola.encolar_lote([("malo@x.pe", "a", "b", None), ("bueno@x.pe", "a", "b", None)])
+    despachador = Despachador(cola, pool=pool, conexiones=1, mensajes_por_segundo=0)
+    assert despachador.despachar_lote() == (2, 1)
+    assert conexion.enviados == ["bueno@x.pe"]
+    assert (pool.tomadas, pool.descartadas, pool.devueltas) == (1, 0, 1)
+    estados = _estados(cola)
+    assert estados == {1: "pendiente", 2: "enviado"}
+    intentos, error = cola._conexion.execute("SELECT intentos, error FROM envios WHERE id = 1").fetchone()
+    assert intentos == 1 and "no existe" in error
+
+def _intentos(cola):
+    return dict(cola._conexion.execute("SELECT id, intentos FROM envios").fetchall())
+
+def test_conexion_caida_no_cuenta_intento_y_detiene_el_lote(cola):
+    conexion = ConexionFalsa({"a@x.pe": smtplib.SMTPServerDisconnected("caída")})
+    pool = PoolFalso(conexion)
+    cola.encolar_lote([("a@x.pe", "a", "b", None), ("b@x.pe", "a", "b", None)])
+    despachador = Despachador(cola, pool=pool, conexiones=1, mensajes_por_segundo=0)
+    assert despachador.despachar_lote() == (2, 0)
+    assert pool.descartadas == 1 and pool.tomadas == 1
+    assert _estados(cola) == {1: "pendiente", 2: "pendiente"}
+    assert _intentos(cola) == {1: 0, 2: 0}
+    assert despachador._sin_servidor.is_set()
+
+class PoolCaido(PoolFalso):
+    def tomar(self):
+        self.tomadas += 1
+        raise ConnectionRefusedError("connection refused")
+
+def test_servidor_caido_no_agota_la_cola(cola):
+    pool = PoolCaido(None)
+    cola.encolar_lote([(f"c{i}@x.pe", "a", "b", None) for i in range(4)])
+    despachador = Despachador(cola, pool=pool, conexiones=2, mensajes_por_segundo=0, max_intentos=1)
+    for _ in range(3):
+        assert despachador.despachar_lote() == (4, 0)
+    assert set(_estados(cola).values()) == {"pendiente"}
+    assert set(_intentos(cola).values()) == {0}
+
+def test_bucle_sobrevive_a_errores_de_la_base(cola, capsys):
+    class ColaBloqueada:
+        def __init__(self):
+            self.llamadas = 0
+
+        def tomar_lote(self, *args):
+            self.llamadas += 1
+            if self.llamadas == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return cola.tomar_lote(*args)
+
+        def __getattr__(self, nombre):
+            return getattr(cola, nombre)
+
+    cola.encolar("a@x.pe", "a", "b")
+    conexion = ConexionFalsa()
+    despachador = Despachador(ColaBloqueada(), pool=PoolFalso(conexion), conexiones=1,
+                              mensajes_por_segundo=0, intervalo=0.01).iniciar()
+    limite = time.monotonic() + 5
+    while not conexion.enviados and time.monotonic() < limite:
+        time.sleep(0.01)
+    despachador.detener()
+    assert conexion.enviados == ["a@x.pe"]
+    assert "database is locked" in capsys.readouterr().err
+
+def test_pool_reemplaza_conexion_con_socket_reiniciado(monkeypatch):
+    class Reiniciada:
+        cerrada = False
+
+        def noop(self):
+            raise ConnectionResetError("reset")
+
+        def quit(self):
+            self.cerrada = True
+
+    pool = PoolSMTP("localhost", 1025)
+    vieja, nueva = Reiniciada(), object()
+    monkeypatch.setattr(pool, "_conectar", lambda: nueva)
+    pool.devolver(vieja)
+    assert pool.tomar() is nueva
+    assert vieja.cerrada
+
+def test_reintentos_agotados_quedan_en_error(cola):
+    cola.encolar("a@x.pe", "a", "b")
+    cola.tomar_lote(1, "A")
+    cola.marcar_fallido(1, 5, "falla", max_intentos=5, backoff_base=2)
+    assert _estados(cola) == {1: "error"}
+
+def test_backoff_reprograma_el_envio(cola):
+    cola.encolar("a@x.pe", "a", "b")
+    cola.tomar_lote(1, "A")
+    cola.marcar_fallido(1, 1, "falla", max_intentos=5, backoff_base=60)
+    assert cola.tomar_lote(1, "A") == []
+    proximo = cola._conexion.execute("SELECT proximo_intento FROM envios").fetchone()[0]
+    assert proximo > time.time() + 30
+
+def test_limite_tasa_espacia_los_envios():
+    limite = LimiteTasa(50)
+    inicio = time.monotonic()
+    for _ in range(60):
+        limite.esperar()
+    assert time.monotonic() - inicio >= 0.15
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+import cotizador
+import corpus_dorado
+
+CANDIDATO = '''
+from cotizador import obtener_tarifa_base as original
+
+def obtener_tarifa_base(df_tarifas, plan, edad, es_hijo=False):
+    tarifa = original(df_tarifas, plan, edad, es_hijo)
+    return tarifa * 2 if tarifa else tarifa
+'''
+
+@pytest.fixture
+def candidato(tmp_path, monkeypatch):
+    (tmp_path / "candidato_doble.py").write_text(CANDIDATO, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # Las funciones de cotizador se restauran al terminar
+    for nombre, valor in list(vars(cotizador).items()):
+        if callable(valor):
+            monkeypatch.setattr(cotizador, nombre, valor)
+    monkeypatch.setattr(corpus_dorado, "_trabajo", {})
+    yield "candidato_doble"
+    sys.modules.pop("candidato_doble", None)
+
+def _grilla_reducida(df_campanas):
+    grilla = corpus_dorado.crear_grilla(corpus_dorado.fechas_por_defecto(df_campanas))
+    grilla.update({'plan': ['MNAC'], 'edad': [30, 40], 'cuotas': [1, 12]})
+    return grilla
+
+def test_candidato_parcial_llega_a_todas_las_salidas(candidato, df_campanas):
+    grilla = _grilla_reducida(df_campanas)
+    corpus_dorado._inicializar(None, grilla)
+    actual = corpus_dorado._evaluar_calculadora(0)
+
+    corpus_dorado._inicializar(candidato, grilla)
+    assert cotizador.obtener_tarifa_base.__module__ == candidato
+    doble = corpus_dorado._evaluar_calculadora(0)
+
+    assert (doble['cal_base'] == 2 * actual['cal_base']).all()
+    # cotizar_asegurado y el resumen también usan la tarifa del candidato
+    cotizados = actual['cal_final'] > 0
+    assert cotizados.any()
+    assert (np.abs(doble['cal_final'][cotizados] - 2 * actual['cal_final'][cotizados]) <= 1).all()
+    assert (doble['cal_cuota'] > actual['cal_cuota'])[actual['cal_cuota'] > 0].all()
+
+def test_inyectar_solo_reemplaza_lo_definido(candidato):
+    modulo = importlib.import_module(candidato)
+    assert corpus_dorado.inyectar_candidato(modulo) == ['obtener_tarifa_base']
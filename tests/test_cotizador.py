@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pandas as pd
+
+import cotizador
+
+def test_cotizador_no_depende_de_streamlit():
+    assert 'st' not in vars(cotizador)
+
+def test_cargar_tarifas_reporta_el_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SRP_REFERENCIA_DB", raising=False)
+    errores = []
+    assert cotizador.cargar_tarifas(errores) is None
+    assert errores == ["⚠️ No se encontró el archivo 'tarifario_base.csv'"]
+
+def test_plan_inexistente_no_tiene_tarifa(df_tarifas):
+    assert cotizador.obtener_tarifa_base(df_tarifas, 'XXXX', 30) is None
+
+def test_cotizar_familia_usa_la_fecha(df_tarifas, df_campanas):
+    campana = df_campanas.iloc[0]
+    integrantes = [("Titular", 30), ("Hijo", 5)]
+    dentro, _ = cotizador.cotizar_familia(
+        df_tarifas, df_campanas, 'MNAC', integrantes, 12, 0.04, "No", campana['Fecha_Inicio']
+    )
+    fuera, _ = cotizador.cotizar_familia(
+        df_tarifas, df_campanas, 'MNAC', integrantes, 12, 0.04, "No", datetime(1990, 1, 1)
+    )
+    assert dentro['campana'] == campana['Nombre']
+    assert fuera['campana'] is None
+    assert fuera['total_prima'] == fuera['total_base']
+    assert dentro['total_prima'] < fuera['total_prima']
+
+def test_resumen_coincide_con_el_plan_de_pagos(df_tarifas, df_campanas):
+    cotizacion, sin_tarifa = cotizador.cotizar_familia(
+        df_tarifas, df_campanas, 'MSLD', [("Titular", 45), ("Cónyuge", 43)], 12, 0.04, "Sí", datetime(2024, 11, 1)
+    )
+    assert sin_tarifa == []
+    pagos = pd.DataFrame(cotizacion['pagos'])
+    assert round(pagos['pago'].sum(), 2) == round(cotizacion['total_financiado'], 2)
+    assert pagos['pago'].iloc[0] == cotizacion['cuota_mensual']
+    assert pagos['saldo'].iloc[-1] == 0
+
+def test_descuento_de_campana_sin_prima_en_float(df_campanas):
+    campana = df_campanas[df_campanas['Tipo_Campana'] == 'General'].iloc[0]
+    plan = next(p for p in cotizador.PLANES if p in df_campanas.columns and pd.notna(campana[p]))
+    pct, nombre = cotizador.aplicar_descuento_campana(df_campanas, plan, "No", campana['Fecha_Inicio'])
+    assert (pct, nombre) == (float(campana[plan]), campana['Nombre'])
+    assert cotizador.aplicar_descuento_campana(df_campanas, plan, "No", datetime(1990, 1, 1)) == (0, None)
+    assert not hasattr(cotizador, 'calcular_pago_financiado')
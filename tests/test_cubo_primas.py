@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+import pytest
+
+from cotizador import cotizar_familia
+from cubo_primas import CuboPrimas
+
+FAMILIAS = [
+    [("Titular", 30)],
+    [("Titular", 45), ("Cónyuge", 43), ("Hijo", 12), ("Hijo", 25)],
+    [("Titular", 70), ("Otro", 0), ("Hijo", 30)],
+]
+
+@pytest.fixture(scope="module")
+def cubo(df_tarifas, df_campanas):
+    return CuboPrimas(df_tarifas, df_campanas)
+
+def _fechas(df_campanas):
+    fin = df_campanas['Fecha_Fin'].max().to_pydatetime()
+    return [df_campanas['Fecha_Inicio'].min().to_pydatetime() + timedelta(days=3), fin, fin + timedelta(hours=9)]
+
+@pytest.mark.parametrize("integrantes", FAMILIAS)
+def test_cotizar_igual_que_cotizar_familia(cubo, df_tarifas, df_campanas, integrantes):
+    for fecha in _fechas(df_campanas):
+        for plan in cubo.planes:
+            for continuidad in ("No", "Sí"):
+                for cuotas, tasa in [(1, 0.0), (12, 0.04)]:
+                    esperado = cotizar_familia(df_tarifas, df_campanas, plan, integrantes, cuotas, tasa, continuidad, fecha)
+                    assert cubo.cotizar(plan, integrantes, cuotas, tasa, continuidad, fecha) == esperado
+
+def test_fuera_del_cubo_usa_el_tarifario(cubo, df_tarifas, df_campanas):
+    fecha = _fechas(df_campanas)[0]
+    for plan, integrantes in [('XXXX', [("Titular", 30)]), ('MNAC', [("Titular", 30), ("Otro", 105)])]:
+        esperado = cotizar_familia(df_tarifas, df_campanas, plan, integrantes, 12, 0.04, "No", fecha)
+        assert cubo.cotizar(plan, integrantes, 12, 0.04, "No", fecha) == esperado
+
+def test_comparar_igual_que_cotizar_cada_plan(cubo, df_tarifas, df_campanas):
+    integrantes = FAMILIAS[1]
+    fecha = _fechas(df_campanas)[0]
+    for fila in cubo.comparar(integrantes, 12, 0.04, "Sí", fecha):
+        cotizacion, sin_tarifa = cotizar_familia(df_tarifas, df_campanas, fila['plan'], integrantes, 12, 0.04, "Sí", fecha)
+        assert fila['total_prima'] == cotizacion['total_prima']
+        assert fila['cuota_mensual'] == cotizacion['cuota_mensual']
+        assert fila['total_financiado'] == cotizacion['total_financiado']
+        assert fila['campana'] == cotizacion['campana']
+        assert fila['sin_tarifa'] == len(sin_tarifa)
+
+def test_campana_vigente_sin_campanas(df_tarifas):
+    cubo = CuboPrimas(df_tarifas, None)
+    assert cubo.campana_vigente("Sí", datetime.now()) == 0
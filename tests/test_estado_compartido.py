@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+import estado_compartido
+from estado_compartido import Publicador, adjuntar, empaquetar_estado, tipos_desconocidos
+
+@pytest.fixture
+def manifiesto(tmp_path, monkeypatch):
+    monkeypatch.setattr(estado_compartido, "_actual", None)
+    monkeypatch.setattr(estado_compartido, "_firma_manifiesto", None)
+    return str(tmp_path / "estado.json")
+
+@pytest.fixture
+def publicadores(manifiesto):
+    creados = []
+    yield lambda: creados.append(Publicador(manifiesto)) or creados[-1]
+    for publicador in creados:
+        publicador.cerrar()
+
+def test_adjuntar_sin_cargador(manifiesto):
+    assert adjuntar(manifiesto) is None
+
+def test_adjuntar_lee_la_generacion_publicada(manifiesto, publicadores, df_tarifas, df_campanas):
+    publicador = publicadores()
+    assert publicador.publicar(df_tarifas, df_campanas) == 1
+    estado = adjuntar(manifiesto)
+    assert estado.generacion == 1
+    assert len(estado.df_tarifas) == len(df_tarifas)
+    assert list(estado.df_campanas['Nombre']) == list(df_campanas['Nombre'])
+    # Sin cambios en el manifiesto se reutiliza el mismo adjunto
+    assert adjuntar(manifiesto) is estado
+
+def test_reinicio_del_cargador_cambia_de_segmento(manifiesto, publicadores, df_tarifas, df_campanas):
+    primero = publicadores()
+    primero.publicar(df_tarifas, df_campanas)
+    anterior = adjuntar(manifiesto)
+    primero.cerrar()
+
+    # El contador vuelve a 1, pero el lector debe tomar el segmento nuevo
+    tarifas_nuevas = df_tarifas.head(3)
+    assert publicadores().publicar(tarifas_nuevas, df_campanas) == 1
+    actual = adjuntar(manifiesto)
+    assert actual is not anterior
+    assert actual.generacion == anterior.generacion
+    assert actual.segmento != anterior.segmento
+    assert len(actual.df_tarifas) == 3
+
+def test_tipo_de_campana_desconocido_no_interrumpe(df_tarifas, df_campanas):
+    campanas = df_campanas.copy()
+    campanas.loc[0, 'Tipo_Campana'] = 'Corporativa'
+    assert tipos_desconocidos(campanas) == ['Corporativa']
+    assert tipos_desconocidos(df_campanas) == []
+    assert isinstance(empaquetar_estado(df_tarifas, campanas), (bytes, bytearray, memoryview))
+
+def test_tipo_desconocido_se_conserva_al_adjuntar(manifiesto, publicadores, df_tarifas, df_campanas):
+    campanas = df_campanas.copy()
+    campanas.loc[0, 'Tipo_Campana'] = 'Corporativa'
+    publicadores().publicar(df_tarifas, campanas)
+    estado = adjuntar(manifiesto)
+    assert list(estado.df_campanas['Tipo_Campana']) == list(campanas['Tipo_Campana'])
+    pd.testing.assert_series_equal(estado.df_campanas['Fecha_Fin'], campanas['Fecha_Fin'], check_names=False, check_dtype=False)
+
+def test_descuentos_se_muestran_igual_que_desde_el_csv(manifiesto, publicadores, df_tarifas, df_campanas):
+    from calendario_campanas import CalendarioCampanas
+
+    publicadores().publicar(df_tarifas, df_campanas)
+    estado = adjuntar(manifiesto)
+    planes = [p for p in estado_compartido.PLANES if p in df_campanas.columns]
+    pd.testing.assert_frame_equal(estado.df_campanas[planes], df_campanas[planes])
+
+    fecha = df_campanas['Fecha_Inicio'].min()
+    desde_csv = CalendarioCampanas(df_campanas).instantanea(fecha)['descuentos']
+    compartido = CalendarioCampanas(estado.df_campanas).instantanea(fecha)['descuentos']
+    textos = lambda d: {tipo: [f"{v}%" for v in por_plan.values()] for tipo, por_plan in d.items()}
+    assert textos(compartido) == textos(desde_csv)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import exportacion
+from cotizador import cotizar_familia
+from exportacion import EscritorCSV, EscritorXLSX, exportar, exportar_xlsx_bytes
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+@pytest.fixture(scope="module")
+def cotizaciones(df_tarifas, df_campanas):
+    fecha = df_campanas['Fecha_Inicio'].min()
+    resultado = []
+    for i, (plan, integrantes, cuotas) in enumerate([
+        ('MNAC', [("Titular", 30), ("Hijo", 4)], 12),
+        ('MSLD', [("Titular", 60)], 1),
+        ('AM15', [("Titular", 40), ("Cónyuge", 38), ("Hijo", 10)], 6),
+    ]):
+        cotizacion, _ = cotizar_familia(df_tarifas, df_campanas, plan, integrantes, cuotas, 0.04, "No", fecha)
+        cotizacion['cliente'] = {'Familia': i + 1}
+        resultado.append(cotizacion)
+    return resultado
+
+def _hojas(contenido):
+    """{nombre de hoja: filas como listas de textos}"""
+    with zipfile.ZipFile(io.BytesIO(contenido)) as zf:
+        libro = ET.fromstring(zf.read('xl/workbook.xml'))
+        nombres = [hoja.get('name') for hoja in libro.iterfind('.//x:sheet', NS)]
+        hojas = {}
+        for n, nombre in enumerate(nombres, start=1):
+            datos = ET.fromstring(zf.read(f'xl/worksheets/sheet{n}.xml'))
+            hojas[nombre] = [
+                [''.join(celda.itertext()) for celda in fila.iterfind('x:c', NS)]
+                for fila in datos.iterfind('.//x:row', NS)
+            ]
+    return hojas
+
+def test_xlsx_tiene_las_tres_tablas(cotizaciones):
+    hojas = _hojas(exportar_xlsx_bytes(cotizaciones))
+    assert list(hojas) == ['Cotizaciones', 'Asegurados', 'Cuotas']
+    assert hojas['Cotizaciones'][0] == [titulo for titulo, _ in exportacion.TABLAS['Cotizaciones']]
+    assert len(hojas['Cotizaciones']) == 1 + len(cotizaciones)
+    assert len(hojas['Asegurados']) == 1 + sum(len(c['asegurados']) for c in cotizaciones)
+    assert len(hojas['Cuotas']) == 1 + sum(len(c['pagos']) for c in cotizaciones)
+
+def test_xlsx_montos_y_textos(cotizaciones):
+    fila = _hojas(exportar_xlsx_bytes(cotizaciones))['Cotizaciones'][1]
+    cotizacion = cotizaciones[0]
+    assert fila[:3] == ['1', cotizacion['plan'], cotizacion['tiene_continuidad']]
+    assert float(fila[7]) == cotizacion['total_prima']
+    assert float(fila[8]) == cotizacion['cuota_mensual']
+
+def test_xlsx_continua_en_hoja_nueva(cotizaciones, monkeypatch):
+    monkeypatch.setattr(exportacion, "MAX_FILAS_HOJA", 10)
+    hojas = _hojas(exportar_xlsx_bytes(cotizaciones))
+    cuotas = [nombre for nombre in hojas if nombre.startswith('Cuotas')]
+    assert cuotas[:2] == ['Cuotas', 'Cuotas (2)']
+    assert all(len(hojas[nombre]) <= 10 for nombre in cuotas)
+    # Cada hoja repite el encabezado
+    assert sum(len(hojas[nombre]) - 1 for nombre in cuotas) == sum(len(c['pagos']) for c in cotizaciones)
+
+def test_xlsx_por_grupos_igual_que_de_una_vez(cotizaciones, tmp_path):
+    ruta = tmp_path / "salida.xlsx"
+    assert exportar(iter(cotizaciones), EscritorXLSX(str(ruta)), filas_por_grupo=2) == len(cotizaciones)
+    assert _hojas(ruta.read_bytes()) == _hojas(exportar_xlsx_bytes(cotizaciones))
+
+def test_csv_por_tabla(cotizaciones):
+    salida = io.StringIO()
+    exportar(cotizaciones, EscritorCSV({'Cuotas': salida}))
+    lineas = salida.getvalue().splitlines()
+    assert lineas[0] == 'ID,Cuota,Pago,Capital,Interés,Saldo'
+    assert len(lineas) == 1 + sum(len(c['pagos']) for c in cotizaciones)
+    assert lineas[1].startswith('1,1,')
+
+def test_numeros_sin_ruido_de_punto_flotante(cotizaciones):
+    titulos = [titulo for titulo, _ in exportacion.TABLAS['Cotizaciones']]
+    salida = io.StringIO()
+    exportar(cotizaciones, EscritorCSV({'Cotizaciones': salida}))
+    fila = salida.getvalue().splitlines()[1].split(',')
+    assert fila[titulos.index('Tasa %')] == '4.00'
+
+    fila = _hojas(exportar_xlsx_bytes(cotizaciones))['Cotizaciones'][1]
+    assert fila[titulos.index('Tasa %')] == '4.0'
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from cotizador import EDAD_MIN_TITULAR, ajustar_plan_por_edad, normalizar_distrito, recomendar_plan
+from generador_cartera import GeneradorCartera, edad_maxima_con_tarifa
+
+def test_misma_semilla_misma_cartera(df_tarifas):
+    a = GeneradorCartera(df_tarifas, semilla=7).generar_bloque(0, 500)
+    b = GeneradorCartera(df_tarifas, semilla=7).generar_bloque(0, 500)
+    assert a.equals(b)
+
+def test_edades_con_tarifa(df_tarifas):
+    cartera = GeneradorCartera(df_tarifas, semilla=1).generar_bloque(0, 2000)
+    titulares = cartera[cartera['Relacion'] == "Titular"]
+    assert titulares['Edad'].between(EDAD_MIN_TITULAR, edad_maxima_con_tarifa(df_tarifas)).all()
+    hijos = cartera[cartera['Relacion'] == "Hijo"]
+    assert (hijos['Edad'] <= edad_maxima_con_tarifa(df_tarifas, es_hijo=True)).all()
+
+def test_rango_sobre_la_edad_maxima_se_rechaza(df_tarifas):
+    edad_maxima = edad_maxima_con_tarifa(df_tarifas)
+    distribucion = {'edad_titular': {"30-40": 0.5, f"{edad_maxima + 1}-{edad_maxima + 20}": 0.5}}
+    with pytest.raises(ValueError, match="no tiene edades con tarifa"):
+        GeneradorCartera(df_tarifas, distribucion)
+
+def test_rango_parcial_se_recorta(df_tarifas):
+    edad_maxima = edad_maxima_con_tarifa(df_tarifas)
+    distribucion = {'edad_titular': {f"{edad_maxima - 2}-{edad_maxima + 20}": 1}}
+    cartera = GeneradorCartera(df_tarifas, distribucion).generar_bloque(0, 300)
+    titulares = cartera[cartera['Relacion'] == "Titular"]
+    assert titulares['Edad'].between(edad_maxima - 2, edad_maxima).all()
+
+def test_plan_igual_al_recomendador(df_tarifas):
+    # El recomendador ajusta el plan por edad también con continuidad
+    cartera = GeneradorCartera(df_tarifas, {'prob_continuidad': 0.5}, semilla=3).generar_bloque(0, 1500)
+    titulares = cartera[cartera['Relacion'] == "Titular"]
+    assert set(titulares['Continuidad']) == {"Sí", "No"}
+    for fila in titulares.itertuples():
+        esperado, _ = ajustar_plan_por_edad(
+            recomendar_plan(normalizar_distrito(fila.Distrito), fila.Sexo, fila.Edad, fila.Afiliados), fila.Edad
+        )
+        assert fila.Plan == esperado
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import metricas
+from metricas import Contador, Histograma
+
+def _en_hilos(funcion, cantidad):
+    for _ in range(cantidad):
+        hilo = threading.Thread(target=funcion)
+        hilo.start()
+        hilo.join()
+
+def test_contador_suma_todos_los_hilos():
+    contador = Contador("prueba_total", "Prueba", ("plan",))
+    _en_hilos(lambda: contador.inc("MNAC"), 10)
+    contador.inc("MSLD", cantidad=3)
+    assert contador.valores() == {("MNAC",): 10, ("MSLD",): 3}
+    # Lo consolidado no se pierde ni se duplica en la siguiente lectura
+    assert contador.valores() == {("MNAC",): 10, ("MSLD",): 3}
+
+def test_fragmentos_de_hilos_terminados_se_podan_sin_exponer():
+    contador = Contador("prueba_poda_total", "Prueba")
+    _en_hilos(lambda: contador.inc(), 5 * metricas.PODA_FRAGMENTOS)
+    # Sin llamar a valores(), la lista de hilos no crece con cada hilo terminado
+    assert len(contador._fragmentos._vivos) < metricas.PODA_FRAGMENTOS
+    assert contador.valores() == {(): 5 * metricas.PODA_FRAGMENTOS}
+
+def test_histograma_cubetas_y_exposicion():
+    histograma = Histograma("prueba_segundos", "Prueba", ("paso",), cubetas=(0.1, 1.0))
+    for valor in (0.05, 0.5, 0.5, 3.0):
+        histograma.observar(valor, "carga")
+    lineas = histograma.exponer()
+    assert 'prueba_segundos_bucket{paso="carga",le="0.1"} 1' in lineas
+    assert 'prueba_segundos_bucket{paso="carga",le="1.0"} 3' in lineas
+    assert 'prueba_segundos_bucket{paso="carga",le="+Inf"} 4' in lineas
+    assert 'prueba_segundos_count{paso="carga"} 4' in lineas
+
+@pytest.fixture
+def sin_servidor(monkeypatch):
+    monkeypatch.setattr(metricas, "_servidor", None)
+    monkeypatch.setattr(metricas, "_error_servidor", None)
+    yield
+    if metricas._servidor is not None:
+        metricas._servidor.shutdown()
+        metricas._servidor.server_close()
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_servidor_expone_metricas_y_sondas(sin_servidor, monkeypatch):
+    monkeypatch.setitem(metricas.SONDAS, "/prueba", lambda: (503, "text/plain", "no"))
+    servidor = metricas.iniciar_servidor(_puerto_libre())
+    puerto = servidor.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/metrics") as respuesta:
+        assert "# TYPE srp_cotizaciones_total counter" in respuesta.read().decode()
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"http://127.0.0.1:{puerto}/prueba")
+    assert error.value.code == 503
+
+def test_puerto_ocupado_se_avisa_una_vez(sin_servidor, capsys):
+    with socket.socket() as ocupado:
+        ocupado.bind(("127.0.0.1", 0))
+        ocupado.listen()
+        puerto = ocupado.getsockname()[1]
+        assert metricas.iniciar_servidor(puerto) is None
+        assert metricas.iniciar_servidor(puerto) is None
+    avisos = capsys.readouterr().err
+    assert avisos.count(f"no se pudo escuchar en 127.0.0.1:{puerto}") == 1
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+import pathlib
+
+from streamlit.testing.v1 import AppTest
+
+RUTA_APP = pathlib.Path(__file__).resolve().parent.parent / "streamlit_app.py"
+
+def test_cada_pagina_se_muestra_sin_errores():
+    at = AppTest.from_file(str(RUTA_APP), default_timeout=60).run()
+    opciones = list(at.sidebar.radio[0].options)
+    assert len(opciones) == 4
+    for opcion in opciones:
+        at.sidebar.radio[0].set_value(opcion).run()
+        assert not at.exception, opcion
+        assert at.sidebar.radio[0].value == opcion
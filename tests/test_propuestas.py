@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime
+
+import pytest
+
+import propuestas
+from cotizador import cotizar_familia
+from propuestas import ServicioPropuestas, con_fecha, generar_propuestas_masivas, hash_cotizacion, renderizar_propuesta
+
+@pytest.fixture
+def cotizacion(df_tarifas, df_campanas):
+    cotizacion, _ = cotizar_familia(df_tarifas, df_campanas, "MSLD", [("Titular", 40), ("Hijo", 8)], 12, 0.04, "No")
+    cotizacion['cliente'] = {'Titular': "Femenino, 40 años", 'Distrito': "Miraflores"}
+    return cotizacion
+
+def test_pdf_valido(cotizacion):
+    pdf = renderizar_propuesta(cotizacion)
+    assert pdf.startswith(b"%PDF-") and pdf.rstrip().endswith(b"%%EOF")
+    assert b"MSLD" in pdf
+
+def test_hash_estable_e_independiente_del_orden(cotizacion):
+    reordenada = dict(reversed(list(cotizacion.items())))
+    assert hash_cotizacion(cotizacion) == hash_cotizacion(reordenada)
+    assert hash_cotizacion(cotizacion) != hash_cotizacion(dict(cotizacion, num_cuotas=6))
+
+def test_obtener_con_espera_retorna_el_pdf_en_la_misma_llamada(cotizacion):
+    servicio = ServicioPropuestas()
+    clave = servicio.solicitar(cotizacion)
+    assert servicio.obtener(clave, espera=5) == renderizar_propuesta(cotizacion)
+    servicio.cerrar()
+
+def test_obtener_sin_espera_no_bloquea(cotizacion, monkeypatch):
+    liberar = threading.Event()
+    original = propuestas.renderizar_propuesta
+    monkeypatch.setattr(propuestas, "renderizar_propuesta", lambda c: (liberar.wait(5), original(c))[1])
+    servicio = ServicioPropuestas()
+    clave = servicio.solicitar(cotizacion)
+    assert servicio.obtener(clave) is None
+    assert servicio.obtener(clave, espera=0.05) is None
+    liberar.set()
+    assert servicio.obtener(clave, espera=5).startswith(b"%PDF-")
+    servicio.cerrar()
+
+def test_error_de_render_se_relanza(cotizacion, monkeypatch):
+    def fallar(_):
+        raise RuntimeError("sin fuente")
+    monkeypatch.setattr(propuestas, "renderizar_propuesta", fallar)
+    servicio = ServicioPropuestas()
+    clave = servicio.solicitar(cotizacion)
+    with pytest.raises(RuntimeError):
+        servicio.obtener(clave, espera=5)
+    servicio.cerrar()
+
+def test_cache_lru_descarta_los_mas_antiguos(cotizacion):
+    servicio = ServicioPropuestas(max_documentos=2)
+    claves = []
+    for cuotas in (1, 4, 6):
+        clave = servicio.solicitar(dict(cotizacion, num_cuotas=cuotas))
+        servicio.obtener(clave, espera=5)
+        claves.append(clave)
+    assert servicio.obtener(claves[0]) is None
+    assert servicio.obtener(claves[2]) is not None
+    servicio.cerrar()
+
+def test_la_fecha_de_la_propuesta_es_parte_de_la_clave(cotizacion):
+    hoy = con_fecha(cotizacion)
+    ayer = con_fecha(cotizacion, datetime(2020, 1, 1))
+    assert ayer['fecha'] == "01/01/2020" and 'fecha' not in cotizacion
+    assert hash_cotizacion(hoy) != hash_cotizacion(ayer)
+    assert con_fecha(ayer) is ayer
+
+    servicio = ServicioPropuestas()
+    assert servicio.solicitar(cotizacion) == hash_cotizacion(hoy)
+    assert b"01/01/2020" in servicio.obtener(servicio.solicitar(ayer), espera=5)
+    servicio.cerrar()
+
+def test_masivo_reutiliza_los_archivos(cotizacion, tmp_path):
+    cotizaciones = [cotizacion, dict(cotizacion, num_cuotas=6)]
+    rutas = list(generar_propuestas_masivas(cotizaciones, str(tmp_path), procesos=1))
+    assert len(set(rutas)) == 2
+    fechas = [(tmp_path / r.split("/")[-1]).stat().st_mtime_ns for r in rutas]
+    assert list(generar_propuestas_masivas(cotizaciones, str(tmp_path), procesos=1)) == rutas
+    assert [(tmp_path / r.split("/")[-1]).stat().st_mtime_ns for r in rutas] == fechas
+
+def test_masivo_no_encola_toda_la_cartera(cotizacion, tmp_path):
+    leidas = []
+    def cotizaciones():
+        for cuotas in range(1, 21):
+            leidas.append(cuotas)
+            yield dict(cotizacion, num_cuotas=cuotas)
+
+    rutas = generar_propuestas_masivas(cotizaciones(), str(tmp_path), procesos=1, chunksize=2)
+    next(rutas)
+    assert len(leidas) <= 4
+    assert len(list(rutas)) == 19 and len(leidas) == 20
+
+def test_cartera_informa_familias_sin_tarifa(tmp_path, df_tarifas, df_campanas):
+    import pandas as pd
+
+    ruta = tmp_path / "cartera.csv"
+    pd.DataFrame({
+        'ID_Familia': [1, 2, 2, 3], 'Plan': ["MSLD", "NOEXISTE", "NOEXISTE", "MNAC"],
+        'Relacion': ["Titular", "Titular", "Hijo", "Titular"], 'Edad': [40, 35, 5, 30],
+        'Continuidad': "No", 'Cuotas': 1,
+    }).to_csv(ruta, index=False)
+    omitidas = []
+    cotizaciones = list(propuestas.cotizaciones_desde_cartera(str(ruta), df_tarifas, df_campanas, omitidas=omitidas))
+    assert [c['cliente']['Familia'] for c in cotizaciones] == [1, 3]
+    assert omitidas == [2]
+    assert propuestas.aviso_omitidas(omitidas).startswith("1 familia(s) sin tarifa")
+
+@pytest.mark.parametrize("filas_por_bloque", [None, 7])
+def test_cartera_igual_que_cotizar_familia(tmp_path, df_tarifas, df_campanas, filas_por_bloque):
+    import pandas as pd
+    from generador_cartera import GeneradorCartera
+
+    ruta = tmp_path / "cartera.csv"
+    GeneradorCartera(df_tarifas, semilla=5).generar_bloque(0, 60).to_csv(ruta, index=False)
+    fecha = df_campanas['Fecha_Inicio'].min()
+
+    esperadas = []
+    for id_familia, familia in pd.read_csv(ruta).groupby('ID_Familia', sort=False):
+        primera = familia.iloc[0]
+        cotizacion, _ = cotizar_familia(
+            df_tarifas, df_campanas, primera['Plan'], list(zip(familia['Relacion'], familia['Edad'])),
+            int(primera['Cuotas']), float(primera['Tasa']), primera['Continuidad'], fecha
+        )
+        cotizacion['cliente'] = {'Familia': id_familia}
+        esperadas.append(cotizacion)
+
+    obtenidas = list(propuestas.cotizaciones_desde_cartera(str(ruta), df_tarifas, df_campanas, filas_por_bloque, fecha))
+    assert obtenidas == esperadas
+    assert hash_cotizacion(obtenidas[0]) == hash_cotizacion(esperadas[0])
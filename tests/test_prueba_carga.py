@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from prueba_carga import correr_nivel, detener_servidor, ejecutar_sesion, iniciar_servidor, percentil
+
+def test_percentil():
+    assert percentil([], 90) == 0.0
+    assert percentil([5], 99) == 5
+    assert percentil([1, 2, 3, 4], 50) == 2.5
+    assert percentil([4, 1, 3, 2], 100) == 4
+
+@pytest.fixture(scope="module")
+def servidor():
+    proceso, url = iniciar_servidor()
+    yield proceso, url
+    detener_servidor(proceso)
+
+def test_flujo_asesor_recorre_la_app(servidor):
+    _, url = servidor
+    latencias = asyncio.run(ejecutar_sesion(url, 0, 1, 60))
+    pasos = [paso for paso, _ in latencias]
+    assert pasos[:2] == ["inicio", "menu_recomendador"] and pasos[-1] == "menu_campanas"
+    assert "recomendar" in pasos and "editar_edad" in pasos
+    assert all(ms >= 0 for _, ms in latencias)
+
+def test_sesiones_concurrentes_sobre_un_servidor(servidor):
+    proceso, url = servidor
+    nivel = correr_nivel(url, proceso.pid, 3, 1, 7, 60)
+    assert nivel['sesiones'] == 3 and nivel['reruns'] >= 3 * 10
+    assert nivel['rss_reposo_mb'] > 0 and nivel['rss_max_mb'] >= nivel['rss_reposo_mb']
+    assert nivel['rss_mb_por_sesion'] == (nivel['rss_max_mb'] - nivel['rss_reposo_mb']) / 3
+    assert nivel['cpu_s_por_sesion'] > 0
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import cotizador
+from cotizador import DISTRITOS, EDAD_MIN_TITULAR, SEXOS, normalizar_distrito, recomendar_plan, tabla_validaciones
+from referencia import abrir_referencia, construir_referencia
+
+@pytest.fixture(scope="module")
+def ruta_db(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("referencia") / "referencia.db")
+    construir_referencia(ruta)
+    return ruta
+
+def test_dataframes_iguales_a_los_csv(ruta_db, df_tarifas, df_campanas):
+    referencia = abrir_referencia(ruta_db)
+    pd.testing.assert_frame_equal(referencia.df_tarifas(), df_tarifas)
+    pd.testing.assert_frame_equal(referencia.df_campanas(), df_campanas, check_dtype=False)
+
+def test_cotizador_lee_de_la_referencia(ruta_db, df_tarifas, monkeypatch):
+    monkeypatch.setenv("SRP_REFERENCIA_DB", ruta_db)
+    assert cotizador.cargar_tarifas() is abrir_referencia(ruta_db).df_tarifas()
+    pd.testing.assert_frame_equal(cotizador.cargar_tarifas(), df_tarifas)
+
+def test_validaciones_en_el_orden_de_recursos(ruta_db):
+    validaciones = abrir_referencia(ruta_db).validaciones()
+    assert validaciones == tabla_validaciones()
+    assert [fila['Plan'] for fila in validaciones] == ['MSLD', 'MINT', 'MNAC', 'AM05', 'AM18', 'AM17', 'AM15']
+
+def test_regla_de_recomendacion(ruta_db):
+    referencia = abrir_referencia(ruta_db)
+    for distrito in DISTRITOS:
+        distrito = normalizar_distrito(distrito)
+        for sexo in SEXOS:
+            for edad in (EDAD_MIN_TITULAR, 35, 64, 70):
+                for afiliados in (1, 3):
+                    assert referencia.recomendar_plan(distrito, sexo, edad, afiliados) == \
+                        recomendar_plan(distrito, sexo, edad, afiliados)
+
+def test_nueva_carga_reabre_la_referencia(tmp_path):
+    ruta = str(tmp_path / "referencia.db")
+    construir_referencia(ruta)
+    anterior = abrir_referencia(ruta)
+    assert abrir_referencia(ruta) is anterior
+    construir_referencia(ruta)
+    assert abrir_referencia(ruta) is not anterior
+    assert not os.path.exists(ruta + ".tmp")
+
+def test_tarifa_y_descuento_por_consulta(ruta_db, df_tarifas, df_campanas, monkeypatch):
+    monkeypatch.setenv("SRP_REFERENCIA_DB", ruta_db)
+    referencia = abrir_referencia(ruta_db)
+    df_base, df_campanas_base = cotizador.cargar_tarifas(), cotizador.cargar_campanas()
+    consultas = []
+    for metodo in ('tarifa', 'campana_vigente'):
+        original = getattr(referencia, metodo)
+        monkeypatch.setattr(referencia, metodo, lambda *a, _o=original, _m=metodo: consultas.append(_m) or _o(*a))
+
+    for plan in cotizador.PLANES + ['XXXX']:
+        for es_hijo in (False, True):
+            for edad in (0, 17, 18, 26, 30, 70, 71, 90):
+                assert cotizador.obtener_tarifa_base(df_base, plan, edad, es_hijo) == \
+                    cotizador.obtener_tarifa_base(df_tarifas, plan, edad, es_hijo)
+    fechas = [c['Fecha_Inicio'] for _, c in df_campanas.iterrows()] + [c['Fecha_Fin'] for _, c in df_campanas.iterrows()]
+    for fecha in fechas + [fechas[0] - pd.Timedelta(days=1), datetime(2030, 1, 1)]:
+        for plan in cotizador.PLANES:
+            for continuidad in ("Sí", "No"):
+                assert cotizador.aplicar_descuento_campana(df_campanas_base, plan, continuidad, fecha) == \
+                    cotizador.aplicar_descuento_campana(df_campanas, plan, continuidad, fecha)
+    assert {'tarifa', 'campana_vigente'} <= set(consultas)
+
+def test_dataframe_ajeno_no_consulta_la_base(ruta_db, df_tarifas, monkeypatch):
+    # Un tarifario modificado (simulaciones, archivos a validar) se cotiza tal cual
+    monkeypatch.setenv("SRP_REFERENCIA_DB", ruta_db)
+    modificado = df_tarifas.copy()
+    modificado['MSLD'] = 1.0
+    assert cotizador.obtener_tarifa_base(modificado, 'MSLD', 40) == 1.0
+
+def test_consultas_usan_los_indices(tmp_path, df_campanas):
+    # Con pocas campañas SQLite prefiere recorrer la tabla: se prueba con un año de campañas semanales
+    campanas = pd.concat([df_campanas] * 26, ignore_index=True)
+    desplazamiento = pd.to_timedelta(7 * (campanas.index // len(df_campanas)), unit='D')
+    campanas['Fecha_Inicio'] += desplazamiento
+    campanas['Fecha_Fin'] = campanas['Fecha_Inicio'] + pd.Timedelta(days=6)
+    campanas.to_csv(tmp_path / "campanas.csv", index=False)
+    ruta = str(tmp_path / "referencia.db")
+    construir_referencia(ruta, ruta_campanas=str(tmp_path / "campanas.csv"))
+    referencia = abrir_referencia(ruta)
+
+    def plan_consulta(sql, parametros):
+        return " ".join(fila[3] for fila in referencia._todos("EXPLAIN QUERY PLAN " + sql, parametros))
+
+    assert "idx_campanas_vigencia" in plan_consulta(
+        "SELECT c.nombre, d.descuento FROM campanas c "
+        "LEFT JOIN descuentos d ON d.campana = c.id AND d.plan = ? "
+        "WHERE c.tipo = ? AND c.fecha_inicio <= ? AND c.fecha_fin >= ? ORDER BY c.id LIMIT 1",
+        ('MSLD', 'General', '2024-11-01 00:00:00.000000', '2024-11-01 00:00:00.000000')
+    )
+    assert "PRIMARY KEY" in plan_consulta("SELECT prima FROM tarifas WHERE plan = ? AND rango = ?", ('MSLD', '40 años'))
+
+def test_cargar_tarifas_valida_la_base(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "referencia.db")
+    construir_referencia(ruta)
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("UPDATE metadatos SET valor = '[\"MSLD\"]' WHERE clave = 'columnas_tarifario'")
+    conexion.commit()
+    conexion.close()
+    monkeypatch.setenv("SRP_REFERENCIA_DB", ruta)
+    errores = []
+    assert cotizador.cargar_tarifas(errores) is None
+    assert errores == ["⚠️ Falta la columna 'RangoEtario' en el tarifario"]
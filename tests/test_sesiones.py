@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import time
+
+import pytest
+
+from streamlit.testing.v1 import AppTest
+
+from sesiones import AlmacenSesiones
+
+@pytest.fixture
+def ruta_db(tmp_path):
+    return str(tmp_path / "sesiones.db")
+
+@pytest.fixture
+def almacen(ruta_db):
+    # Intervalo largo: los volcados de la prueba son explícitos
+    almacen = AlmacenSesiones(ruta_db, intervalo=60)
+    yield almacen
+    almacen.cerrar()
+
+def _en_base(ruta_db):
+    with sqlite3.connect(ruta_db) as conexion:
+        return dict(conexion.execute("SELECT clave, datos FROM sesiones").fetchall())
+
+def test_guardar_no_escribe_hasta_volcar(almacen, ruta_db):
+    almacen.guardar("a", {'plan': "MNAC"})
+    assert _en_base(ruta_db) == {}
+    assert almacen.restaurar("a") == {'plan': "MNAC"}
+    assert almacen.volcar() == 1
+    assert _en_base(ruta_db) == {"a": '{"plan":"MNAC"}'}
+    assert almacen.volcar() == 0
+
+def test_la_ultima_foto_gana(almacen):
+    for edad in (30, 31, 32):
+        almacen.guardar("a", {'edad': edad})
+    assert almacen.volcar() == 1
+    almacen.guardar("a", {'edad': 40})
+    assert almacen.restaurar("a") == {'edad': 40}
+    almacen.volcar()
+    assert almacen.restaurar("a") == {'edad': 40}
+
+def test_restaurar_tras_reinicio(ruta_db):
+    primero = AlmacenSesiones(ruta_db, intervalo=60)
+    primero.guardar("a", {'distrito': "Miraflores", 'edad': 45})
+    primero.cerrar()
+
+    segundo = AlmacenSesiones(ruta_db, intervalo=60)
+    try:
+        assert segundo.restaurar("a") == {'distrito': "Miraflores", 'edad': 45}
+        assert segundo.restaurar("b") is None
+    finally:
+        segundo.cerrar()
+
+def test_hilo_vuelca_en_segundo_plano(ruta_db):
+    almacen = AlmacenSesiones(ruta_db, intervalo=0.05)
+    try:
+        almacen.guardar("a", {'plan': "MSLD"})
+        limite = time.time() + 5
+        while "a" not in _en_base(ruta_db) and time.time() < limite:
+            time.sleep(0.02)
+        assert "a" in _en_base(ruta_db)
+    finally:
+        almacen.cerrar()
+
+class _ConexionQueFalla:
+    """Falla al escribir el lote y delega el resto en la conexión real"""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def executemany(self, *_):
+        raise sqlite3.OperationalError("database is locked")
+
+    def __getattr__(self, nombre):
+        return getattr(self.conexion, nombre)
+
+def test_volcado_fallido_se_reintenta_sin_pisar_fotos_nuevas(almacen, ruta_db):
+    almacen.guardar("a", {'edad': 30})
+    almacen.guardar("b", {'edad': 50})
+    real = almacen._conexion
+    almacen._conexion = _ConexionQueFalla(real)
+    with pytest.raises(sqlite3.OperationalError):
+        almacen.volcar()
+    # Mientras tanto la sesión "a" cambió: se conserva la foto nueva
+    almacen.guardar("a", {'edad': 31})
+    almacen._conexion = real
+    assert almacen.volcar() == 2
+    assert _en_base(ruta_db) == {"a": '{"edad":31}', "b": '{"edad":50}'}
+
+def test_purgar_y_resumen(almacen):
+    almacen.guardar("vieja", {})
+    almacen.guardar("nueva", {})
+    almacen.volcar()
+    almacen._conexion.execute("UPDATE sesiones SET actualizado = ? WHERE clave = 'vieja'", (time.time() - 10 * 86400,))
+    assert almacen.purgar(7) == 1
+    cantidad, ultima = almacen.resumen()
+    assert cantidad == 1 and ultima is not None
+
+def _script_clave():
+    import streamlit as st
+    from paginas.sesion import clave_sesion
+    st.session_state.clave = clave_sesion()
+
+def test_clave_del_asesor_autenticado():
+    # AppTest corre la sesión con st.user = {"email": "test@example.com"}
+    at = AppTest.from_function(_script_clave).run()
+    assert at.session_state.clave == "usuario:test@example.com"
+    assert 'sesion' not in at.query_params
+
+def test_sin_autenticacion_la_clave_es_un_token_aleatorio(monkeypatch):
+    import streamlit.user_info
+    monkeypatch.setattr(streamlit.user_info, "_get_user_info", lambda: {})
+    primera = AppTest.from_function(_script_clave).run()
+    segunda = AppTest.from_function(_script_clave).run()
+    token = primera.query_params['sesion']
+    assert primera.session_state.clave == f"sesion:{token}"
+    assert len(token) >= 20 and token != segunda.query_params['sesion']
+    # Con el token en la URL (recarga del navegador) se recupera la misma clave
+    recarga = AppTest.from_function(_script_clave)
+    recarga.query_params['sesion'] = token
+    assert recarga.run().session_state.clave == f"sesion:{token}"
+    # ?asesor= ya no elige la sesión de nadie
+    ajena = AppTest.from_function(_script_clave)
+    ajena.query_params['asesor'] = "test@example.com"
+    assert ajena.run().session_state.clave.startswith("sesion:")
+
+def test_las_pruebas_no_escriben_sesiones_en_el_repo(_sesiones_temporales):
+    import sesiones
+    assert sesiones.RUTA_SESIONES == _sesiones_temporales
+    assert AlmacenSesiones()._conexion.execute("PRAGMA database_list").fetchone()[2] == _sesiones_temporales
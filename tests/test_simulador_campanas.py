@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import centimos
+from cotizador import PLANES, cotizar_asegurado
+from simulador_campanas import (
+    compactar_cartera, detalle_escenario, escenario_vigente, escenarios_desde_campanas, grilla_escenarios, simular
+)
+
+@pytest.fixture(scope="module")
+def cartera():
+    rng = np.random.default_rng(11)
+    return pd.DataFrame({
+        'Plan': rng.choice(PLANES, 300),
+        'Relacion': rng.choice(["Titular", "Cónyuge", "Hijo"], 300),
+        'Edad': rng.integers(0, 80, 300),
+        'Continuidad': rng.choice(["Sí", "No"], 300),
+    })
+
+def test_escenario_vigente_igual_que_la_calculadora(cartera, df_tarifas, df_campanas):
+    celdas, sin_tarifa = compactar_cartera(cartera, df_tarifas)
+    resumen = simular(celdas, [escenario_vigente(df_campanas), {'Nombre': 'Sin campaña'}])
+
+    base = final = 0
+    for fila in cartera.itertuples():
+        asegurado = cotizar_asegurado(df_tarifas, df_campanas, fila.Plan, fila.Relacion, fila.Edad, fila.Continuidad)
+        if asegurado:
+            base += centimos.a_centimos(asegurado['tarifa_base'])
+            final += centimos.a_centimos(asegurado['tarifa_final'])
+    assert celdas['Asegurados'].sum() + sin_tarifa == len(cartera)
+    assert resumen['Prima_Final'].tolist() == [final / centimos.CENTIMOS, base / centimos.CENTIMOS]
+    assert resumen['Costo_Descuento'].iloc[1] == 0
+
+def test_continuidad_cae_en_general(cartera, df_tarifas):
+    celdas, _ = compactar_cartera(cartera, df_tarifas)
+    general = {'MNAC': 25.0, 'MSLD': 33.0}
+    solo_general = simular(celdas, [{'Nombre': 'a', 'General': general, 'Continuidad': None}])
+    ambos = simular(celdas, [{'Nombre': 'b', 'General': general, 'Continuidad': general}])
+    assert solo_general['Prima_Final'].iloc[0] == ambos['Prima_Final'].iloc[0]
+
+def test_grilla_y_procesos(cartera, df_tarifas):
+    celdas, _ = compactar_cartera(cartera, df_tarifas)
+    escenarios = grilla_escenarios({'MSLD': [20, 25, 33], 'AM18': [25, 33]}, continuidad={'MSLD': 15})
+    assert len(escenarios) == 6
+    serie = simular(celdas, escenarios, tamano_bloque=2)
+    paralelo = simular(celdas, escenarios, procesos=2, tamano_bloque=2)
+    assert serie.equals(paralelo)
+    # A mayor descuento, menor prima final
+    assert serie.set_index('Escenario')['Prima_Final']['MSLD=33, AM18=33'] < \
+        serie.set_index('Escenario')['Prima_Final']['MSLD=20, AM18=25']
+
+def test_detalle_suma_el_total(cartera, df_tarifas, df_campanas):
+    celdas, _ = compactar_cartera(cartera, df_tarifas)
+    escenario = escenarios_desde_campanas(df_campanas)[0]
+    total = simular(celdas, [escenario])['Prima_Final'].iloc[0]
+    detalle = detalle_escenario(celdas, escenario)
+    assert round(detalle['Prima_Final'].sum(), 2) == round(total, 2)
+    assert detalle['Asegurados'].sum() == celdas['Asegurados'].sum()